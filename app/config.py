@@ -21,6 +21,14 @@ class LanguageModel(StrEnum):
     GEMINI_2_0_FLASH = "gemini-2.0-flash"
 
 
+class CacheBackend(StrEnum):
+    """Storage backend of the intervals.icu HTTP cache."""
+
+    SQLITE = "sqlite"
+    MEMORY = "memory"
+    FILESYSTEM = "filesystem"
+
+
 class Settings(BaseSettings):
     """Settings for the FastAPI app.
 
@@ -35,8 +43,13 @@ class Settings(BaseSettings):
         GEMINI_API_KEY: API key for Google Gemini.
         LANGUAGE_MODEL: The LLM model to use for planning.
         CACHE_INTERVALS_HOURS: How long to cache Intervals.icu API responses.
+        CACHE_POWER_CURVES_HOURS: How long to cache Intervals.icu power curves.
+        CACHE_BACKEND: Storage backend of the Intervals.icu HTTP cache.
+        CACHE_MAX_ENTRIES: Maximum number of responses kept by the in-memory cache backend.
         ANALYSIS_DAYS: Number of days of history to analyze for the coach.
         DASHBOARD_DAYS: Number of days to display on the dashboard.
+        CONTEXT_CONCURRENCY: Maximum number of providers generating LLM context at the same time.
+        CONTEXT_TIMEOUT_SECONDS: Time after which a provider's LLM context is replaced by a fallback notice.
         SYSTEM_PROMPT: The core coaching logic prompt.
         USER_PROMPT: The template for athlete-specific data.
     """
@@ -58,8 +71,13 @@ class Settings(BaseSettings):
     # App configuration
     LANGUAGE_MODEL: LanguageModel
     CACHE_INTERVALS_HOURS: int = 0
+    CACHE_POWER_CURVES_HOURS: int = 0
+    CACHE_BACKEND: CacheBackend = CacheBackend.SQLITE
+    CACHE_MAX_ENTRIES: int = 1024
     ANALYSIS_DAYS: int = 120
     DASHBOARD_DAYS: int = 42
+    CONTEXT_CONCURRENCY: int = 4
+    CONTEXT_TIMEOUT_SECONDS: float = 5.0
 
     # Prompt configuration
     SYSTEM_PROMPT: str = Field(DEFAULT_SYSTEM_PROMPT)
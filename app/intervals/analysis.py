@@ -1,15 +1,20 @@
 """Calculate the sports science analysis."""
 
-from datetime import UTC, date, datetime
 from logging import getLogger
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, cast
 
 import polars as pl
 
 from app.intervals.models import AnalysisResult, PMCResult, TrainingLoad
+from app.intervals.parser.activity import activities_to_frame, sum_zones
+from app.planning.providers.aggregation import DAILY_FRAME_ENGINE
+from app.planning.providers.instrumentation import ProviderProfiler
+from app.planning.providers.interfaces import AnalysisContext, Dataset
 from app.planning.providers.registry import registry
 
 if TYPE_CHECKING:
+    from collections.abc import Collection
+
     from app.intervals.client import IntervalsClient
     from app.intervals.parser.activity import ParsedActivity
     from app.intervals.parser.power_curve import ParsedPowerCurve
@@ -18,125 +23,157 @@ if TYPE_CHECKING:
 _LOGGER = getLogger(__name__)
 
 
-def compute_analysis(
-    activities: list[ParsedActivity],
+def compute_analysis(  # noqa: PLR0913
+    activities: pl.DataFrame | list[ParsedActivity],
     display_days: int | None = None,
     wellness_data: list[ParsedWellness] | None = None,
     power_curve: list[ParsedPowerCurve] | None = None,
     client: IntervalsClient | None = None,
+    *,
+    pmc: pl.DataFrame | None = None,
+    planned_stress: pl.DataFrame | None = None,
+    providers: Collection[str] | None = None,
+    widgets: bool = True,
+    profile: bool = False,
 ) -> AnalysisResult:
     """Compute a complete sports science analysis using registered providers.
 
     Args:
-        activities: The activities to analyze.
+        activities: The activities to analyze, either parsed or as a DataFrame with the `ACTIVITY_SCHEMA`.
         display_days: The number of days to include in the dashboard widgets.
         wellness_data: Optional wellness data to analyze trends.
-        power_curve: Optional power curve data (handled by provider directly).
-        client: Optional Intervals.icu client for provider-specific data fetching.
+        power_curve: Optional power curve data, shared with the providers instead of being fetched again.
+        client: Optional Intervals.icu client for fetching datasets that were not provided.
+        pmc: Optional persisted PMC of the athlete, used instead of computing it over the analyzed days only.
+        planned_stress: Optional daily training stress of the athlete's stored plans, projected beyond the analyzed days.
+        providers: Names of the providers to compute, together with their dependencies. None computes all providers.
+        widgets: Whether to build the dashboard widgets.
+        profile: Whether to return the time and peak allocation of each provider phase with the result.
 
     Returns:
         The analysis result including provider results and widgets.
     """
-    if not activities and not wellness_data and not power_curve:
+    activities_df = activities if isinstance(activities, pl.DataFrame) else activities_to_frame(activities)
+    if activities_df.is_empty() and not wellness_data and not power_curve:
         return AnalysisResult()
 
-    # 1. Initialize DataFrame and daily aggregation
-    _, daily = _init_activities_df(activities)
-
-    # 2. Determine full date range and join all dates
-    min_date, max_date = _get_analysis_range(daily, wellness_data)
-
-    if min_date is None or max_date is None:
+    daily = daily_frame(activities_df, wellness_data)
+    if daily is None:
         return AnalysisResult()
 
-    all_dates = pl.DataFrame({"date": pl.date_range(start=min_date, end=max_date, interval="1d", eager=True)})
-    daily = all_dates.join(daily, on="date", how="left").with_columns(pl.col("training_stress").fill_null(0))
-
-    # 3. Join wellness data if provided
-    if wellness_data:
-        df_wellness = pl.from_dicts([w.__dict__ for w in wellness_data]).with_columns(
-            pl.col("date").str.to_date("%Y-%m-%d")
-        )
-        daily = daily.join(df_wellness, on="date", how="left")
+    context = AnalysisContext(client=client)
+    if power_curve is not None:
+        context.datasets[Dataset.POWER_CURVES] = power_curve
+    if pmc is not None:
+        context.datasets[Dataset.PMC] = pmc
+    if planned_stress is not None:
+        context.datasets[Dataset.PLANNED_STRESS] = planned_stress
 
-    # 4. Trigger Provider Analysis (New Dynamic Architecture)
+    profiler = ProviderProfiler(registry.metrics, trace_memory=profile)
     provider_results, provider_widgets = registry.process_analysis(
         daily,
-        client=client,
+        context=context,
         display_days=display_days,
+        profiler=profiler,
+        providers=providers,
+        widgets=widgets,
     )
 
     return AnalysisResult(
         provider_results=provider_results,
         widgets=provider_widgets,
+        profile=profiler.timings if profile else [],
     )
 
 
-def _init_activities_df(activities: list[ParsedActivity]) -> tuple[pl.DataFrame, pl.DataFrame]:
-    """Initialize the activities DataFrame and aggregate daily stress.
+def build_daily_frame(
+    activities: pl.DataFrame, wellness_data: list[ParsedWellness] | None = None
+) -> pl.DataFrame | None:
+    """Build the daily frame consumed by the metric providers.
 
     Args:
-        activities: The list of parsed activities.
+        activities: The activities with the `ACTIVITY_SCHEMA`.
+        wellness_data: Optional wellness data joined onto the days.
 
     Returns:
-        A tuple of (full_activities_df, daily_aggregated_df).
+        One row per day of the analysis range, or None if there is no data at all.
     """
-    if not activities:
-        # Return empty dataframes with correct schemas if no activities
-        df = pl.DataFrame(schema={"date": pl.Date, "training_stress": pl.Float64})
-        return df, df
-
-    # Normalize zone data during creation
-    # Power zones come as list of dicts [{"secs": 10}, ...], convert to list of ints
-    data = []
-    for a in activities:
-        d = {
-            "date": a.date,
-            "training_stress": a.training_stress,
-            "duration_h": a.duration_h,
-            "distance_km": a.distance_km,
-            "hr_zone_times": a.hr_zone_times,
-            "type": a.type,
-        }
-        if a.power_zone_times:
-            d["power_zone_times"] = [z.get("secs", 0) for z in a.power_zone_times]
-        else:
-            d["power_zone_times"] = []
-        data.append(d)
-
-    df = pl.from_dicts(data).with_columns(pl.col("date").str.to_date("%Y-%m-%d"))
-    daily = df.group_by("date").agg([
-        pl.sum("training_stress"),
-        pl.sum("duration_h"),
-        pl.sum("distance_km"),
-        pl.col("hr_zone_times"),
-        pl.col("power_zone_times"),
-        pl.col("type").alias("types"),
-        pl.col("duration_h").alias("activity_durations"),
-    ])
-    return df, daily
-
-
-def _get_analysis_range(
-    daily: pl.DataFrame, wellness_data: list[ParsedWellness] | None
-) -> tuple[date | None, date | None]:
-    """Determine the date range for analysis.
+    daily = daily_frame(activities, wellness_data)
+    return None if daily is None else cast("pl.DataFrame", daily.collect(engine=DAILY_FRAME_ENGINE))
+
+
+def daily_frame(activities: pl.DataFrame, wellness_data: list[ParsedWellness] | None = None) -> pl.LazyFrame | None:
+    """Build the query of the daily frame consumed by the metric providers.
+
+    The days from the first to the last activity or wellness entry are generated by `pl.date_range` and the daily
+    activity aggregates and wellness data are joined onto them in date order. Nothing is computed until the query is
+    collected, which the registry does together with the providers' aggregations.
 
     Args:
-        daily: The daily aggregated activities.
-        wellness_data: Optional wellness data.
+        activities: The activities with the `ACTIVITY_SCHEMA`.
+        wellness_data: Optional wellness data joined onto the days.
 
     Returns:
-        A tuple of (min_date, max_date).
+        The query of one row per day of the analysis range, or None if there is no data at all.
     """
-    dates = daily["date"].to_list()
-    if wellness_data:
-        dates.extend([datetime.strptime(w.date, "%Y-%m-%d").replace(tzinfo=UTC).date() for w in wellness_data])
+    if activities.is_empty() and not wellness_data:
+        return None
+
+    # 1. Daily aggregation of the activities
+    daily = _daily_activities(activities)
+    wellness = (
+        pl.from_dicts([w.__dict__ for w in wellness_data]).lazy().with_columns(pl.col("date").str.to_date("%Y-%m-%d"))
+        if wellness_data
+        else None
+    )
 
-    if not dates:
-        return None, None
+    # 2. Generate every date of the analysis range and join the days onto it
+    dates = pl.concat([frame.select("date") for frame in (daily, wellness) if frame is not None])
+    all_dates = dates.select(pl.date_range(pl.col("date").min(), pl.col("date").max(), interval="1d").alias("date"))
+    days = all_dates.join(daily, on="date", how="left", maintain_order="left").with_columns(
+        pl.col("training_stress").fill_null(0)
+    )
+    if not activities.is_empty():
+        # The FTP stays valid until the next activity reports another one
+        days = days.with_columns(pl.col("ftp").forward_fill())
+
+    # 3. Join wellness data if provided
+    if wellness is not None:
+        days = days.join(wellness, on="date", how="left", maintain_order="left")
+    return days
+
+
+def _daily_activities(activities: pl.DataFrame) -> pl.LazyFrame:
+    """Aggregate the activities into daily stress.
 
-    return min(dates), max(dates)
+    Args:
+        activities: The activities with the `ACTIVITY_SCHEMA`.
+
+    Returns:
+        The query of one row per day with activities.
+    """
+    if activities.is_empty():
+        # Without activities the days only carry a training stress of zero
+        return pl.LazyFrame(schema={"date": pl.Date, "training_stress": pl.Float64})
+
+    return (
+        activities
+        .lazy()
+        .group_by("date")
+        .agg([
+            pl.sum("training_stress"),
+            pl.sum("duration_h"),
+            pl.sum("distance_km"),
+            # Zone times of all activities of the day, summed per zone
+            sum_zones(pl.col("hr_zone_times")),
+            sum_zones(pl.col("power_zone_times")),
+            pl.max("hr_zone_count", "power_zone_count"),
+            pl.col("type").alias("types"),
+            pl.col("duration_h").alias("activity_durations"),
+            # Rows keep their order within a group, the last reported FTP of the day wins
+            pl.col("ftp").drop_nulls().last(),
+        ])
+    )
 
 
 def compute_load(activities: list[ParsedActivity], client: IntervalsClient | None = None) -> TrainingLoad:
@@ -149,7 +186,8 @@ def compute_load(activities: list[ParsedActivity], client: IntervalsClient | Non
     Returns:
         The training load (CTL, ATL & TSB).
     """
-    analysis = compute_analysis(activities, client=client)
+    # Only the PMC values are read, skip the other providers and all widgets
+    analysis = compute_analysis(activities, client=client, providers={"pmc"}, widgets=False)
     pmc_res = analysis.provider_results.get("pmc")
     if not pmc_res:
         return TrainingLoad(chronic=0.0, acute=0.0)
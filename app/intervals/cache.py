@@ -0,0 +1,227 @@
+"""Process-wide HTTP cache for intervals.icu requests."""
+
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import timedelta
+from hashlib import sha256
+from typing import TYPE_CHECKING, Any, override
+from urllib.parse import urlparse
+
+from requests_cache import DO_NOT_CACHE, CachedSession, create_key, init_backend
+from requests_cache.backends.base import DictStorage
+
+from app.config import CacheBackend, get_settings
+from app.intervals.client import create_pooled_session
+
+if TYPE_CHECKING:
+    from requests import PreparedRequest, Session
+    from requests_cache.models import AnyRequest, AnyResponse
+    from requests_cache.policy import ExpirationTime
+
+    from app.config import Settings
+
+CACHE_NAME = "intervals_cache"
+
+
+@dataclass
+class CacheStats:
+    """Thread-safe cache hit/miss counters per intervals.icu endpoint."""
+
+    hits: Counter[str] = field(default_factory=Counter)
+    misses: Counter[str] = field(default_factory=Counter)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def record(self, url: str, *, hit: bool) -> None:
+        """Records a cache lookup.
+
+        Args:
+            url: The requested URL.
+            hit: Whether the response was served from the cache.
+        """
+        endpoint = urlparse(url).path.rsplit("/", 1)[-1]
+        with self._lock:
+            (self.hits if hit else self.misses)[endpoint] += 1
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert the counters to a dictionary.
+
+        Returns:
+            The total and per-endpoint hits and misses.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits.total(),
+                "misses": self.misses.total(),
+                "endpoints": {
+                    endpoint: {"hits": self.hits[endpoint], "misses": self.misses[endpoint]}
+                    for endpoint in sorted(self.hits.keys() | self.misses.keys())
+                },
+            }
+
+
+class LRUStorage(DictStorage):
+    """In-memory response storage that evicts the least recently used entries."""
+
+    def __init__(self, maxsize: int, *args: Any, **kwargs: Any) -> None:  # noqa: ANN401
+        """Initializes the storage.
+
+        Args:
+            maxsize: Maximum number of stored responses.
+            *args: Passed to the underlying dict.
+            **kwargs: Passed to the underlying dict.
+        """
+        super().__init__(*args, **kwargs)
+        self.maxsize = maxsize
+
+    @override
+    def __getitem__(self, key: str) -> Any:
+        item = super().__getitem__(key)
+        # Re-insert to mark the entry as most recently used
+        self.data[key] = self.data.pop(key)
+        return item
+
+    @override
+    def __setitem__(self, key: str, item: Any) -> None:
+        self.data.pop(key, None)
+        self.data[key] = item
+        while len(self.data) > self.maxsize:
+            del self.data[next(iter(self.data))]
+
+
+class InstrumentedCachedSession(CachedSession):
+    """Cached session that counts cache hits and misses."""
+
+    def __init__(self, *args: Any, stats: CacheStats, **kwargs: Any) -> None:  # noqa: ANN401
+        """Initializes the session.
+
+        Args:
+            *args: Passed to `CachedSession`.
+            stats: The counters to update for every response.
+            **kwargs: Passed to `CachedSession`.
+        """
+        super().__init__(*args, **kwargs)
+        self.stats = stats
+
+    @override
+    def send(
+        self,
+        request: PreparedRequest,
+        expire_after: ExpirationTime = None,
+        only_if_cached: bool = False,
+        refresh: bool = False,
+        force_refresh: bool = False,
+        **kwargs: Any,
+    ) -> AnyResponse:
+        response = super().send(
+            request,
+            expire_after=expire_after,
+            only_if_cached=only_if_cached,
+            refresh=refresh,
+            force_refresh=force_refresh,
+            **kwargs,
+        )
+        self.stats.record(request.url or "", hit=getattr(response, "from_cache", False))
+        return response
+
+
+def credential_key(request: AnyRequest, **kwargs: Any) -> str:  # noqa: ANN401
+    """Creates the cache key of a request, scoped to its credentials.
+
+    requests-cache leaves the `Authorization` header out of the key, so a client with another API key would be served
+    the responses of the athlete that fetched them first. The header is hashed into the key instead, and stays redacted
+    from the stored requests.
+
+    Args:
+        request: The request to create the key for.
+        **kwargs: Passed to `create_key`.
+
+    Returns:
+        The cache key.
+    """
+    credentials = request.headers.get("Authorization") or ""
+    return sha256(f"{create_key(request, **kwargs)}:{credentials}".encode()).hexdigest()
+
+
+def _hours(hours: int) -> timedelta | int:
+    """Converts a configured TTL to a requests-cache expiration.
+
+    Returns:
+        The expiration, `DO_NOT_CACHE` for non-positive values.
+    """
+    return timedelta(hours=hours) if hours > 0 else DO_NOT_CACHE
+
+
+def create_http_session(settings: Settings, stats: CacheStats) -> Session:
+    """Creates the pooled session used for all intervals.icu requests.
+
+    Args:
+        settings: The application settings.
+        stats: The counters to update for every cached response.
+
+    Returns:
+        A cached session if any TTL is configured, else a plain pooled session.
+    """
+    if settings.CACHE_INTERVALS_HOURS <= 0 and settings.CACHE_POWER_CURVES_HOURS <= 0:
+        return create_pooled_session()
+
+    backend = init_backend(CACHE_NAME, settings.CACHE_BACKEND)
+    if settings.CACHE_BACKEND == CacheBackend.MEMORY:
+        backend.responses = LRUStorage(maxsize=settings.CACHE_MAX_ENTRIES)
+
+    session = InstrumentedCachedSession(
+        backend=backend,
+        stats=stats,
+        key_fn=credential_key,
+        expire_after=_hours(settings.CACHE_INTERVALS_HOURS),
+        # Power curves change far less often than today's activities
+        urls_expire_after={"*/power-curves": _hours(settings.CACHE_POWER_CURVES_HOURS)},
+    )
+    return create_pooled_session(session)
+
+
+class HttpCache:
+    """Holder of the process-wide session and its cache statistics."""
+
+    def __init__(self) -> None:
+        """Initializes an empty holder."""
+        self.stats = CacheStats()
+        self._session: Session | None = None
+        self._lock = threading.Lock()
+
+    def open(self, settings: Settings) -> Session:
+        """Creates the shared session, replacing any previous one.
+
+        Args:
+            settings: The application settings.
+
+        Returns:
+            The shared session.
+        """
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+            self.stats = CacheStats()
+            self._session = create_http_session(settings, self.stats)
+            return self._session
+
+    def get(self) -> Session:
+        """Returns the shared session, creating it from the settings if the app lifespan did not.
+
+        Returns:
+            The shared session.
+        """
+        with self._lock:
+            if self._session is None:
+                self._session = create_http_session(get_settings(), self.stats)
+            return self._session
+
+    def close(self) -> None:
+        """Closes the shared session and its connection pool."""
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+http_cache = HttpCache()
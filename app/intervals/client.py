@@ -1,56 +1,111 @@
 """Client for intervals.icu."""
 
+import asyncio
 import logging
-from datetime import UTC, datetime, timedelta
+from datetime import UTC, date, datetime, timedelta
 from typing import Any
 
 import requests
 from requests import Session
+from requests.adapters import HTTPAdapter
+
+from app.intervals.parser.stream import ACTIVITY_FIELDS, iter_json_array, project
+from app.intervals.scheduler import RequestScheduler, get_scheduler
 
 _LOGGER = logging.getLogger(__name__)
 BASE_URL = "https://intervals.icu/api/v1"
+POOL_SIZE = 16
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def create_pooled_session(session: Session | None = None, pool_size: int = POOL_SIZE) -> Session:
+    """Mount a keep-alive connection pool on a session.
+
+    Args:
+        session: The session to configure. A plain `requests.Session` is created if omitted.
+        pool_size: Maximum number of pooled connections kept alive per host.
+
+    Returns:
+        The session with the pooled adapter mounted.
+    """
+    session = session or requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+    return session
 
 
 class IntervalsClient:
     """Client for intervals.icu."""
 
-    def __init__(self, api_key: str, athlete_id: str, *, session: Session | None = None) -> None:
+    def __init__(
+        self,
+        api_key: str,
+        athlete_id: str,
+        *,
+        session: Session | None = None,
+        scheduler: RequestScheduler | None = None,
+    ) -> None:
         """Initialise the client."""
         self.api_key = api_key
         self.athlete_id = athlete_id
-        self.session = session or requests
+        self.session = session or create_pooled_session()
+        self.scheduler = scheduler or get_scheduler()
 
-    def activities(self, days: int = 120) -> list[dict[str, Any]]:
-        """Get the activities for the last days.
+    def _get(self, endpoint: str, params: dict[str, str]) -> Any:  # noqa: ANN401
+        """Perform a scheduled GET request against an athlete endpoint.
+
+        Args:
+            endpoint: The endpoint below the athlete, e.g. 'activities'.
+            params: The query parameters.
 
         Returns:
-            The activities.
+            The decoded JSON response.
         """
-        params = {"oldest": (datetime.now(tz=UTC).date() - timedelta(days=days)).isoformat()}
-        r = self.session.get(
-            f"{BASE_URL}/athlete/{self.athlete_id}/activities",
-            auth=("API_KEY", self.api_key),
+        r = self.scheduler.get(
+            self.session,
+            f"{BASE_URL}/athlete/{self.athlete_id}/{endpoint}",
+            self.api_key,
             params=params,
-            timeout=10,
         )
         r.raise_for_status()
         return r.json()
 
-    def wellness(self, days: int = 120) -> list[dict[str, Any]]:
-        """Get the wellness data for the last days.
+    def activities(self, days: int = 120, oldest: date | None = None) -> list[dict[str, Any]]:
+        """Get the activities for the last days.
+
+        Args:
+            days: The number of days to fetch.
+            oldest: Optional oldest date to fetch, takes precedence over `days`.
 
         Returns:
-            The wellness data.
+            The activities, restricted to the fields used by the parsers.
         """
-        params = {"oldest": (datetime.now(tz=UTC).date() - timedelta(days=days)).isoformat()}
-        r = self.session.get(
-            f"{BASE_URL}/athlete/{self.athlete_id}/wellness",
-            auth=("API_KEY", self.api_key),
+        oldest = oldest or datetime.now(tz=UTC).date() - timedelta(days=days)
+        params = {"oldest": oldest.isoformat()}
+        r = self.scheduler.get(
+            self.session,
+            f"{BASE_URL}/athlete/{self.athlete_id}/activities",
+            self.api_key,
             params=params,
-            timeout=10,
+            stream=True,
         )
-        r.raise_for_status()
-        return r.json()
+        with r:
+            r.raise_for_status()
+            # Activities carry many unused fields, decode them one by one and keep only the ones that are parsed
+            return [project(a, ACTIVITY_FIELDS) for a in iter_json_array(r.iter_content(STREAM_CHUNK_SIZE))]
+
+    def wellness(self, days: int = 120, oldest: date | None = None) -> list[dict[str, Any]]:
+        """Get the wellness data for the last days.
+
+        Args:
+            days: The number of days to fetch.
+            oldest: Optional oldest date to fetch, takes precedence over `days`.
+
+        Returns:
+            The wellness data.
+        """
+        oldest = oldest or datetime.now(tz=UTC).date() - timedelta(days=days)
+        params = {"oldest": oldest.isoformat()}
+        return self._get("wellness", params)
 
     def power_curves(self, curves: str = "90d", activity_type: str = "Ride") -> dict[str, Any]:
         """Get the power curves for the athlete.
@@ -63,11 +118,56 @@ class IntervalsClient:
             The power curves data.
         """
         params = {"curves": curves, "type": activity_type}
-        r = self.session.get(
-            f"{BASE_URL}/athlete/{self.athlete_id}/power-curves",
-            auth=("API_KEY", self.api_key),
-            params=params,
-            timeout=10,
-        )
-        r.raise_for_status()
-        return r.json()
+        return self._get("power-curves", params)
+
+
+class AsyncIntervalsClient:
+    """Async client for intervals.icu.
+
+    Requests are dispatched to worker threads and share the (pooled) session of the wrapped client, so the event loop
+    is never blocked and independent endpoints can be fetched concurrently.
+    """
+
+    def __init__(self, client: IntervalsClient) -> None:
+        """Initialise the client.
+
+        Args:
+            client: The synchronous client used to perform the requests.
+        """
+        self.client = client
+
+    async def activities(self, days: int = 120, oldest: date | None = None) -> list[dict[str, Any]]:
+        """Get the activities for the last days.
+
+        Args:
+            days: The number of days to fetch.
+            oldest: Optional oldest date to fetch, takes precedence over `days`.
+
+        Returns:
+            The activities.
+        """
+        return await asyncio.to_thread(self.client.activities, days, oldest)
+
+    async def wellness(self, days: int = 120, oldest: date | None = None) -> list[dict[str, Any]]:
+        """Get the wellness data for the last days.
+
+        Args:
+            days: The number of days to fetch.
+            oldest: Optional oldest date to fetch, takes precedence over `days`.
+
+        Returns:
+            The wellness data.
+        """
+        return await asyncio.to_thread(self.client.wellness, days, oldest)
+
+    async def power_curves(self, curves: str = "90d", activity_type: str = "Ride") -> dict[str, Any]:
+        """Get the power curves for the athlete.
+
+        Args:
+            curves: The time range for the curves (e.g., '90d', 'all', 's0').
+            activity_type: The activity type (e.g., 'Ride', 'Run').
+
+        Returns:
+            The power curves data.
+        """
+        return await asyncio.to_thread(self.client.power_curves, curves, activity_type)
@@ -0,0 +1,116 @@
+"""Critical power models fitted to the power curve."""
+
+import math
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import polars as pl
+
+if TYPE_CHECKING:
+    from app.intervals.parser.power_curve import ParsedPowerCurve
+
+# Durations fitted by the 2-parameter model, where the hyperbolic power-duration relationship holds
+CP_MIN_SECS = 120
+CP_MAX_SECS = 1200
+# Number of log-spaced durations sampled from the curve, so the densely recorded short efforts do not dominate the fit
+SAMPLES = 48
+# Candidate time constants k = W' / (Pmax - CP) of the 3-parameter model in seconds
+TIME_CONSTANT_GRID = tuple(range(1, 121))
+# The FTP is estimated as a share of CP: the hyperbolic model extrapolated to one hour lies above CP, while the FTP
+# measured in the field is at or slightly below it
+FTP_CP_RATIO = 0.95
+
+
+@dataclass(frozen=True)
+class CriticalPowerFit:
+    """Fitted critical power model: power(t) = cp + w_prime / (t + time_constant).
+
+    The 2-parameter model has a time constant of zero and no maximal power.
+    """
+
+    cp: float
+    w_prime: float
+    time_constant: float
+    pmax: float | None
+    ftp: float
+    rmse: float
+
+    def power(self, secs: float) -> float:
+        """Returns the modelled power of a duration.
+
+        Args:
+            secs: The duration in seconds.
+
+        Returns:
+            The sustainable power in watts.
+        """
+        return self.cp + self.w_prime / (secs + self.time_constant)
+
+
+def _samples(curve: ParsedPowerCurve, min_secs: float, max_secs: float) -> pl.DataFrame | None:
+    """Samples the curve at log-spaced durations.
+
+    Returns:
+        The durations `t` and their powers `p`, or None if the curve does not cover enough of the range.
+    """
+    if not curve.secs:
+        return None
+    low, high = max(min_secs, curve.secs[0], 1), min(max_secs, curve.secs[-1])
+    if high <= low * 2:
+        return None
+    durations = [low * (high / low) ** (i / (SAMPLES - 1)) for i in range(SAMPLES)]
+    return pl.DataFrame({"t": durations, "p": curve.watts_at(durations)}, schema={"t": pl.Float64, "p": pl.Float64})
+
+
+def fit_critical_power(curve: ParsedPowerCurve, *, three_parameter: bool = True) -> CriticalPowerFit | None:
+    """Fits a critical power model to a power curve by least squares.
+
+    For a fixed time constant k the model is linear in 1 / (t + k), so CP and W' have a closed-form least-squares
+    solution. The sums of all candidate time constants are computed in a single Polars query and the constant with the
+    smallest error wins. The 2-parameter model is the case k = 0, fitted to the durations of 2 to 20 minutes.
+
+    Args:
+        curve: The power curve.
+        three_parameter: Whether to fit the 3-parameter model, which also covers short durations and yields Pmax.
+
+    Returns:
+        The best fit, or None if the curve does not cover the fitted durations or yields no positive CP and W'.
+    """
+    samples = _samples(curve, 1 if three_parameter else CP_MIN_SECS, CP_MAX_SECS)
+    if samples is None:
+        return None
+
+    constants = TIME_CONSTANT_GRID if three_parameter else (0,)
+    p = pl.col("p")
+    x = {k: 1 / (pl.col("t") + k) for k in constants}
+    sums = samples.select(
+        p.sum().alias("p"),
+        (p * p).sum().alias("pp"),
+        *(x[k].sum().alias(f"x{k}") for k in constants),
+        *((x[k] * x[k]).sum().alias(f"xx{k}") for k in constants),
+        *((x[k] * p).sum().alias(f"xp{k}") for k in constants),
+    ).row(0, named=True)
+
+    n = samples.height
+    best: CriticalPowerFit | None = None
+    for k in constants:
+        sx, sxx, sxp = sums[f"x{k}"], sums[f"xx{k}"], sums[f"xp{k}"]
+        denominator = n * sxx - sx * sx
+        if denominator <= 0:
+            continue
+        w_prime = (n * sxp - sx * sums["p"]) / denominator
+        cp = (sums["p"] - w_prime * sx) / n
+        if cp <= 0 or w_prime <= 0:
+            continue
+        # Residual sum of squares of the least-squares solution
+        rmse = math.sqrt(max(0.0, sums["pp"] - cp * sums["p"] - w_prime * sxp) / n)
+        if best is None or rmse < best.rmse:
+            best = CriticalPowerFit(
+                cp=cp,
+                w_prime=w_prime,
+                time_constant=k,
+                pmax=cp + w_prime / k if k else None,
+                ftp=FTP_CP_RATIO * cp,
+                rmse=rmse,
+            )
+    return best
@@ -6,6 +6,7 @@ from typing import TYPE_CHECKING, Any, Self
 if TYPE_CHECKING:
     import polars as pl
 
+    from app.planning.providers.instrumentation import ProviderTiming
     from app.planning.providers.interfaces import DashboardWidget
 
 
@@ -40,6 +41,8 @@ class AnalysisResult:
 
     provider_results: dict[str, Any] = field(default_factory=dict)
     widgets: list[DashboardWidget] = field(default_factory=list)
+    # Provider measurements, only collected for profiled requests
+    profile: list[ProviderTiming] = field(default_factory=list)
 
     def to_dict(self) -> dict[str, Any]:
         """Convert the analysis result to a dictionary.
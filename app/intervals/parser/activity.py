@@ -1,11 +1,105 @@
 """Parse an activity from intervals.icu."""
 
 import logging
-from dataclasses import dataclass
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date
 from typing import Any
 
+import polars as pl
+
+from app.intervals.parser.stream import ColumnBuffer
+
 _LOGGER = logging.getLogger(__name__)
 
+# Zone times are stored as fixed-width arrays, zero padded up to this many zones. Intervals.icu defaults to 7 HR zones
+# and 7 power zones plus Sweet Spot, which leaves room for custom zones. Zones beyond the width are dropped
+MAX_ZONES = 10
+ZONE_TIMES = pl.Array(pl.Int32, MAX_ZONES)
+
+# Schema of the activities DataFrame, one column per `ParsedActivity` field plus the number of zones of each zone column
+ACTIVITY_SCHEMA = pl.Schema({
+    "date": pl.Date,
+    "duration_h": pl.Float64,
+    "training_stress": pl.Float64,
+    "avg_power": pl.Float64,
+    "type": pl.String,
+    "calories": pl.Float64,
+    "avg_hr": pl.Float64,
+    "max_hr": pl.Float64,
+    "distance_km": pl.Float64,
+    "elevation_gain": pl.Float64,
+    "hr_zone_times": ZONE_TIMES,
+    "power_zone_times": ZONE_TIMES,
+    "ftp": pl.Float64,
+    "hr_zone_count": pl.UInt8,
+    "power_zone_count": pl.UInt8,
+})
+
+# Raw intervals.icu fields read by `parse_activities_frame`
+_RAW_SCHEMA = pl.Schema({
+    "start_date_local": pl.String,
+    "moving_time": pl.Float64,
+    "icu_training_load": pl.Float64,
+    "icu_average_watts": pl.Float64,
+    "type": pl.String,
+    "calories": pl.Float64,
+    "average_heartrate": pl.Float64,
+    "max_heartrate": pl.Float64,
+    "icu_distance": pl.Float64,
+    "total_elevation_gain": pl.Float64,
+    "icu_hr_zone_times": pl.List(pl.Int32),
+    "icu_zone_times": pl.List(pl.Struct({"secs": pl.Int64})),
+    "icu_ftp": pl.Float64,
+})
+# Zone columns of parsed activities before they are normalised by `zone_columns`
+_LIST_ZONE_SCHEMA = {"hr_zone_times": pl.List(pl.Int32), "power_zone_times": pl.List(pl.Int32)}
+_REQUIRED_FIELDS = ("start_date_local", "moving_time", "icu_training_load", "type", "calories")
+
+
+def zone_columns(column: str, times: pl.Expr) -> dict[str, pl.Expr]:
+    """Normalises variable-length zone times into a fixed-width array and its number of zones.
+
+    Args:
+        column: The name of the zone column, e.g. `hr_zone_times`.
+        times: The zone times in seconds as a list, null if the activity has none.
+
+    Returns:
+        The zero-padded `ZONE_TIMES` array and the zone count named after the column, e.g. `hr_zone_count`.
+    """
+    padding = pl.lit([0] * MAX_ZONES, dtype=pl.List(pl.Int32))
+    return {
+        column: times.fill_null([]).list.concat(padding).list.head(MAX_ZONES).list.to_array(MAX_ZONES),
+        zone_count_column(column): times.list.len().clip(upper_bound=MAX_ZONES).fill_null(0).cast(pl.UInt8),
+    }
+
+
+def zone_count_column(column: str) -> str:
+    """Returns the name of the zone count column of a zone column.
+
+    Args:
+        column: The name of the zone column, e.g. `hr_zone_times`.
+
+    Returns:
+        The name of its zone count column, e.g. `hr_zone_count`.
+    """
+    return column.removesuffix("_times") + "_count"
+
+
+def sum_zones(times: pl.Expr) -> pl.Expr:
+    """Sums zone time arrays slot by slot.
+
+    Polars cannot sum array columns directly, so every slot is summed as its own column and the sums are packed into an
+    array again.
+
+    Args:
+        times: The `ZONE_TIMES` arrays to sum.
+
+    Returns:
+        The array of the summed time per zone.
+    """
+    return pl.concat_arr([times.arr.get(i).sum() for i in range(MAX_ZONES)])
+
 
 @dataclass
 class ParsedActivity:
@@ -64,3 +158,124 @@ def parse_activities(activities: list[dict[str, Any]]) -> list[ParsedActivity]:
     """
     parsed_activities = [parse_activity(a) for a in activities]
     return [a for a in parsed_activities if a is not None]
+
+
+@dataclass(frozen=True)
+class ParsedActivityFrame:
+    """Activities parsed into a typed DataFrame."""
+
+    df: pl.DataFrame
+    # skipped: Number of dropped activities per missing or invalid required field.
+    skipped: Counter[str] = field(default_factory=Counter)
+
+
+def activities_to_frame(activities: list[ParsedActivity]) -> pl.DataFrame:
+    """Convert parsed activities to a DataFrame with the `ACTIVITY_SCHEMA`.
+
+    Returns:
+        The activities as a typed DataFrame.
+    """
+    fields = [name for name in ACTIVITY_SCHEMA if name in ParsedActivity.__dataclass_fields__]
+    buffer = ColumnBuffer(fields)
+    for a in activities:
+        buffer.append({
+            **a.__dict__,
+            # Power zones come as list of dicts [{"secs": 10}, ...], convert to list of ints
+            "power_zone_times": [z.get("secs", 0) for z in a.power_zone_times or []],
+        })
+    columns = {**buffer.columns, "date": [date.fromisoformat(d) for d in buffer.columns["date"]]}
+    schema = {name: _LIST_ZONE_SCHEMA.get(name, ACTIVITY_SCHEMA[name]) for name in fields}
+    return (
+        pl
+        .DataFrame(columns, schema=schema)
+        .with_columns(
+            **zone_columns("hr_zone_times", pl.col("hr_zone_times")),
+            **zone_columns("power_zone_times", pl.col("power_zone_times")),
+        )
+        .select(ACTIVITY_SCHEMA.names())
+    )
+
+
+def parse_activities_frame(activities: list[dict[str, Any]]) -> ParsedActivityFrame:
+    """Parse a list of activities from intervals.icu directly into a typed DataFrame.
+
+    Activities lacking a required field, or carrying a value that cannot be cast to the schema, are dropped and counted
+    per field instead of being logged one by one.
+
+    Args:
+        activities: The raw activities returned by intervals.icu.
+
+    Returns:
+        The activities with the `ACTIVITY_SCHEMA` and the number of skipped activities per reason.
+    """
+    buffer = ColumnBuffer(_RAW_SCHEMA)
+    for a in activities:
+        buffer.append(a)
+    raw = pl.DataFrame(
+        {name: _to_series(name, values, _RAW_SCHEMA[name]) for name, values in buffer.columns.items()},
+        schema=_RAW_SCHEMA,
+    ).with_columns(pl.col("start_date_local").str.slice(0, 10).str.to_date("%Y-%m-%d", strict=False))
+
+    # Attribute every invalid row to its first missing field, so the counts add up to the number of skipped rows
+    reason = pl.when(pl.col(_REQUIRED_FIELDS[0]).is_null()).then(pl.lit(_REQUIRED_FIELDS[0]))
+    for name in _REQUIRED_FIELDS[1:]:
+        reason = reason.when(pl.col(name).is_null()).then(pl.lit(name))
+    raw = raw.with_columns(reason.otherwise(None).alias("_skip_reason"))
+
+    skipped = Counter(dict(raw["_skip_reason"].drop_nulls().value_counts().iter_rows()))
+    if skipped:
+        _LOGGER.warning("Skipped %d malformed activities: %s", skipped.total(), dict(skipped))
+
+    df = (
+        raw
+        .filter(pl.col("_skip_reason").is_null())
+        .select(
+            date=pl.col("start_date_local"),
+            duration_h=pl.col("moving_time") / 3600,
+            training_stress=pl.col("icu_training_load"),
+            avg_power=pl.col("icu_average_watts"),
+            type=pl.col("type"),
+            calories=pl.col("calories"),
+            avg_hr=pl.col("average_heartrate"),
+            max_hr=pl.col("max_heartrate"),
+            distance_km=pl.when(pl.col("icu_distance") != 0).then(pl.col("icu_distance") / 1000),
+            elevation_gain=pl.col("total_elevation_gain"),
+            **zone_columns("hr_zone_times", pl.col("icu_hr_zone_times")),
+            **zone_columns(
+                "power_zone_times",
+                pl
+                .col("icu_zone_times")
+                .list.eval(pl.element().struct.field("secs").fill_null(0))
+                .cast(pl.List(pl.Int32)),
+            ),
+            ftp=pl.col("icu_ftp"),
+        )
+        .select(ACTIVITY_SCHEMA.names())
+    )
+    return ParsedActivityFrame(df=df.cast(ACTIVITY_SCHEMA), skipped=skipped)
+
+
+def _to_series(name: str, values: list[Any], dtype: pl.DataType) -> pl.Series:
+    """Build a series, nulling values that cannot be cast to the dtype.
+
+    Returns:
+        The typed series.
+    """
+    try:
+        return pl.Series(name, values, dtype=dtype, strict=False)
+    except TypeError, ValueError, pl.exceptions.PolarsError:
+        # Nested values that polars cannot coerce, e.g. a string in a zone list: null them row by row
+        return pl.Series(name, [_cast_or_none(v, dtype) for v in values], dtype=dtype, strict=False)
+
+
+def _cast_or_none(value: Any, dtype: pl.DataType) -> Any:  # noqa: ANN401
+    """Return the value if it can be cast to the dtype.
+
+    Returns:
+        The value, or None if it cannot be cast.
+    """
+    try:
+        pl.Series([value], dtype=dtype, strict=False)
+    except TypeError, ValueError, pl.exceptions.PolarsError:
+        return None
+    return value
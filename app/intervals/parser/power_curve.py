@@ -1,35 +1,118 @@
 """Parse power curve data from intervals.icu."""
 
-from dataclasses import dataclass
-from typing import Any
+import hashlib
+import math
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from functools import cached_property
+from itertools import pairwise
+from typing import TYPE_CHECKING, Any
 
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
 
-@dataclass(frozen=True)
-class PowerCurvePoint:
-    """A point on the power curve."""
-
-    secs: int
-    watts: int
+# The window most providers analyze
+PRIMARY_CURVE = "90d"
+# Windows requested from intervals.icu in a single call: the last 42 and 90 days, the current season and all time
+CURVE_WINDOWS = ("42d", PRIMARY_CURVE, "s0", "all")
 
 
 @dataclass(frozen=True)
 class ParsedPowerCurve:
-    """Parsed power curve data."""
+    """Parsed power curve data.
+
+    The durations and powers are stored as parallel arrays ordered by duration, so lookups are binary searches. Between
+    two durations of the curve the power is interpolated linearly in log-duration, which keeps the interpolation
+    monotone like the curve itself.
+    """
 
     id: str
-    points: list[PowerCurvePoint]
+    secs: Sequence[int] = field(default_factory=lambda: array("i"))
+    watts: Sequence[int] = field(default_factory=lambda: array("i"))
+
+    def __post_init__(self) -> None:
+        """Stores the points as integer arrays ordered by duration.
+
+        Raises:
+            ValueError: If the arrays differ in length.
+        """
+        if len(self.secs) != len(self.watts):
+            msg = "The power curve needs one power per duration"
+            raise ValueError(msg)
+        secs, watts = self.secs, self.watts
+        if any(a > b for a, b in pairwise(secs)):
+            order = sorted(range(len(secs)), key=secs.__getitem__)
+            secs, watts = [secs[i] for i in order], [watts[i] for i in order]
+        if not isinstance(secs, array):
+            object.__setattr__(self, "secs", array("i", secs))
+        if not isinstance(watts, array):
+            object.__setattr__(self, "watts", array("i", watts))
+
+    @cached_property
+    def fingerprint(self) -> str:
+        """Digest of the curve's points, identifying identical curves across fetches.
+
+        Returns:
+            The hex digest.
+        """
+        digest = hashlib.blake2b(array("i", self.secs).tobytes(), digest_size=16)
+        digest.update(array("i", self.watts).tobytes())
+        return digest.hexdigest()
+
+    def __hash__(self) -> int:
+        """Hashes the curve by its id and points, so equal curves of different fetches share cache entries.
+
+        Returns:
+            The hash.
+        """
+        return hash((self.id, self.fingerprint))
 
     def get_watts(self, secs: int) -> int | None:
         """Get the watts for a specific duration.
 
         Returns:
-            The watts or None if not found.
+            The watts or None if the duration is not part of the curve.
         """
-        for p in self.points:
-            if p.secs == secs:
-                return p.watts
+        i = bisect_left(self.secs, secs)
+        if i < len(self.secs) and self.secs[i] == secs:
+            return self.watts[i]
         return None
 
+    def interpolate(self, secs: float) -> float | None:
+        """Get the watts for a duration, interpolating between the durations of the curve.
+
+        Args:
+            secs: The duration in seconds.
+
+        Returns:
+            The watts or None if the duration is outside of the curve.
+        """
+        i = bisect_left(self.secs, secs)
+        if i == len(self.secs):
+            return None
+        if self.secs[i] == secs:
+            return float(self.watts[i])
+        if i == 0:
+            return None
+
+        s0, s1 = self.secs[i - 1], self.secs[i]
+        w0, w1 = self.watts[i - 1], self.watts[i]
+        # Zero-second points of malformed payloads have no logarithm, fall back to linear interpolation
+        fraction = (secs - s0) / (s1 - s0) if s0 <= 0 else math.log(secs / s0) / math.log(s1 / s0)
+        return w0 + (w1 - w0) * fraction
+
+    def watts_at(self, secs: Iterable[float]) -> list[float | None]:
+        """Get the interpolated watts of many durations at once.
+
+        Args:
+            secs: The durations in seconds.
+
+        Returns:
+            The watts of each duration, None for durations outside of the curve.
+        """
+        return [self.interpolate(s) for s in secs]
+
 
 def parse_power_curve(data: dict[str, Any]) -> ParsedPowerCurve:
     """Parse a power curve from intervals.icu.
@@ -41,15 +124,14 @@ def parse_power_curve(data: dict[str, Any]) -> ParsedPowerCurve:
         The parsed power curve.
     """
     # Intervals.icu uses parallel arrays 'secs' and 'watts'
-    secs_list = data.get("secs", [])
-    watts_list = data.get("watts", [])
-
-    points = []
-    # Zip them together to create PowerCurvePoint objects
-    for s, w in zip(secs_list, watts_list, strict=False):
-        points.append(PowerCurvePoint(secs=int(s), watts=int(w)))
-
-    return ParsedPowerCurve(id=data.get("id", "unknown"), points=points)
+    secs: Sequence[Any] = data.get("secs") or []
+    watts: Sequence[Any] = data.get("watts") or []
+    n = min(len(secs), len(watts))
+    return ParsedPowerCurve(
+        id=data.get("id", "unknown"),
+        secs=array("i", map(int, secs[:n])),
+        watts=array("i", map(int, watts[:n])),
+    )
 
 
 def parse_power_curves(data: dict[str, Any]) -> list[ParsedPowerCurve]:
@@ -62,3 +144,15 @@ def parse_power_curves(data: dict[str, Any]) -> list[ParsedPowerCurve]:
         The list of parsed power curves.
     """
     return [parse_power_curve(c) for c in data.get("list", [])]
+
+
+def primary_curve(curves: Sequence[ParsedPowerCurve]) -> ParsedPowerCurve | None:
+    """Finds the curve of the primary window.
+
+    Args:
+        curves: The parsed power curves.
+
+    Returns:
+        The curve of the `PRIMARY_CURVE` window, the first curve if no curve has that id, or None without curves.
+    """
+    return next((c for c in curves if c.id == PRIMARY_CURVE), curves[0] if curves else None)
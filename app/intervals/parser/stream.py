@@ -0,0 +1,172 @@
+"""Incremental decoding of large intervals.icu JSON payloads."""
+
+import codecs
+import json
+from enum import Enum, auto
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Mapping
+
+# Raw activity fields read by the parsers, everything else is dropped while streaming
+ACTIVITY_FIELDS = (
+    "id",
+    "start_date_local",
+    "type",
+    "moving_time",
+    "icu_training_load",
+    "icu_average_watts",
+    "calories",
+    "average_heartrate",
+    "max_heartrate",
+    "icu_distance",
+    "total_elevation_gain",
+    "icu_hr_zone_times",
+    "icu_zone_times",
+    "icu_ftp",
+)
+
+_WHITESPACE = " \t\r\n"
+
+
+class _State(Enum):
+    """Position of the decoder within the top-level array."""
+
+    START = auto()
+    FIRST = auto()
+    VALUE = auto()
+    SEPARATOR = auto()
+    END = auto()
+
+
+_TRANSITIONS = {
+    (_State.START, "["): _State.FIRST,
+    (_State.FIRST, "]"): _State.END,
+    (_State.SEPARATOR, ","): _State.VALUE,
+    (_State.SEPARATOR, "]"): _State.END,
+}
+
+
+class JSONArrayDecoder:
+    """Push decoder for a top-level JSON array.
+
+    Only the element being decoded and the undecoded remainder of the last chunk are held in memory, so the full payload
+    is never materialised as one Python object.
+    """
+
+    def __init__(self) -> None:
+        """Initializes a decoder expecting the opening bracket."""
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._state = _State.START
+
+    def feed(self, chunk: bytes, *, final: bool = False) -> Iterator[Any]:
+        """Decodes the elements completed by a chunk.
+
+        Args:
+            chunk: The next UTF-8 encoded part of the payload.
+            final: Whether this is the last chunk.
+
+        Yields:
+            The elements completed by the chunk.
+
+        Raises:
+            ValueError: If the payload is not a JSON array.
+        """
+        self._buffer = self._buffer[self._pos :] + self._utf8.decode(chunk, final=final)
+        self._pos = 0
+        while (char := self._next_char()) is not None:
+            if (state := _TRANSITIONS.get((self._state, char))) is not None:
+                self._pos, self._state = self._pos + 1, state
+                continue
+            if self._state not in {_State.FIRST, _State.VALUE}:
+                msg = f"Unexpected {char!r} in JSON array"
+                raise ValueError(msg)
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                return  # The element continues in the next chunk
+            if end == len(self._buffer) and not final:
+                return  # A trailing number might continue in the next chunk
+            yield value
+            self._pos, self._state = end, _State.SEPARATOR
+
+    def close(self) -> None:
+        """Checks that the whole array was decoded.
+
+        Raises:
+            ValueError: If the array is incomplete.
+        """
+        if self._state is not _State.END:
+            msg = "Incomplete JSON array"
+            raise ValueError(msg)
+
+    def _next_char(self) -> str | None:
+        """Skips whitespace.
+
+        Returns:
+            The next significant character, or None if the buffer is exhausted.
+        """
+        while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+            self._pos += 1
+        return self._buffer[self._pos] if self._pos < len(self._buffer) else None
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """Decodes a top-level JSON array element by element.
+
+    Args:
+        chunks: The UTF-8 encoded payload, e.g. from `Response.iter_content`.
+
+    Yields:
+        The decoded elements of the array.
+    """
+    decoder = JSONArrayDecoder()
+    for chunk in chunks:
+        yield from decoder.feed(chunk)
+    yield from decoder.feed(b"", final=True)
+    decoder.close()
+
+
+def project(record: Mapping[str, Any], fields: Iterable[str]) -> dict[str, Any]:
+    """Keeps only the given fields of a record.
+
+    Args:
+        record: The decoded record.
+        fields: The fields to keep.
+
+    Returns:
+        The record restricted to the fields it contains.
+    """
+    return {f: record[f] for f in fields if f in record}
+
+
+class ColumnBuffer:
+    """Collects records column by column, ready to be handed to `pl.DataFrame`."""
+
+    def __init__(self, fields: Iterable[str]) -> None:
+        """Initializes empty columns.
+
+        Args:
+            fields: The names of the columns.
+        """
+        self.columns: dict[str, list[Any]] = {f: [] for f in fields}
+
+    def append(self, values: Mapping[str, Any]) -> None:
+        """Appends a row, missing values become null.
+
+        Args:
+            values: The values of the row by column name.
+        """
+        for name, column in self.columns.items():
+            column.append(values.get(name))
+
+    def __len__(self) -> int:
+        """Returns the number of rows.
+
+        Returns:
+            The number of rows.
+        """
+        return len(next(iter(self.columns.values()), []))
@@ -0,0 +1,214 @@
+"""Vectorised training load models over many time constants."""
+
+import math
+from dataclasses import dataclass
+from itertools import combinations_with_replacement
+from typing import TYPE_CHECKING
+
+import polars as pl
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+# Time constants searched by the Banister fit, around the common 42/7 days
+FITNESS_DAYS_GRID = tuple(range(21, 64, 3))
+FATIGUE_DAYS_GRID = tuple(range(3, 16))
+# Markers required beyond the three fitted parameters to judge a fit
+MIN_EXTRA_MARKERS = 2
+# Share of the markers' variance a fit has to explain before its time constants replace the defaults
+MIN_R_SQUARED = 0.5
+# Relative determinant below which the normal equations are treated as singular
+_SINGULAR = 1e-12
+
+
+def load_column(days: float) -> str:
+    """Returns the column name of a time constant.
+
+    Args:
+        days: The time constant in days.
+
+    Returns:
+        The column name.
+    """
+    return f"load_{days:g}"
+
+
+def impulse_response(stress: pl.Series, time_constants: Iterable[float], initial: float | None = 0.0) -> pl.DataFrame:
+    """Computes the exponentially weighted training load for many time constants in one pass.
+
+    CTL and ATL are the loads of the chronic and acute time constants. All constants are evaluated as expressions of a
+    single Polars query, so the series is scanned once and the constants are computed in parallel.
+
+    Args:
+        stress: The training stress of consecutive days.
+        time_constants: The time constants in days.
+        initial: The load before the first day, None seeds the load with the first day's stress.
+
+    Returns:
+        One column per time constant named by `load_column`, one row per day.
+    """
+    values = stress.cast(pl.Float64).fill_null(0.0)
+    if initial is not None:
+        values = pl.concat([pl.Series([initial], dtype=pl.Float64), values])
+
+    loads = pl.DataFrame({"stress": values}).select(
+        pl.col("stress").ewm_mean(alpha=1 - math.exp(-1 / days), adjust=False).alias(load_column(days))
+        for days in dict.fromkeys(time_constants)
+    )
+    return loads if initial is None else loads.slice(1)
+
+
+@dataclass(frozen=True)
+class BanisterFit:
+    """Fitted impulse-response model: performance = baseline + fitness_gain * fitness - fatigue_gain * fatigue."""
+
+    fitness_days: float
+    fatigue_days: float
+    baseline: float
+    fitness_gain: float
+    fatigue_gain: float
+    rmse: float
+    # Share of the markers' variance explained by the model
+    r_squared: float
+
+
+def ftp_markers(daily_df: pl.DataFrame) -> pl.DataFrame:
+    """Extracts performance markers from the FTP carried in the daily frame.
+
+    The FTP is carried forward between the activities reporting it, so only the days on which it changed are markers.
+
+    Args:
+        daily_df: The daily frame, with an `ftp` column if any activity reported one.
+
+    Returns:
+        The `date` and `performance` of every FTP change.
+    """
+    if "ftp" not in daily_df.columns:
+        return pl.DataFrame(schema={"date": pl.Date, "performance": pl.Float64})
+    ftp = pl.col("ftp")
+    return daily_df.filter(ftp.is_not_null() & ftp.ne_missing(ftp.shift())).select("date", ftp.alias("performance"))
+
+
+def fit_banister(
+    daily_df: pl.DataFrame,
+    markers: pl.DataFrame,
+    fitness_days: Sequence[float] = FITNESS_DAYS_GRID,
+    fatigue_days: Sequence[float] = FATIGUE_DAYS_GRID,
+) -> BanisterFit | None:
+    """Fits the time constants and gains of the Banister model to performance markers.
+
+    The fitness and fatigue components are the training loads of the candidate time constants. For every pair of
+    constants the gains are the least-squares solution of the 3x3 normal equations, whose sums are computed for all
+    pairs in a single Polars query. The pair with the smallest error and non-negative gains wins.
+
+    Args:
+        daily_df: The `date` and `training_stress` of consecutive days.
+        markers: The `date` and `performance` of tests or estimates, e.g. FTP values.
+        fitness_days: Candidate time constants of the fitness component.
+        fatigue_days: Candidate time constants of the fatigue component.
+
+    Returns:
+        The best fit, or None if there are too few markers or no pair has non-negative gains.
+    """
+    constants = list(dict.fromkeys([*fitness_days, *fatigue_days]))
+    loads = impulse_response(daily_df["training_stress"], constants).with_columns(daily_df["date"])
+    observed = loads.join(markers.select("date", "performance").drop_nulls(), on="date", how="inner")
+    n = observed.height
+    if n < 3 + MIN_EXTRA_MARKERS:
+        return None
+
+    y = pl.col("performance")
+    columns = {days: pl.col(load_column(days)) for days in constants}
+    sums = observed.select(
+        y.sum().alias("y"),
+        (y * y).sum().alias("yy"),
+        *(column.sum().alias(f"s{days:g}") for days, column in columns.items()),
+        *((column * y).sum().alias(f"y{days:g}") for days, column in columns.items()),
+        *(
+            (columns[a] * columns[b]).sum().alias(f"p{a:g}_{b:g}")
+            for a, b in combinations_with_replacement(constants, 2)
+        ),
+    ).row(0, named=True)
+
+    def product(a: float, b: float) -> float:
+        return sums[f"p{a:g}_{b:g}"] if f"p{a:g}_{b:g}" in sums else sums[f"p{b:g}_{a:g}"]
+
+    # Total sum of squares of the markers around their mean
+    sst = max(0.0, sums["yy"] - sums["y"] ** 2 / n)
+    best: BanisterFit | None = None
+    for f in fitness_days:
+        for g in fatigue_days:
+            if f <= g:
+                continue
+            matrix = (
+                (n, sums[f"s{f:g}"], sums[f"s{g:g}"]),
+                (sums[f"s{f:g}"], product(f, f), product(f, g)),
+                (sums[f"s{g:g}"], product(f, g), product(g, g)),
+            )
+            rhs = (sums["y"], sums[f"y{f:g}"], sums[f"y{g:g}"])
+            coefficients = _solve3(matrix, rhs)
+            if coefficients is None or coefficients[1] < 0 or coefficients[2] > 0:
+                continue
+            # Residual sum of squares of the least-squares solution
+            sse = max(0.0, sums["yy"] - sum(c * r for c, r in zip(coefficients, rhs, strict=True)))
+            rmse = math.sqrt(sse / n)
+            if best is None or rmse < best.rmse:
+                best = BanisterFit(
+                    fitness_days=f,
+                    fatigue_days=g,
+                    baseline=coefficients[0],
+                    fitness_gain=coefficients[1],
+                    fatigue_gain=-coefficients[2],
+                    rmse=rmse,
+                    r_squared=1 - sse / sst if sst > 0 else 0.0,
+                )
+    return best
+
+
+def fit_time_constants(daily_df: pl.DataFrame) -> BanisterFit | None:
+    """Fits the Banister model to the FTP changes of the daily frame for the PMC time constants.
+
+    A fit is only returned if it explains the markers well and its constants lie inside the searched grid. A best pair
+    on the edge of the grid means the optimum lies outside the plausible range, so the constants are not identified.
+
+    Args:
+        daily_df: The `date`, `training_stress` and `ftp` of consecutive days.
+
+    Returns:
+        The fit, or None if there are too few FTP changes or they are not explained by the training load.
+    """
+    fit = fit_banister(daily_df, ftp_markers(daily_df))
+    if (
+        fit is None
+        or fit.r_squared < MIN_R_SQUARED
+        or fit.fitness_days in {FITNESS_DAYS_GRID[0], FITNESS_DAYS_GRID[-1]}
+        or fit.fatigue_days in {FATIGUE_DAYS_GRID[0], FATIGUE_DAYS_GRID[-1]}
+    ):
+        return None
+    return fit
+
+
+def _solve3(matrix: Sequence[Sequence[float]], rhs: Sequence[float]) -> tuple[float, float, float] | None:
+    """Solves a 3x3 linear system with Cramer's rule.
+
+    Returns:
+        The solution, or None if the system is singular.
+    """
+
+    def det(m: Sequence[Sequence[float]]) -> float:
+        return (
+            m[0][0] * (m[1][1] * m[2][2] - m[1][2] * m[2][1])
+            - m[0][1] * (m[1][0] * m[2][2] - m[1][2] * m[2][0])
+            + m[0][2] * (m[1][0] * m[2][1] - m[1][1] * m[2][0])
+        )
+
+    determinant = det(matrix)
+    if abs(determinant) <= _SINGULAR * abs(matrix[0][0] * matrix[1][1] * matrix[2][2]):
+        return None
+
+    def replaced(column: int) -> tuple[tuple[float, ...], ...]:
+        return tuple(
+            tuple(rhs[i] if j == column else value for j, value in enumerate(row)) for i, row in enumerate(matrix)
+        )
+
+    return (det(replaced(0)) / determinant, det(replaced(1)) / determinant, det(replaced(2)) / determinant)
@@ -0,0 +1,129 @@
+"""Per-user pool of intervals.icu clients."""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, Annotated
+
+from fastapi import Depends
+
+from app.auth.auth import get_current_user_from_token
+from app.intervals.cache import http_cache
+from app.intervals.client import IntervalsClient
+from app.models.user import User, load_user_secrets
+
+if TYPE_CHECKING:
+    import uuid
+    from collections.abc import Callable
+
+    from requests import Session
+
+CLIENT_POOL_SIZE = 128
+CLIENT_TTL_SECONDS = 30 * 60
+
+
+@dataclass
+class _PoolEntry:
+    """A cached client together with its expiry time."""
+
+    client: IntervalsClient
+    expires_at: float
+
+
+class ClientPool:
+    """Bounded LRU of per-user intervals.icu clients with TTL eviction.
+
+    Each user's secrets are loaded and decrypted once per TTL, and the resulting client keeps its session (and thus its
+    keep-alive connections) across requests.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = CLIENT_POOL_SIZE,
+        ttl_seconds: float = CLIENT_TTL_SECONDS,
+        session_factory: Callable[[], Session] = http_cache.get,
+    ) -> None:
+        """Initializes an empty pool.
+
+        Args:
+            maxsize: Maximum number of clients kept in the pool.
+            ttl_seconds: Time after which a client is rebuilt from the user's secrets.
+            session_factory: Factory for the session used by newly created clients.
+        """
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.session_factory = session_factory
+        self._entries: OrderedDict[uuid.UUID, _PoolEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: uuid.UUID) -> IntervalsClient:
+        """Returns the client of a user, creating it from the user's secrets if needed.
+
+        Args:
+            user_id: The ID of the user.
+
+        Returns:
+            The user's intervals.icu client.
+        """
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry.expires_at > time.monotonic():
+                self._entries.move_to_end(user_id)
+                return entry.client
+            self._entries.pop(user_id, None)
+
+        # Resolve the secrets outside of the lock, this hits the database
+        secrets = load_user_secrets(user_id)
+        client = IntervalsClient(
+            secrets.intervals_api_key,
+            secrets.intervals_athlete_id,
+            session=self.session_factory(),
+        )
+
+        with self._lock:
+            self._entries[user_id] = _PoolEntry(client=client, expires_at=time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return client
+
+    def invalidate(self, user_id: uuid.UUID) -> None:
+        """Removes the client of a user, e.g. after their secrets changed.
+
+        Args:
+            user_id: The ID of the user.
+        """
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def __len__(self) -> int:
+        """Returns the number of pooled clients.
+
+        Returns:
+            The number of pooled clients.
+        """
+        return len(self._entries)
+
+
+@lru_cache
+def get_client_pool() -> ClientPool:
+    """Returns the process-wide client pool.
+
+    Returns:
+        The client pool.
+    """
+    return ClientPool()
+
+
+def get_intervals_client(
+    user: Annotated[User, Depends(get_current_user_from_token)],
+    pool: Annotated[ClientPool, Depends(get_client_pool)],
+) -> IntervalsClient:
+    """FastAPI dependency resolving the intervals.icu client of the current user.
+
+    Returns:
+        The user's intervals.icu client.
+    """
+    return pool.get(user.id)
@@ -0,0 +1,240 @@
+"""Rate-limit aware scheduling of intervals.icu requests."""
+
+import logging
+import random
+import threading
+import time
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Any
+
+import requests
+
+from app.utils.singleflight import SingleFlight
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from requests import Response, Session
+
+_LOGGER = logging.getLogger(__name__)
+
+REQUEST_TIMEOUT_SECONDS = 10
+RATE_PER_SECOND = 10.0
+BURST = 20
+MAX_RETRIES = 3
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 8.0
+# Upper bound of a honoured Retry-After delay, a longer one would block the worker thread (and the key) for minutes
+RETRY_AFTER_MAX_SECONDS = 10.0
+RETRY_STATUSES = frozenset({
+    HTTPStatus.TOO_MANY_REQUESTS,
+    HTTPStatus.INTERNAL_SERVER_ERROR,
+    HTTPStatus.BAD_GATEWAY,
+    HTTPStatus.SERVICE_UNAVAILABLE,
+    HTTPStatus.GATEWAY_TIMEOUT,
+})
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parses a `Retry-After` header.
+
+    Args:
+        value: The header value, either delay seconds or an HTTP date.
+
+    Returns:
+        The delay in seconds, or None if the header is missing or invalid.
+    """
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except TypeError, ValueError:
+        return None
+    return max(0.0, (retry_at - datetime.now(UTC)).total_seconds())
+
+
+class TokenBucket:
+    """Thread-safe token bucket smoothing bursts of requests."""
+
+    def __init__(
+        self,
+        rate: float = RATE_PER_SECOND,
+        capacity: int = BURST,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """Initializes a full bucket.
+
+        Args:
+            rate: Tokens refilled per second.
+            capacity: Maximum number of tokens, i.e. the allowed burst.
+            clock: Monotonic clock in seconds.
+            sleep: Function used to wait for tokens.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Blocks until a token is available and consumes it."""
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if now >= self._blocked_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = max(self._blocked_until - now, (1 - self._tokens) / self.rate)
+            self._sleep(wait)
+
+    def block_for(self, seconds: float) -> None:
+        """Holds back all requests, e.g. as instructed by a `Retry-After` header.
+
+        Args:
+            seconds: How long to wait before the next request.
+        """
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, self._clock() + seconds)
+
+
+class RequestScheduler:
+    """Schedules GET requests to intervals.icu.
+
+    Requests are throttled by a token bucket per API key, identical in-flight requests are coalesced into a single
+    upstream call and rate-limited or failed requests are retried with jittered exponential backoff.
+    """
+
+    def __init__(
+        self,
+        rate: float = RATE_PER_SECOND,
+        burst: int = BURST,
+        max_retries: int = MAX_RETRIES,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """Initializes the scheduler.
+
+        Args:
+            rate: Requests per second allowed per API key.
+            burst: Requests allowed in a burst per API key.
+            max_retries: Number of retries after the first attempt.
+            clock: Monotonic clock in seconds.
+            sleep: Function used to wait between attempts.
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self._clock = clock
+        self._sleep = sleep
+        self._buckets: dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+        self._inflight = SingleFlight()
+
+    def _bucket(self, api_key: str) -> TokenBucket:
+        """Returns the token bucket of an API key.
+
+        Returns:
+            The token bucket.
+        """
+        with self._lock:
+            bucket = self._buckets.get(api_key)
+            if bucket is None:
+                bucket = self._buckets[api_key] = TokenBucket(
+                    self.rate, self.burst, clock=self._clock, sleep=self._sleep
+                )
+            return bucket
+
+    def _backoff(self, attempt: int) -> float:  # noqa: PLR6301
+        """Returns a jittered exponential backoff delay.
+
+        Args:
+            attempt: The number of the failed attempt, starting at 0.
+
+        Returns:
+            The delay in seconds.
+        """
+        return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2**attempt))  # noqa: S311
+
+    def _get_with_retries(self, session: Session, url: str, api_key: str, **kwargs: Any) -> Response:  # noqa: ANN401
+        """Performs a GET request, retrying transient failures.
+
+        Connection errors and timeouts of the last attempt are propagated.
+
+        Returns:
+            The final response, which may still be an error response.
+        """
+        bucket = self._bucket(api_key)
+        for attempt in range(self.max_retries):
+            bucket.acquire()
+            try:
+                r = session.get(url, auth=("API_KEY", api_key), **kwargs)
+            except requests.ConnectionError, requests.Timeout:
+                delay = self._backoff(attempt)
+                _LOGGER.warning("Request to %s failed, retrying in %.1fs", url, delay)
+            else:
+                if r.status_code not in RETRY_STATUSES:
+                    return r
+                retry_after = parse_retry_after(r.headers.get("Retry-After"))
+                delay = min(retry_after, RETRY_AFTER_MAX_SECONDS) if retry_after is not None else self._backoff(attempt)
+                _LOGGER.warning("Request to %s returned %s, retrying in %.1fs", url, r.status_code, delay)
+                r.close()
+                if r.status_code == HTTPStatus.TOO_MANY_REQUESTS:
+                    # Rate limits apply per key, so hold back concurrent requests through the bucket as well
+                    bucket.block_for(delay)
+                    continue
+            self._sleep(delay)
+
+        bucket.acquire()
+        return session.get(url, auth=("API_KEY", api_key), **kwargs)
+
+    def get(
+        self,
+        session: Session,
+        url: str,
+        api_key: str,
+        params: dict[str, str] | None = None,
+        *,
+        stream: bool = False,
+    ) -> Response:
+        """Performs a scheduled GET request.
+
+        Args:
+            session: The session used for the request.
+            url: The requested URL.
+            api_key: The intervals.icu API key.
+            params: The query parameters.
+            stream: Whether the body is consumed incrementally by the caller.
+
+        Returns:
+            The response, shared with identical concurrent requests unless streamed.
+        """
+        if stream:
+            # A streamed body can only be consumed once and is therefore never shared
+            return self._get_with_retries(
+                session, url, api_key, params=params, timeout=REQUEST_TIMEOUT_SECONDS, stream=True
+            )
+        key = (api_key, url, tuple(sorted((params or {}).items())))
+        return self._inflight.do(
+            key, lambda: self._get_with_retries(session, url, api_key, params=params, timeout=REQUEST_TIMEOUT_SECONDS)
+        )
+
+
+@lru_cache
+def get_scheduler() -> RequestScheduler:
+    """Returns the process-wide request scheduler.
+
+    Returns:
+        The request scheduler.
+    """
+    return RequestScheduler()
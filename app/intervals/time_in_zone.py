@@ -0,0 +1,71 @@
+"""Rolling time-in-zone distributions of the daily zone times."""
+
+from typing import TYPE_CHECKING
+
+import polars as pl
+
+from app.intervals.parser.activity import MAX_ZONES
+
+if TYPE_CHECKING:
+    from collections.abc import Collection, Sequence
+
+# Rolling windows in days, a window of one day is the distribution of the day itself
+WINDOWS = (1, 7, 28)
+# Power zone indices of the three-zone model behind the polarization index: below the first threshold, between the
+# thresholds and above the second threshold
+THREE_ZONE_MODEL = ((0, 1), (2, 3), (4, 5, 6))
+# Fraction used for an empty moderate or high zone, as the index is undefined for zero
+POLARIZATION_FLOOR = 0.01
+
+
+def window_label(window: int) -> str:
+    """Returns the label of a rolling window.
+
+    Args:
+        window: The window in days.
+
+    Returns:
+        The label, e.g. `7d`.
+    """
+    return f"{window}d"
+
+
+def zone_shares(column: str, window: int, excluded: Collection[int] = ()) -> list[pl.Expr | None]:
+    """Builds the rolling share of every zone of a zone column.
+
+    The zone times of all days within the window are summed before the shares are taken, so the distribution is weighted
+    by the time spent in each activity rather than averaging the distributions of the activities.
+
+    Args:
+        column: The zone column of the daily frame with `ZONE_TIMES` arrays.
+        window: The rolling window in days, one row of the daily frame per day.
+        excluded: Zone indices left out of the total, e.g. Sweet Spot which overlaps other power zones.
+
+    Returns:
+        One expression per zone slot with the share of the window's total time in percent, null without any time in
+        zones. Excluded slots are None.
+    """
+    seconds = [
+        pl.col(column).arr.get(i).fill_null(0).rolling_sum(window_size=window, min_samples=1) for i in range(MAX_ZONES)
+    ]
+    total = pl.sum_horizontal(s for i, s in enumerate(seconds) if i not in excluded)
+    return [None if i in excluded else pl.when(total > 0).then(s * 100 / total) for i, s in enumerate(seconds)]
+
+
+def polarization_index(shares: Sequence[pl.Expr | None]) -> pl.Expr:
+    """Builds the polarization index of rolling power zone shares.
+
+    The index of Treff et al. is `log10(low / moderate * high * 100)` over the fractions of the three-zone model. Values
+    above 2 indicate a polarized distribution.
+
+    Args:
+        shares: The zone shares of `zone_shares` in percent.
+
+    Returns:
+        The index, null without time in the low zone.
+    """
+    low, moderate, high = (
+        pl.sum_horizontal(share for i in zones if (share := shares[i]) is not None) / 100 for zones in THREE_ZONE_MODEL
+    )
+    floor = POLARIZATION_FLOOR
+    return pl.when(low > 0).then((low / moderate.clip(lower_bound=floor) * high.clip(lower_bound=floor) * 100).log10())
@@ -3,9 +3,9 @@
 import asyncio
 import logging
 from contextlib import asynccontextmanager
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
@@ -13,7 +13,10 @@ from app.auth.auth import hash_password
 from app.config import LanguageModel, get_settings
 from app.db import init_db
 from app.dev.bootstrap import bootstrap_dev_user
+from app.intervals.cache import http_cache
+from app.intervals.client import IntervalsClient
 from app.models.user import User
+from app.planning.providers.registry import registry
 from app.routes import api, auth, secrets, web
 from app.services.planner import generate_weekly_plan
 
@@ -31,7 +34,11 @@ async def lifespan(app_: FastAPI) -> AsyncIterator[None]:  # noqa: ARG001
         None
     """
     bootstrap_dev_user()
-    yield
+    http_cache.open(get_settings())
+    try:
+        yield
+    finally:
+        http_cache.close()
 
 
 app = FastAPI(title="Intervals Coach", version="0.1.0", lifespan=lifespan)
@@ -58,6 +65,26 @@ def health_check() -> dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/health/cache", tags=["infra"])
+def cache_stats() -> dict[str, Any]:
+    """Cache statistics of the intervals.icu HTTP cache.
+
+    Returns:
+        The cache hits and misses, in total and per endpoint.
+    """
+    return http_cache.stats.to_dict()
+
+
+@app.get("/metrics", tags=["infra"])
+def metrics() -> Response:
+    """Prometheus metrics of the metric providers.
+
+    Returns:
+        The cumulative time and peak allocation per provider and phase in the Prometheus text format.
+    """
+    return Response(content=registry.metrics.to_prometheus(), media_type="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
     # Run code without FastAPI
     logging.basicConfig(level=logging.DEBUG)
@@ -68,6 +95,7 @@ if __name__ == "__main__":
     content = asyncio.run(
         generate_weekly_plan(
             user=User(email=settings.DEV_USER, password_hash=hash_password(settings.DEV_PASSWORD)),
+            client=IntervalsClient(settings.INTERVALS_API_KEY, settings.INTERVALS_ATHLETE_ID),
         )
     )
     _LOGGER.info("Generated plan:\n%s", content)
@@ -1,5 +1,9 @@
 """Contains the App models."""
 
+from app.models.activity import StoredActivity as StoredActivity
+from app.models.activity import StoredPMCDay as StoredPMCDay
+from app.models.activity import StoredWellness as StoredWellness
+from app.models.activity import SyncState as SyncState
 from app.models.plan import TrainingPhase as TrainingPhase
 from app.models.plan import TrainingPlan as TrainingPlan
 from app.models.user import User as User
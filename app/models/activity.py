@@ -0,0 +1,48 @@
+"""Defines the local store for intervals.icu activities and wellness records."""
+
+from datetime import UTC, date, datetime
+from typing import Any
+
+from sqlmodel import JSON, Column, Field, SQLModel
+
+
+class StoredActivity(SQLModel, table=True):
+    """An intervals.icu activity payload persisted for an athlete."""
+
+    athlete_id: str = Field(primary_key=True)
+    activity_id: str = Field(primary_key=True)
+    start_date: date = Field(index=True)
+    payload: dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSON))
+
+
+class StoredWellness(SQLModel, table=True):
+    """An intervals.icu wellness payload persisted for an athlete."""
+
+    athlete_id: str = Field(primary_key=True)
+    day: date = Field(primary_key=True)
+    payload: dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSON))
+
+
+class SyncState(SQLModel, table=True):
+    """Tracks how far a dataset has been synced from intervals.icu for an athlete."""
+
+    athlete_id: str = Field(primary_key=True)
+    dataset: str = Field(primary_key=True)  # activities, wellness
+    # oldest: First date covered by the local store.
+    oldest: date
+    # last_synced: Date of the most recent successful sync.
+    last_synced: date
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+
+
+class StoredPMCDay(SQLModel, table=True):
+    """Daily Performance Management Chart values of an athlete, derived from the stored activities.
+
+    The latest row is the state from which the chart is advanced when new activities arrive.
+    """
+
+    athlete_id: str = Field(primary_key=True)
+    day: date = Field(primary_key=True)
+    training_stress: float
+    ctl: float
+    atl: float
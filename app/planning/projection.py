@@ -0,0 +1,103 @@
+"""Projection of the training stress of planned workouts."""
+
+from typing import TYPE_CHECKING, cast
+
+import polars as pl
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from app.models.plan import TrainingPlan
+
+PLANNED_STRESS_SCHEMA = pl.Schema({"date": pl.Date, "training_stress": pl.Float64})
+_WEEKDAYS = {
+    day: offset
+    for offset, day in enumerate(("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"))
+}
+_NUMBER = r"(\d+(?:\.\d+)?)"
+
+
+def _steps(plans: Iterable[TrainingPlan]) -> pl.DataFrame:
+    """Flattens the planned workouts into one row per step.
+
+    Values are kept as strings, as the LLM does not reliably stick to the JSON types, and are parsed by the caller.
+
+    Returns:
+        The week start, day, segment repeats, duration and power of every step.
+    """
+    columns: dict[str, list[object]] = {
+        "week_start": [],
+        "day": [],
+        "repeats": [],
+        "duration_m": [],
+        "power_pct": [],
+    }
+    for plan in plans:
+        for workout in plan.workout_data:
+            for segment in workout.get("segments") or []:
+                for step in segment.get("steps") or []:
+                    columns["week_start"].append(plan.week_start)
+                    columns["day"].append(str(workout.get("day", "")))
+                    columns["repeats"].append(str(segment.get("repeats", 1)))
+                    columns["duration_m"].append(str(step.get("duration_m", "")))
+                    columns["power_pct"].append(str(step.get("power_pct", "")))
+    return pl.DataFrame(
+        columns,
+        schema={
+            "week_start": pl.Date,
+            "day": pl.String,
+            "repeats": pl.String,
+            "duration_m": pl.String,
+            "power_pct": pl.String,
+        },
+    )
+
+
+def planned_stress(plans: Iterable[TrainingPlan]) -> pl.DataFrame:
+    """Estimates the daily training stress of stored training plans.
+
+    Each step contributes `hours * IF² * 100` TSS, with the intensity factor taken from its `power_pct` of FTP. Steady
+    ranges use their midpoint, ramps the mean squared intensity of a linear ramp. All steps of all plans are evaluated
+    as a single Polars query.
+
+    Args:
+        plans: The training plans with their structured `workout_data`.
+
+    Returns:
+        The planned `training_stress` per `date`, ordered by date. Steps without a known weekday, duration or power are
+        skipped.
+    """
+    pct = pl.col("power_pct")
+    low = pct.str.extract(_NUMBER, 1).cast(pl.Float64, strict=False) / 100
+    high = pct.str.extract(rf"{_NUMBER}\s*-\s*{_NUMBER}", 2).cast(pl.Float64, strict=False).truediv(100).fill_null(low)
+    intensity_squared = (
+        pl
+        .when(pct.str.contains("(?i)ramp"))
+        .then((low * low + low * high + high * high) / 3)
+        .otherwise(((low + high) / 2) ** 2)
+    )
+    repeats = pl.col("repeats").cast(pl.Float64, strict=False).fill_null(1.0).clip(lower_bound=1.0)
+    hours = pl.col("duration_m").cast(pl.Float64, strict=False) / 60
+    offset = (
+        pl
+        .col("day")
+        .str.strip_chars()
+        .str.to_lowercase()
+        .replace_strict(_WEEKDAYS, default=None, return_dtype=pl.Int64)
+    )
+
+    planned = (
+        _steps(plans)
+        .lazy()
+        .select(
+            (pl.col("week_start") + pl.duration(days=offset)).alias("date"),
+            (repeats * hours * intensity_squared * 100).alias("training_stress"),
+        )
+        .drop_nulls()
+        .group_by("date")
+        .agg(pl.col("training_stress").sum())
+        .sort("date")
+        .cast(PLANNED_STRESS_SCHEMA)
+        .collect()
+    )
+    return cast("pl.DataFrame", planned)
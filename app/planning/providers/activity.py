@@ -2,15 +2,18 @@
 
 import contextlib
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, Any, override
+from typing import Any, override
 
 import polars as pl
 
 from app.intervals.models import TrainingLoad
-from app.planning.providers.interfaces import DashboardWidget, MetricProvider
+from app.planning.providers.aggregation import provider_aggregates, windowed
+from app.planning.providers.interfaces import AnalysisContext, DashboardWidget, MetricProvider
 
-if TYPE_CHECKING:
-    from app.intervals.client import IntervalsClient
+# Days summed up for the recent training
+RECENT_DAYS = 7
+# Columns summed up over the recent days, missing without activities
+_RECENT_TOTALS = {"tss_7d": "training_stress", "hours_7d": "duration_h", "distance_7d": "distance_km"}
 
 
 @dataclass(frozen=True)
@@ -36,11 +39,40 @@ class ActivityProvider(MetricProvider[ActivityResult]):
         """
         return "activity"
 
+    @override
+    def get_dependencies(self) -> set[str]:
+        """Returns the providers whose results are read.
+
+        Returns:
+            The PMC provider, for the current training load.
+        """
+        return {"pmc"}
+
+    @override
+    def get_aggregations(self, schema: pl.Schema, display_days: int | None) -> dict[str, pl.Expr]:
+        """Returns the aggregations the provider reads from the daily frame.
+
+        Args:
+            schema: The schema of the daily frame.
+            display_days: Optional number of days to display.
+
+        Returns:
+            The latest date and the totals of the recent days.
+        """
+        return {
+            "today": pl.col("date").max(),
+            **{
+                name: windowed(pl.col(column), RECENT_DAYS).sum()
+                for name, column in _RECENT_TOTALS.items()
+                if column in schema
+            },
+        }
+
     @override
     def calculate(
         self,
         daily_df: pl.DataFrame,
-        client: IntervalsClient | None = None,
+        context: AnalysisContext | None = None,
         provider_results: dict[str, Any] | None = None,
         display_days: int | None = None,
     ) -> ActivityResult:
@@ -48,16 +80,15 @@ class ActivityProvider(MetricProvider[ActivityResult]):
 
         Args:
             daily_df: Polars DataFrame containing daily wellness/activity data.
-            client: The Intervals.icu client.
+            context: The per-analysis data context.
             provider_results: Mapping of previous provider results.
             display_days: Optional number of days to display.
 
         Returns:
             The structured calculation result.
         """
-        # Filter to last 7 days for summary metrics
-        today = daily_df["date"].max()
-        if today is None:
+        aggregates = provider_aggregates(self, daily_df, context, display_days)
+        if aggregates["today"] is None:
             return ActivityResult(
                 load=TrainingLoad(0, 0),
                 tss_7d=0,
@@ -66,12 +97,7 @@ class ActivityProvider(MetricProvider[ActivityResult]):
                 has_activities=False,
             )
 
-        seven_days_ago = today - pl.duration(days=7)
-        recent_df = daily_df.filter(pl.col("date") > seven_days_ago)
-
-        tss_7d = round(float(recent_df["training_stress"].sum()), 1)
-        hours_7d = round(float(recent_df["duration_h"].sum()), 1)
-        distance_7d = round(float(recent_df["distance_km"].sum()), 1)
+        tss_7d, hours_7d, distance_7d = (round(float(aggregates.get(name) or 0), 1) for name in _RECENT_TOTALS)
 
         # Get latest load (from PMC provider if available)
         load = TrainingLoad(0, 0)
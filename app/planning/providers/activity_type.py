@@ -1,14 +1,15 @@
 """Activity type distribution metric provider."""
 
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, Any, override
+from typing import Any, override
 
 import polars as pl
 
-from app.planning.providers.interfaces import DashboardWidget, MetricProvider
+from app.planning.providers.aggregation import provider_aggregates, windowed
+from app.planning.providers.interfaces import AnalysisContext, DashboardWidget, MetricProvider
 
-if TYPE_CHECKING:
-    from app.intervals.client import IntervalsClient
+# List columns of the daily frame, one entry per activity of the day
+_ACTIVITY_COLUMNS = ("types", "activity_durations")
 
 
 @dataclass(frozen=True)
@@ -32,11 +33,26 @@ class ActivityTypeProvider(MetricProvider[ActivityTypeResult | None]):
         """
         return "activity_type"
 
+    @override
+    def get_aggregations(self, schema: pl.Schema, display_days: int | None) -> dict[str, pl.Expr]:
+        """Returns the aggregations the provider reads from the daily frame.
+
+        Args:
+            schema: The schema of the daily frame.
+            display_days: Optional number of days to display.
+
+        Returns:
+            The type and duration of every activity within the display window, nothing without activities.
+        """
+        if not all(column in schema for column in _ACTIVITY_COLUMNS):
+            return {}
+        return {column: windowed(pl.col(column), display_days).explode().implode() for column in _ACTIVITY_COLUMNS}
+
     @override
     def calculate(
         self,
         daily_df: pl.DataFrame,
-        client: IntervalsClient | None = None,
+        context: AnalysisContext | None = None,
         provider_results: dict[str, Any] | None = None,
         display_days: int | None = None,
     ) -> ActivityTypeResult | None:
@@ -44,26 +60,22 @@ class ActivityTypeProvider(MetricProvider[ActivityTypeResult | None]):
 
         Args:
             daily_df: Polars DataFrame containing daily wellness/activity data.
-            client: The Intervals.icu client.
+            context: The per-analysis data context.
             provider_results: Mapping of previous provider results.
             display_days: Optional number of days to display.
 
         Returns:
             The structured calculation result.
         """
-        if "types" not in daily_df.columns or "activity_durations" not in daily_df.columns:
+        aggregates = provider_aggregates(self, daily_df, context, display_days)
+        if not aggregates:
             return None
 
-        df = daily_df
-        if display_days:
-            today = df["date"].max()
-            if today:
-                start_date = today - pl.duration(days=display_days)
-                df = df.filter(pl.col("date") > start_date)
-
-        # Reconstruct individual activities by exploding types and durations
-        # Each row in daily_df has a list of types and a list of durations
-        df = df.select(["types", "activity_durations"]).explode(["types", "activity_durations"]).drop_nulls()
+        # Reconstruct individual activities from the exploded types and durations of the days
+        df = pl.DataFrame(
+            {column: aggregates[column] for column in _ACTIVITY_COLUMNS},
+            schema={"types": pl.String, "activity_durations": pl.Float64},
+        ).drop_nulls()
 
         if df.is_empty():
             return None
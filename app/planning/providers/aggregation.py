@@ -0,0 +1,141 @@
+"""Fused aggregation of the daily frame shared by all providers of an analysis."""
+
+from typing import TYPE_CHECKING, Any, Final, cast
+
+import polars as pl
+
+if TYPE_CHECKING:
+    from app.planning.providers.interfaces import AnalysisContext, MetricProvider
+
+# Engine collecting the daily frame. The streaming engine measured slower on daily frames, which have a few thousand
+# rows at most and list columns it partly runs in memory anyway
+DAILY_FRAME_ENGINE: Final = "auto"
+# Window filters and explodes shared by several providers are evaluated once
+_OPTIMIZATIONS = pl.QueryOptFlags(comm_subexpr_elim=True, comm_subplan_elim=True)
+
+
+def in_window(days: int) -> pl.Expr:
+    """Selects the last days of the daily frame.
+
+    Args:
+        days: The number of days, counted back from the latest date of the frame.
+
+    Returns:
+        A boolean expression that is true for the days within the window.
+    """
+    return pl.col("date") > pl.col("date").max() - pl.duration(days=days)
+
+
+def windowed(expr: pl.Expr, days: int | None) -> pl.Expr:
+    """Restricts an expression to the last days of the daily frame.
+
+    Args:
+        expr: The expression to restrict.
+        days: The number of days, None or zero for the whole frame.
+
+    Returns:
+        The filtered expression.
+    """
+    return expr.filter(in_window(days)) if days else expr
+
+
+def _select(
+    daily: pl.LazyFrame, aggregations: dict[str, dict[str, pl.Expr]]
+) -> tuple[list[tuple[str, str]], pl.LazyFrame]:
+    """Builds the single select of all aggregations.
+
+    Returns:
+        The provider and aggregation name of each column of the select, and the select itself.
+    """
+    keys = [(provider, name) for provider, exprs in aggregations.items() for name in exprs]
+    return keys, daily.select(aggregations[provider][name].alias(str(i)) for i, (provider, name) in enumerate(keys))
+
+
+def _group(
+    aggregations: dict[str, dict[str, pl.Expr]], keys: list[tuple[str, str]], row: tuple[Any, ...]
+) -> dict[str, dict[str, Any]]:
+    """Groups the values of the select by provider.
+
+    Returns:
+        Mapping of provider names to the values of their aggregations.
+    """
+    values: dict[str, dict[str, Any]] = {provider: {} for provider in aggregations}
+    for (provider, name), value in zip(keys, row, strict=True):
+        values[provider][name] = value
+    return values
+
+
+def evaluate_aggregations(
+    daily_df: pl.DataFrame, aggregations: dict[str, dict[str, pl.Expr]]
+) -> dict[str, dict[str, Any]]:
+    """Evaluates the aggregations of many providers in a single query over the daily frame.
+
+    All expressions are part of one lazy `select`, so the frame is scanned once and window filters and explodes shared
+    by several providers are computed once through common subexpression elimination. Every expression has to reduce
+    to a single value, series are returned as lists with `implode`.
+
+    Args:
+        daily_df: Polars DataFrame containing daily wellness/activity data.
+        aggregations: Mapping of provider names to their named aggregation expressions.
+
+    Returns:
+        Mapping of provider names to the values of their aggregations.
+    """
+    if not any(aggregations.values()):
+        return {provider: {} for provider in aggregations}
+
+    keys, query = _select(daily_df.lazy(), aggregations)
+    values = cast("pl.DataFrame", query.collect(optimizations=_OPTIMIZATIONS))
+    return _group(aggregations, keys, values.row(0))
+
+
+def collect_daily_frame(
+    daily: pl.LazyFrame, aggregations: dict[str, dict[str, pl.Expr]]
+) -> tuple[pl.DataFrame, dict[str, dict[str, Any]]]:
+    """Collects the query of the daily frame together with the aggregations of many providers.
+
+    Both queries are collected at once. The daily frame is their common subplan, so it is computed once and feeds the
+    providers as well as the aggregation `select` of `evaluate_aggregations`.
+
+    Args:
+        daily: The query of the daily frame.
+        aggregations: Mapping of provider names to their named aggregation expressions.
+
+    Returns:
+        The daily frame and the mapping of provider names to the values of their aggregations.
+    """
+    if not any(aggregations.values()):
+        daily_df = cast("pl.DataFrame", daily.collect(engine=DAILY_FRAME_ENGINE))
+        return daily_df, {provider: {} for provider in aggregations}
+
+    keys, query = _select(daily, aggregations)
+    daily_df, values = cast(
+        "list[pl.DataFrame]", pl.collect_all([daily, query], optimizations=_OPTIMIZATIONS, engine=DAILY_FRAME_ENGINE)
+    )
+    return daily_df, _group(aggregations, keys, values.row(0))
+
+
+def provider_aggregates(
+    provider: MetricProvider[Any],
+    daily_df: pl.DataFrame,
+    context: AnalysisContext | None,
+    display_days: int | None,
+) -> dict[str, Any]:
+    """Returns the values of a provider's aggregations.
+
+    Within a registry run they were evaluated together with the aggregations of all other providers. A provider that is
+    calculated on its own evaluates its aggregations itself.
+
+    Args:
+        provider: The provider whose aggregations are read.
+        daily_df: Polars DataFrame containing daily wellness/activity data.
+        context: The per-analysis data context.
+        display_days: Optional number of days to display.
+
+    Returns:
+        Mapping of the aggregation names to their values.
+    """
+    name = provider.get_name()
+    if context is not None and name in context.aggregates:
+        return context.aggregates[name]
+    return evaluate_aggregations(daily_df, {name: provider.get_aggregations(daily_df.schema, display_days)})[name]
@@ -0,0 +1,149 @@
+"""Critical power metric provider."""
+
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, override
+
+from app.intervals.critical_power import FTP_CP_RATIO, CriticalPowerFit, fit_critical_power
+from app.intervals.parser.power_curve import primary_curve
+from app.planning.providers.interfaces import AnalysisContext, DashboardWidget, Dataset, MetricProvider
+
+if TYPE_CHECKING:
+    import polars as pl
+
+    from app.intervals.parser.power_curve import ParsedPowerCurve
+
+# Number of fitted curves kept, a curve only changes when the athlete sets a new best effort
+FIT_CACHE_SIZE = 256
+
+
+class CriticalPowerProvider(MetricProvider[CriticalPowerFit | None]):
+    """Provides the critical power model fitted to the power curve of the primary window (`PRIMARY_CURVE`, 90 days).
+
+    Fits are cached per curve id and content, so repeated analyses of an unchanged curve do not refit it.
+    """
+
+    def __init__(self, *, three_parameter: bool = True, cache_size: int = FIT_CACHE_SIZE) -> None:
+        """Initializes the provider.
+
+        Args:
+            three_parameter: Whether to fit the 3-parameter model, which also yields Pmax.
+            cache_size: Maximum number of cached fits.
+        """
+        self.three_parameter = three_parameter
+        self.cache_size = cache_size
+        self._fits: OrderedDict[tuple[str, str], CriticalPowerFit | None] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @override
+    def get_name(self) -> str:
+        """Returns the provider name.
+
+        Returns:
+            The provider name.
+        """
+        return "critical_power"
+
+    @override
+    def get_required_datasets(self) -> set[Dataset]:
+        """Returns the datasets the provider reads from the analysis context.
+
+        Returns:
+            The required datasets.
+        """
+        return {Dataset.POWER_CURVES}
+
+    @override
+    def calculate(
+        self,
+        daily_df: pl.DataFrame,
+        context: AnalysisContext | None = None,
+        provider_results: dict[str, Any] | None = None,
+        display_days: int | None = None,
+    ) -> CriticalPowerFit | None:
+        """Perform calculations on raw data and return a structured result.
+
+        Args:
+            daily_df: Polars DataFrame containing daily wellness/activity data.
+            context: The per-analysis data context.
+            provider_results: Mapping of previous provider results.
+            display_days: Optional number of days to display.
+
+        Returns:
+            The fitted model or None if the power curve is missing or cannot be fitted.
+        """
+        curves = context.get(Dataset.POWER_CURVES) if context else None
+        curve = primary_curve(curves) if curves else None
+        if curve is None:
+            return None
+        return self._fit(curve)
+
+    def _fit(self, curve: ParsedPowerCurve) -> CriticalPowerFit | None:
+        """Returns the cached fit of a curve, fitting it on first use.
+
+        Args:
+            curve: The power curve.
+
+        Returns:
+            The fitted model or None if the curve cannot be fitted.
+        """
+        key = (curve.id, curve.fingerprint)
+        with self._lock:
+            if key in self._fits:
+                self._fits.move_to_end(key)
+                return self._fits[key]
+
+        # Concurrent analyses of a new curve may both fit it, which is cheaper than holding the lock while fitting
+        fit = fit_critical_power(curve, three_parameter=self.three_parameter)
+        with self._lock:
+            self._fits[key] = fit
+            while len(self._fits) > self.cache_size:
+                self._fits.popitem(last=False)
+        return fit
+
+    @override
+    async def provide_context(self, result: CriticalPowerFit | None) -> str:
+        """Provides critical power context.
+
+        Args:
+            result: The result from the calculate method.
+
+        Returns:
+            A formatted string containing the critical power context.
+        """
+        if result is None:
+            return "No critical power model available."
+
+        lines = [
+            "Critical Power Model:",
+            f"- CP: {result.cp:.0f}W",
+            f"- W': {result.w_prime / 1000:.1f}kJ",
+        ]
+        if result.pmax is not None:
+            lines.append(f"- Pmax: {result.pmax:.0f}W")
+        lines.append(f"- Estimated FTP ({FTP_CP_RATIO:g} * CP): {result.ftp:.0f}W")
+        return "\n".join(lines)
+
+    @override
+    def get_dashboard_widget(
+        self, result: CriticalPowerFit | None, display_days: int | None = None
+    ) -> DashboardWidget | None:
+        """Format the calculation result for the dashboard.
+
+        Args:
+            result: The result from the calculate method.
+            display_days: Optional number of days to display.
+
+        Returns:
+            The dashboard widget.
+        """
+        if result is None:
+            return None
+
+        return DashboardWidget(
+            name="critical_power",
+            title="Critical Power",
+            value=f"{result.cp:.0f} W",
+            trend=f"W' {result.w_prime / 1000:.1f} kJ · est. FTP {result.ftp:.0f} W",
+            trend_positive=True,
+        )
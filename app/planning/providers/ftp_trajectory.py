@@ -1,22 +1,28 @@
 """FTP trajectory metric provider."""
 
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, Any, override
+from typing import TYPE_CHECKING, Any, cast, override
 
-from app.planning.providers.interfaces import DashboardWidget, MetricProvider
+import polars as pl
 
-if TYPE_CHECKING:
-    import polars as pl
+from app.planning.providers.interfaces import AnalysisContext, DashboardWidget, MetricProvider
 
-    from app.intervals.client import IntervalsClient
+if TYPE_CHECKING:
+    from datetime import date
 
 
 @dataclass(frozen=True)
 class FTPTrajectoryResult:
-    """Result of the FTP trajectory calculation."""
+    """Result of the FTP trajectory calculation.
+
+    The trajectory is stored as change points: the first known FTP and every date on which it changed. Between two
+    change points the FTP stays the same.
+    """
 
     dates: list[str]
     ftp_values: list[float]
+    # Days from the first known FTP to the last analyzed day
+    span_days: int = 0
 
 
 class FTPTrajectoryProvider(MetricProvider[FTPTrajectoryResult | None]):
@@ -35,7 +41,7 @@ class FTPTrajectoryProvider(MetricProvider[FTPTrajectoryResult | None]):
     def calculate(
         self,
         daily_df: pl.DataFrame,
-        client: IntervalsClient | None = None,
+        context: AnalysisContext | None = None,
         provider_results: dict[str, Any] | None = None,
         display_days: int | None = None,
     ) -> FTPTrajectoryResult | None:
@@ -43,7 +49,7 @@ class FTPTrajectoryProvider(MetricProvider[FTPTrajectoryResult | None]):
 
         Args:
             daily_df: Polars DataFrame containing daily wellness/activity data.
-            client: The Intervals.icu client.
+            context: The per-analysis data context.
             provider_results: Mapping of previous provider results.
             display_days: Optional number of days to display.
 
@@ -54,14 +60,18 @@ class FTPTrajectoryProvider(MetricProvider[FTPTrajectoryResult | None]):
         if "ftp" not in daily_df.columns:
             return None
 
-        # Filter to dates where FTP is not null
-        ftp_df = daily_df.filter(daily_df["ftp"].is_not_null())
+        # Filter to dates where FTP is known
+        ftp_df = daily_df.select("date", "ftp").filter(pl.col("ftp").is_not_null())
         if ftp_df.is_empty():
             return None
 
+        # Keep only the days on which the FTP changed, so long histories reduce to a handful of points
+        changes = ftp_df.filter(pl.col("ftp").ne_missing(pl.col("ftp").shift()))
+        first, last = cast("date", ftp_df["date"].min()), cast("date", ftp_df["date"].max())
         return FTPTrajectoryResult(
-            dates=ftp_df["date"].dt.strftime("%Y-%m-%d").to_list(),
-            ftp_values=ftp_df["ftp"].to_list(),
+            dates=changes["date"].dt.strftime("%Y-%m-%d").to_list(),
+            ftp_values=changes["ftp"].to_list(),
+            span_days=(last - first).days + 1,
         )
 
     @override
@@ -82,11 +92,15 @@ class FTPTrajectoryProvider(MetricProvider[FTPTrajectoryResult | None]):
         change = current_ftp - initial_ftp
         change_pct = (change / initial_ftp) * 100 if initial_ftp > 0 else 0
 
+        changes = ", ".join(
+            f"{day}: {ftp:.0f}W" for day, ftp in zip(result.dates[1:], result.ftp_values[1:], strict=True)
+        )
         return (
-            f"FTP Trajectory (Last {len(result.dates)} days):\n"
+            f"FTP Trajectory (Last {result.span_days} days):\n"
             f"- Starting FTP: {initial_ftp:.1f}W\n"
             f"- Current FTP: {current_ftp:.1f}W\n"
-            f"- Total Change: {change:+.1f}W ({change_pct:+.1f}%)"
+            f"- Total Change: {change:+.1f}W ({change_pct:+.1f}%)\n"
+            f"- Changes: {changes or 'none'}"
         )
 
     @override
@@ -0,0 +1,218 @@
+"""Timing and memory instrumentation of metric providers."""
+
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from enum import StrEnum
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+
+# Request header switching on the detailed profile of a single request
+PROFILE_HEADER = "X-Profile-Providers"
+METRIC_PREFIX = "intelliwatts_provider"
+
+
+class Phase(StrEnum):
+    """Phases of a provider that are measured."""
+
+    CALCULATE = "calculate"
+    WIDGET = "widget"
+    CONTEXT = "provide_context"
+
+
+# Phases run synchronously on a thread of their own. The context phase is a coroutine that shares the event loop's
+# thread with the other providers' coroutines, so its thread CPU time would include theirs.
+CPU_PHASES = frozenset({Phase.CALCULATE, Phase.WIDGET})
+
+
+@dataclass(frozen=True)
+class ProviderTiming:
+    """Measurement of one provider phase.
+
+    CPU time covers the calling thread only, work done by Polars' thread pool is part of the wall time. It is only
+    measured for the phases in `CPU_PHASES`. The peak allocation covers Python allocations tracked by `tracemalloc` and
+    is only measured when requested.
+    """
+
+    provider: str
+    phase: Phase
+    wall_seconds: float
+    cpu_seconds: float | None
+    peak_bytes: int | None = None
+
+
+@dataclass
+class _Series:
+    """Cumulative measurements of one provider phase."""
+
+    count: int = 0
+    wall_seconds: float = 0.0
+    cpu_seconds: float | None = None
+    peak_bytes: int | None = None
+
+
+class ProviderMetrics:
+    """Cumulative provider measurements of the process, exported in the Prometheus text format."""
+
+    def __init__(self) -> None:
+        """Initializes empty metrics."""
+        self._lock = threading.Lock()
+        self._series: defaultdict[tuple[str, Phase], _Series] = defaultdict(_Series)
+
+    def record(self, timing: ProviderTiming) -> None:
+        """Adds a measurement.
+
+        Args:
+            timing: The measurement of a provider phase.
+        """
+        with self._lock:
+            series = self._series[timing.provider, timing.phase]
+            series.count += 1
+            series.wall_seconds += timing.wall_seconds
+            if timing.cpu_seconds is not None:
+                series.cpu_seconds = (series.cpu_seconds or 0.0) + timing.cpu_seconds
+            if timing.peak_bytes is not None:
+                series.peak_bytes = max(series.peak_bytes or 0, timing.peak_bytes)
+
+    def clear(self) -> None:
+        """Removes all measurements."""
+        with self._lock:
+            self._series.clear()
+
+    def to_prometheus(self) -> str:
+        """Exports the measurements.
+
+        Returns:
+            The metrics in the Prometheus text exposition format.
+        """
+        with self._lock:
+            series = sorted(self._series.items())
+
+        lines = [
+            f"# HELP {METRIC_PREFIX}_wall_seconds Wall time spent in metric provider phases.",
+            f"# TYPE {METRIC_PREFIX}_wall_seconds summary",
+        ]
+        for (provider, phase), s in series:
+            labels = f'provider="{provider}",phase="{phase}"'
+            lines.extend((
+                f"{METRIC_PREFIX}_wall_seconds_sum{{{labels}}} {s.wall_seconds}",
+                f"{METRIC_PREFIX}_wall_seconds_count{{{labels}}} {s.count}",
+            ))
+        lines.extend((
+            f"# HELP {METRIC_PREFIX}_cpu_seconds_total CPU time spent in metric provider phases.",
+            f"# TYPE {METRIC_PREFIX}_cpu_seconds_total counter",
+        ))
+        lines.extend(
+            f'{METRIC_PREFIX}_cpu_seconds_total{{provider="{provider}",phase="{phase}"}} {s.cpu_seconds}'
+            for (provider, phase), s in series
+            if s.cpu_seconds is not None
+        )
+        lines.extend((
+            f"# HELP {METRIC_PREFIX}_peak_bytes Largest traced Python allocation peak of metric provider phases.",
+            f"# TYPE {METRIC_PREFIX}_peak_bytes gauge",
+        ))
+        lines.extend(
+            f'{METRIC_PREFIX}_peak_bytes{{provider="{provider}",phase="{phase}"}} {s.peak_bytes}'
+            for (provider, phase), s in series
+            if s.peak_bytes is not None
+        )
+        return "\n".join(lines) + "\n"
+
+
+class _MemoryTracer:
+    """Reference-counted `tracemalloc` session shared by concurrent profilers."""
+
+    def __init__(self) -> None:
+        """Initializes an inactive tracer."""
+        self._lock = threading.Lock()
+        self._users = 0
+        self._owned = False
+        # `tracemalloc` keeps a single peak for the whole process, so only one phase is traced at a time
+        self.measuring = threading.Lock()
+
+    @contextmanager
+    def tracing(self) -> Generator[None]:
+        """Keeps `tracemalloc` running while the context is active.
+
+        Yields:
+            None
+        """
+        with self._lock:
+            if self._users == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._owned = True
+            self._users += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._users -= 1
+                if self._users == 0 and self._owned:
+                    tracemalloc.stop()
+                    self._owned = False
+
+
+_memory_tracer = _MemoryTracer()
+
+
+class ProviderProfiler:
+    """Measures the provider phases of one analysis run.
+
+    Wall and CPU time are always measured, they are cheap. Tracing allocations slows the providers down considerably and
+    is therefore opt-in. `tracemalloc` has a single peak for the whole process, so traced phases are measured one at a
+    time and the registry runs the providers of a traced run serially. Allocations of unrelated threads running at the
+    same time, e.g. an untraced concurrent request, still add to the peak.
+    """
+
+    def __init__(self, metrics: ProviderMetrics | None = None, *, trace_memory: bool = False) -> None:
+        """Initializes the profiler.
+
+        Args:
+            metrics: Cumulative metrics every measurement is added to.
+            trace_memory: Whether to measure the peak allocation of each phase.
+        """
+        self.metrics = metrics
+        self.trace_memory = trace_memory
+        self.timings: list[ProviderTiming] = []
+
+    @contextmanager
+    def measure(self, provider: str, phase: Phase) -> Generator[None]:
+        """Measures the code run within the context.
+
+        Args:
+            provider: The name of the provider.
+            phase: The measured phase.
+
+        Yields:
+            None
+        """
+        if not self.trace_memory:
+            wall, cpu = time.perf_counter(), time.thread_time()
+            yield
+            self._record(provider, phase, wall, cpu, peak_bytes=None)
+            return
+
+        with _memory_tracer.tracing(), _memory_tracer.measuring:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            wall, cpu = time.perf_counter(), time.thread_time()
+            yield
+            self._record(provider, phase, wall, cpu, peak_bytes=max(0, tracemalloc.get_traced_memory()[1] - baseline))
+
+    def _record(self, provider: str, phase: Phase, wall: float, cpu: float, peak_bytes: int | None) -> None:
+        """Stores a measurement started at the given wall and CPU times."""
+        timing = ProviderTiming(
+            provider=provider,
+            phase=phase,
+            wall_seconds=time.perf_counter() - wall,
+            cpu_seconds=time.thread_time() - cpu if phase in CPU_PHASES else None,
+            peak_bytes=peak_bytes,
+        )
+        self.timings.append(timing)
+        if self.metrics is not None:
+            self.metrics.record(timing)
@@ -1,14 +1,13 @@
 """Intensity distribution metric provider."""
 
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, Any, override
+from typing import Any, override
 
 import polars as pl
 
-from app.planning.providers.interfaces import DashboardWidget, MetricProvider
-
-if TYPE_CHECKING:
-    from app.intervals.client import IntervalsClient
+from app.intervals.parser.activity import sum_zones, zone_count_column
+from app.planning.providers.aggregation import provider_aggregates, windowed
+from app.planning.providers.interfaces import AnalysisContext, DashboardWidget, MetricProvider
 
 # Constants for training styles
 HIGHLY_POLARIZED_THRESHOLD = 85
@@ -17,6 +16,8 @@ MIN_ZONES_FOR_POLARIZED = 2
 
 # Power zone indices (0-based)
 POWER_ZONE_SS_IDX = 7  # Z8 is "Sweet Spot" in Intervals.icu (overlaps with Z3/Z4)
+# Zone columns of the daily frame, the summed zone times of the day's activities
+ZONE_COLUMNS = ("hr_zone_times", "power_zone_times")
 
 
 @dataclass(frozen=True)
@@ -44,11 +45,31 @@ class IntensityProvider(MetricProvider[IntensityResult]):
         """
         return "intensity"
 
+    @override
+    def get_aggregations(self, schema: pl.Schema, display_days: int | None) -> dict[str, pl.Expr]:
+        """Returns the aggregations the provider reads from the daily frame.
+
+        Args:
+            schema: The schema of the daily frame.
+            display_days: Optional number of days to display.
+
+        Returns:
+            Per zone column the summed time of every zone and the number of zones within the display window.
+        """
+        aggregations: dict[str, pl.Expr] = {}
+        for column in ZONE_COLUMNS:
+            if column in schema:
+                aggregations[column] = sum_zones(windowed(pl.col(column), display_days))
+                aggregations[zone_count_column(column)] = windowed(
+                    pl.col(zone_count_column(column)), display_days
+                ).max()
+        return aggregations
+
     @override
     def calculate(
         self,
         daily_df: pl.DataFrame,
-        client: IntervalsClient | None = None,
+        context: AnalysisContext | None = None,
         provider_results: dict[str, Any] | None = None,
         display_days: int | None = None,
     ) -> IntensityResult:
@@ -56,23 +77,16 @@ class IntensityProvider(MetricProvider[IntensityResult]):
 
         Args:
             daily_df: Polars DataFrame containing daily wellness/activity data.
-            client: The Intervals.icu client.
+            context: The per-analysis data context.
             provider_results: Mapping of previous provider results.
             display_days: Optional number of days to display.
 
         Returns:
             The structured calculation result.
         """
-        # Filter by display_days if provided
-        df = daily_df
-        if display_days:
-            today = df["date"].max()
-            if today:
-                start_date = today - pl.duration(days=display_days)
-                df = df.filter(pl.col("date") > start_date)
-
-        hr_totals = self._sum_zones_polars(df, "hr_zone_times")
-        power_totals = self._sum_zones_polars(df, "power_zone_times")
+        aggregates = provider_aggregates(self, daily_df, context, display_days)
+        hr_totals = self._zone_totals(aggregates, "hr_zone_times")
+        power_totals = self._zone_totals(aggregates, "power_zone_times")
 
         # HR Calculation
         hr_sum_secs = sum(hr_totals)
@@ -113,52 +127,18 @@ class IntensityProvider(MetricProvider[IntensityResult]):
         )
 
     @staticmethod
-    def _sum_zones_polars(daily_df: pl.DataFrame, col_name: str) -> list[int]:
-        """Sum zone times across all days using Polars for better performance.
+    def _zone_totals(aggregates: dict[str, Any], column: str) -> list[int]:
+        """Collects the summed zone times of a zone column.
 
         Args:
-            daily_df: The daily dataframe.
-            col_name: The column name to sum.
+            aggregates: The values of the provider's aggregations.
+            column: The zone column.
 
         Returns:
-            The list of summed zone times.
+            The summed time of every zone, empty if the column is missing or has no zones.
         """
-        if col_name not in daily_df.columns:
-            return []
-
-        # Data contains list[list[int]] because of daily aggregation
-        # Flatten to list[int] per row (activity), then sum across rows
-        try:
-            # col_name is list[list[int]], explode it to get list[int] per row
-            df_zones = daily_df.select(col_name).explode(col_name).drop_nulls()
-
-            if df_zones.is_empty():
-                return []
-
-            # Each row is now list[int] (the zones for one activity)
-            # Find the max length of lists to ensure we sum all zones
-            max_zones = df_zones.select(pl.col(col_name).list.len()).max().item() or 0
-            if max_zones == 0:
-                return []
-
-            # Pad lists to max length with zeros, then sum horizontally
-            # We can use list.to_struct() then sum_horizontal for a very efficient approach
-            res = (
-                df_zones
-                .select(
-                    pl
-                    .col(col_name)
-                    .list.slice(0, max_zones)  # Ensure all lists are consistent
-                    .list.to_struct(upper_bound=max_zones)
-                )
-                .unnest(col_name)
-                .sum()
-                .transpose()
-            )
-
-            return res.select(pl.col("column_0").cast(pl.Int64)).to_series().to_list()
-        except pl.exceptions.ColumnNotFoundError, pl.exceptions.ComputeError:
-            return []
+        count = aggregates.get(zone_count_column(column)) or 0
+        return [int(seconds or 0) for seconds in (aggregates.get(column) or [])[:count]]
 
     @staticmethod
     def _detect_style(polarized_score: float, *, has_data: bool = True) -> str:
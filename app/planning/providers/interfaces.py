@@ -1,9 +1,15 @@
 """Base classes for metric providers."""
 
-from dataclasses import dataclass
+import threading
+from dataclasses import dataclass, field
+from enum import StrEnum
 from typing import TYPE_CHECKING, Any, Protocol, TypeVar
 
+from app.intervals.parser.power_curve import CURVE_WINDOWS, parse_power_curves
+
 if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
     import polars as pl
 
     from app.intervals.client import IntervalsClient
@@ -11,6 +17,62 @@ if TYPE_CHECKING:
 T_co = TypeVar("T_co", covariant=True)
 
 
+class Dataset(StrEnum):
+    """Intervals.icu datasets that providers can request from the analysis context."""
+
+    POWER_CURVES = "power_curves"
+    # Persisted PMC of the athlete, only available if provided by the caller
+    PMC = "pmc"
+    # Training stress of the athlete's stored plans, only available if provided by the caller
+    PLANNED_STRESS = "planned_stress"
+
+
+# How to fetch and parse each dataset if the caller did not provide it up front
+DATASET_LOADERS: dict[Dataset, Callable[[IntervalsClient], Any]] = {
+    Dataset.POWER_CURVES: lambda client: parse_power_curves(client.power_curves(curves=",".join(CURVE_WINDOWS))),
+}
+
+
+@dataclass
+class AnalysisContext:
+    """Per-analysis container for the data shared among all providers.
+
+    Datasets that were already fetched by the caller are passed in via `datasets`. Missing ones are loaded lazily
+    through the client if they have a loader, so every dataset is fetched at most once per analysis run. The registry
+    stores the values of the providers' aggregations in `aggregates`, keyed by provider name.
+    """
+
+    client: IntervalsClient | None = None
+    datasets: dict[Dataset, Any] = field(default_factory=dict)
+    aggregates: dict[str, dict[str, Any]] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def get(self, dataset: Dataset) -> Any | None:  # noqa: ANN401
+        """Returns a dataset, fetching it through the client on first access.
+
+        Args:
+            dataset: The dataset to retrieve.
+
+        Returns:
+            The parsed dataset or None if it is unavailable.
+        """
+        with self._lock:
+            if dataset not in self.datasets:
+                if self.client is None or dataset not in DATASET_LOADERS:
+                    return None
+                self.datasets[dataset] = DATASET_LOADERS[dataset](self.client)
+            return self.datasets[dataset]
+
+    def prefetch(self, datasets: Iterable[Dataset]) -> None:
+        """Loads all given datasets up front.
+
+        Args:
+            datasets: The datasets required by the providers of this run.
+        """
+        for dataset in datasets:
+            self.get(dataset)
+
+
 @dataclass(frozen=True)
 class DashboardWidget:
     """Represents a widget on the athlete dashboard."""
@@ -35,10 +97,49 @@ class MetricProvider(Protocol[T_co]):
         """
         ...
 
+    def get_required_datasets(self) -> set[Dataset]:  # noqa: PLR6301
+        """Returns the datasets the provider reads from the analysis context.
+
+        Returns:
+            The required datasets.
+        """
+        return set()
+
+    def get_dependencies(self) -> set[str]:  # noqa: PLR6301
+        """Returns the names of the providers whose results this provider reads.
+
+        The registry runs a provider only after its dependencies and passes their results as `provider_results`.
+        Providers without dependencies may run concurrently with each other.
+
+        Returns:
+            The names of the required providers.
+        """
+        return set()
+
+    def get_aggregations(  # noqa: PLR6301
+        self,
+        schema: pl.Schema,  # noqa: ARG002
+        display_days: int | None,  # noqa: ARG002
+    ) -> dict[str, pl.Expr]:
+        """Returns the aggregations the provider reads from the daily frame.
+
+        The registry evaluates the aggregations of all providers of a run in a single query over the daily frame and
+        stores their values in the analysis context, where `provider_aggregates` reads them. Every expression has to
+        reduce the frame to a single value.
+
+        Args:
+            schema: The schema of the daily frame, to skip aggregations of missing columns.
+            display_days: Optional number of days to display.
+
+        Returns:
+            Mapping of aggregation names to their expressions.
+        """
+        return {}
+
     def calculate(
         self,
         daily_df: pl.DataFrame,
-        client: IntervalsClient | None = None,
+        context: AnalysisContext | None = None,
         provider_results: dict[str, Any] | None = None,
         display_days: int | None = None,
     ) -> T_co:
@@ -46,8 +147,8 @@ class MetricProvider(Protocol[T_co]):
 
         Args:
             daily_df: Polars DataFrame containing daily wellness/activity data.
-            client: The Intervals.icu client.
-            provider_results: Mapping of previous provider results.
+            context: The per-analysis data context.
+            provider_results: Mapping of the results of the providers this provider depends on.
             display_days: Optional number of days to display.
 
         Returns:
@@ -1,32 +1,109 @@
 """Performance Management Chart (PMC) metric provider."""
 
 import math
-from dataclasses import dataclass
-from typing import TYPE_CHECKING, Any, override
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import TYPE_CHECKING, Any, cast, override
 
 import polars as pl
 
-from app.planning.providers.interfaces import DashboardWidget, MetricProvider
+from app.intervals.pmc import fit_time_constants, impulse_response, load_column
+from app.planning.providers.interfaces import AnalysisContext, DashboardWidget, Dataset, MetricProvider
 
 if TYPE_CHECKING:
-    from app.intervals.client import IntervalsClient
+    from collections.abc import Iterable
+
+CHRONIC_DAYS = 42
+ACUTE_DAYS = 7
+_SERIES_SCHEMA = pl.Schema({"date": pl.Date, "ctl": pl.Float64, "atl": pl.Float64, "tsb": pl.Float64})
 
 
 @dataclass(frozen=True)
 class PMCResult:
-    """Result of the PMC calculation."""
+    """Result of the PMC calculation.
+
+    The projected series continue the chart through the planned workouts after the last analyzed day. The fitted time
+    constants are reported next to the chart, which keeps its own constants.
+    """
 
     dates: list[str]
     ctl: list[float]
     atl: list[float]
     tsb: list[float]
+    projected_dates: list[str] = field(default_factory=list)
+    projected_ctl: list[float] = field(default_factory=list)
+    projected_atl: list[float] = field(default_factory=list)
+    projected_tsb: list[float] = field(default_factory=list)
+    chronic_days: float = CHRONIC_DAYS
+    acute_days: float = ACUTE_DAYS
+    fitted_chronic_days: float | None = None
+    fitted_acute_days: float | None = None
+
+
+@dataclass(frozen=True)
+class PMCPoint:
+    """PMC values at the end of a day."""
+
+    day: date
+    ctl: float
+    atl: float
+
+
+def advance_pmc(
+    state: PMCPoint, stresses: Iterable[float], chronic_days: float = CHRONIC_DAYS, acute_days: float = ACUTE_DAYS
+) -> list[PMCPoint]:
+    """Advances the PMC by one day per training stress value.
+
+    Each day only depends on the previous day's values, so the chart can be continued from a persisted state in
+    O(new days) and yields exactly the values of a full recomputation.
+
+    Args:
+        state: The values at the end of the day before the first stress value.
+        stresses: The training stress of consecutive days.
+        chronic_days: The time constant of the CTL.
+        acute_days: The time constant of the ATL.
+
+    Returns:
+        The values at the end of each of these days.
+    """
+    alpha_ctl = 1 - math.exp(-1 / chronic_days)
+    alpha_atl = 1 - math.exp(-1 / acute_days)
+    day, ctl, atl = state.day, state.ctl, state.atl
+    points = []
+    for stress in stresses:
+        day += timedelta(days=1)
+        ctl += alpha_ctl * (stress - ctl)
+        atl += alpha_atl * (stress - atl)
+        points.append(PMCPoint(day=day, ctl=ctl, atl=atl))
+    return points
 
 
 class PMCProvider(MetricProvider[PMCResult]):
-    """Provides PMC (Fitness, Fatigue, Form) context."""
+    """Provides PMC (Fitness, Fatigue, Form) context.
+
+    If the analysis context holds the athlete's persisted PMC (`Dataset.PMC`) and the provider uses the default time
+    constants, the persisted values are used, as they are seeded from the athlete's full stored history. Otherwise the
+    PMC is computed over the analyzed days only. Planned training stress (`Dataset.PLANNED_STRESS`) extends it as a
+    projection beyond the last analyzed day.
+
+    A provider fitting its time constants fits the Banister model to the athlete's FTP changes on every run and reports
+    the fitted constants with its result, e.g. when there are too few FTP changes it reports none. The fit only sees the
+    FTP changes of the analyzed days, so the chart keeps the provider's own constants and stays stable across analyses.
+    """
 
-    _chronic_days = 42
-    _acute_days = 7
+    def __init__(
+        self, chronic_days: float = CHRONIC_DAYS, acute_days: float = ACUTE_DAYS, *, fit_time_constants: bool = False
+    ) -> None:
+        """Initializes the provider.
+
+        Args:
+            chronic_days: The time constant of the CTL, e.g. from a Banister fit.
+            acute_days: The time constant of the ATL, e.g. from a Banister fit.
+            fit_time_constants: Whether to report the time constants fitted to the FTP changes of each analysis.
+        """
+        self.chronic_days = chronic_days
+        self.acute_days = acute_days
+        self.fit_time_constants = fit_time_constants
 
     @override
     def get_name(self) -> str:
@@ -41,7 +118,7 @@ class PMCProvider(MetricProvider[PMCResult]):
     def calculate(
         self,
         daily_df: pl.DataFrame,
-        client: IntervalsClient | None = None,
+        context: AnalysisContext | None = None,
         provider_results: dict[str, Any] | None = None,
         display_days: int | None = None,
     ) -> PMCResult:
@@ -49,30 +126,91 @@ class PMCProvider(MetricProvider[PMCResult]):
 
         Args:
             daily_df: Polars DataFrame containing daily wellness/activity data.
-            client: The Intervals.icu client.
+            context: The per-analysis data context.
             provider_results: Mapping of previous provider results.
             display_days: Optional number of days to display.
 
         Returns:
             The structured calculation result.
         """
-        # Compute CTL, ATL using exponentially weighted moving averages
-        alpha_ctl = 1 - math.exp(-1 / self._chronic_days)
-        alpha_atl = 1 - math.exp(-1 / self._acute_days)
+        fit = fit_time_constants(daily_df) if self.fit_time_constants else None
+        persisted = context.get(Dataset.PMC) if context else None
+        if persisted is not None and (self.chronic_days, self.acute_days) == (CHRONIC_DAYS, ACUTE_DAYS):
+            pmc_df = self._from_persisted(daily_df, persisted)
+        else:
+            # Compute CTL, ATL as exponentially weighted moving averages, seeded with the first day
+            loads = impulse_response(daily_df["training_stress"], (self.chronic_days, self.acute_days), initial=None)
+            pmc_df = pl.DataFrame({
+                "date": daily_df["date"],
+                "ctl": loads[load_column(self.chronic_days)],
+                "atl": loads[load_column(self.acute_days)],
+            }).with_columns((pl.col("ctl") - pl.col("atl")).alias("tsb"))
 
-        pmc_df = daily_df.select([
-            pl.col("date"),
-            pl.col("training_stress").ewm_mean(alpha=alpha_ctl, adjust=False).alias("ctl"),
-            pl.col("training_stress").ewm_mean(alpha=alpha_atl, adjust=False).alias("atl"),
-        ]).with_columns((pl.col("ctl") - pl.col("atl")).alias("tsb"))
+        planned = context.get(Dataset.PLANNED_STRESS) if context else None
+        projected = pl.DataFrame(schema=_SERIES_SCHEMA)
+        if planned is not None and not pmc_df.is_empty():
+            last = pmc_df.row(-1, named=True)
+            projected = self._project(PMCPoint(day=last["date"], ctl=last["ctl"], atl=last["atl"]), planned)
 
         return PMCResult(
             dates=pmc_df["date"].dt.strftime("%Y-%m-%d").to_list(),
             ctl=pmc_df["ctl"].to_list(),
             atl=pmc_df["atl"].to_list(),
             tsb=pmc_df["tsb"].to_list(),
+            projected_dates=projected["date"].dt.strftime("%Y-%m-%d").to_list(),
+            projected_ctl=projected["ctl"].to_list(),
+            projected_atl=projected["atl"].to_list(),
+            projected_tsb=projected["tsb"].to_list(),
+            chronic_days=self.chronic_days,
+            acute_days=self.acute_days,
+            fitted_chronic_days=fit.fitness_days if fit else None,
+            fitted_acute_days=fit.fatigue_days if fit else None,
+        )
+
+    @staticmethod
+    def _from_persisted(daily_df: pl.DataFrame, persisted: pl.DataFrame) -> pl.DataFrame:
+        """Aligns the persisted PMC with the analyzed days.
+
+        Args:
+            daily_df: Polars DataFrame containing daily wellness/activity data.
+            persisted: The persisted PMC with `date`, `ctl` and `atl` columns.
+
+        Returns:
+            The daily `ctl`, `atl` and `tsb` values of the analyzed days.
+        """
+        return (
+            daily_df
+            .select("date")
+            .join(persisted.select("date", "ctl", "atl"), on="date", how="left")
+            .sort("date")
+            # Days after the last persisted day keep its values, days before the first activity have no load
+            .with_columns(pl.col("ctl", "atl").forward_fill().fill_null(0.0))
+            .with_columns((pl.col("ctl") - pl.col("atl")).alias("tsb"))
         )
 
+    def _project(self, state: PMCPoint, planned: pl.DataFrame) -> pl.DataFrame:
+        """Continues the PMC through the planned days after the analyzed days.
+
+        Days without a planned workout are rest days. CTL and ATL each continue from the state in one vectorised pass.
+
+        Args:
+            state: The values at the end of the last analyzed day.
+            planned: The planned `training_stress` per `date`.
+
+        Returns:
+            The projected daily `ctl`, `atl` and `tsb` values, empty if nothing is planned after the state.
+        """
+        planned = planned.filter(pl.col("date") > state.day)
+        if planned.is_empty():
+            return pl.DataFrame(schema=_SERIES_SCHEMA)
+
+        last = cast("date", planned["date"].max())
+        days = pl.DataFrame({"date": pl.date_range(state.day + timedelta(days=1), last, interval="1d", eager=True)})
+        stress = days.join(planned, on="date", how="left")["training_stress"]
+        ctl = impulse_response(stress, (self.chronic_days,), initial=state.ctl)[load_column(self.chronic_days)]
+        atl = impulse_response(stress, (self.acute_days,), initial=state.atl)[load_column(self.acute_days)]
+        return days.with_columns(ctl=ctl, atl=atl, tsb=ctl - atl)
+
     @override
     async def provide_context(self, result: PMCResult) -> str:
         """Provides PMC context.
@@ -90,12 +228,28 @@ class PMCProvider(MetricProvider[PMCResult]):
         last_atl = result.atl[-1]
         last_tsb = result.tsb[-1]
 
-        return (
+        context = (
             "Current Fitness (PMC):\n"
             f"- Fitness (CTL): {last_ctl:.1f}\n"
             f"- Fatigue (ATL): {last_atl:.1f}\n"
             f"- Form (TSB): {last_tsb:.1f}"
         )
+        if (result.chronic_days, result.acute_days) != (CHRONIC_DAYS, ACUTE_DAYS):
+            context += f"\n- Time constants: {result.chronic_days:g} days (CTL), {result.acute_days:g} days (ATL)"
+        if result.fitted_chronic_days is not None and result.fitted_acute_days is not None:
+            context += (
+                f"\n- Time constants fitted to the athlete's FTP changes: {result.fitted_chronic_days:g} days (CTL), "
+                f"{result.fitted_acute_days:g} days (ATL), the values above use {result.chronic_days:g}/"
+                f"{result.acute_days:g} days"
+            )
+        if result.projected_dates:
+            context += (
+                f"\nProjected Fitness after the planned workouts ({result.projected_dates[-1]}):\n"
+                f"- Fitness (CTL): {result.projected_ctl[-1]:.1f}\n"
+                f"- Fatigue (ATL): {result.projected_atl[-1]:.1f}\n"
+                f"- Form (TSB): {result.projected_tsb[-1]:.1f}"
+            )
+        return context
 
     @override
     def get_dashboard_widget(self, result: PMCResult, display_days: int | None = None) -> DashboardWidget | None:
@@ -132,5 +286,9 @@ class PMCProvider(MetricProvider[PMCResult]):
                 "ctl": ctl,
                 "atl": atl,
                 "tsb": tsb,
+                "projected_dates": result.projected_dates,
+                "projected_ctl": result.projected_ctl,
+                "projected_atl": result.projected_atl,
+                "projected_tsb": result.projected_tsb,
             },
         )
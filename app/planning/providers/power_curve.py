@@ -3,13 +3,14 @@
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, Any, override
 
-from app.intervals.parser.power_curve import parse_power_curves
-from app.planning.providers.interfaces import DashboardWidget, MetricProvider
+from app.intervals.parser.power_curve import primary_curve
+from app.planning.providers.interfaces import AnalysisContext, DashboardWidget, Dataset, MetricProvider
 
 if TYPE_CHECKING:
     import polars as pl
 
-    from app.intervals.client import IntervalsClient
+# Durations of the reported peaks in seconds, in the order of the `PowerCurveResult` fields
+PEAK_DURATIONS = (1, 15, 60, 300, 1200, 3600)
 
 
 @dataclass(frozen=True)
@@ -36,11 +37,20 @@ class PowerCurveProvider(MetricProvider[PowerCurveResult | None]):
         """
         return "power_curve"
 
+    @override
+    def get_required_datasets(self) -> set[Dataset]:
+        """Returns the datasets the provider reads from the analysis context.
+
+        Returns:
+            The required datasets.
+        """
+        return {Dataset.POWER_CURVES}
+
     @override
     def calculate(
         self,
         daily_df: pl.DataFrame,
-        client: IntervalsClient | None = None,
+        context: AnalysisContext | None = None,
         provider_results: dict[str, Any] | None = None,
         display_days: int | None = None,
     ) -> PowerCurveResult | None:
@@ -48,37 +58,21 @@ class PowerCurveProvider(MetricProvider[PowerCurveResult | None]):
 
         Args:
             daily_df: Polars DataFrame containing daily wellness/activity data.
-            client: The Intervals.icu client.
+            context: The per-analysis data context.
             provider_results: Mapping of previous provider results.
             display_days: Optional number of days to display.
 
         Returns:
             The structured calculation result or None if no data available.
         """
-        # Fetch power curve directly using client
-        if client is None:
+        # Reuse the power curves fetched for this analysis run
+        curves = context.get(Dataset.POWER_CURVES) if context else None
+        curve = primary_curve(curves) if curves else None
+        if curve is None:
             return None
-        raw_curves = client.power_curves(curves="90d")
-
-        curves = parse_power_curves(raw_curves)
-        if not curves:
-            return None
-        c = curves[0]
-
-        def _get_peak(secs: int) -> int | None:
-            for p in c.points:
-                if p.secs == secs:
-                    return p.watts
-            return None
-
-        return PowerCurveResult(
-            peak_1s=_get_peak(1),
-            peak_15s=_get_peak(15),
-            peak_1m=_get_peak(60),
-            peak_5m=_get_peak(300),
-            peak_20m=_get_peak(1200),
-            peak_60m=_get_peak(3600),
-        )
+        # Durations missing from the payload are interpolated between their neighbours
+        peaks = [None if w is None else round(w) for w in curve.watts_at(PEAK_DURATIONS)]
+        return PowerCurveResult(*peaks)
 
     @override
     async def provide_context(self, result: PowerCurveResult | None) -> str:
@@ -0,0 +1,194 @@
+"""Power curve comparison metric provider."""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, override
+
+from app.intervals.parser.power_curve import CURVE_WINDOWS, PRIMARY_CURVE
+from app.planning.providers.interfaces import AnalysisContext, DashboardWidget, Dataset, MetricProvider
+
+if TYPE_CHECKING:
+    import polars as pl
+
+    from app.intervals.parser.power_curve import ParsedPowerCurve
+
+# Durations in seconds all windows are aligned on
+COMPARISON_SECS = (1, 5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600, 7200)
+# The recent window is compared against the longer ones, the baseline decides whether a duration improves or fades
+RECENT_WINDOW = CURVE_WINDOWS[0]
+BASELINE_WINDOW = PRIMARY_CURVE
+# Within this many percent of the baseline the baseline's best was set recently
+IMPROVING_PCT = 1.0
+# Beyond this many percent below the baseline the duration fades
+FADING_PCT = 5.0
+COMPARISON_CACHE_SIZE = 256
+
+
+@dataclass(frozen=True)
+class PowerCurveComparisonResult:
+    """Power curves of several windows aligned on shared durations.
+
+    The deltas are the percentage difference of the recent window to each longer window per duration. A window's best
+    is never below the best of a window it contains, so the deltas are at most zero.
+    """
+
+    secs: list[int]
+    watts: dict[str, list[float | None]]
+    deltas: dict[str, list[float | None]]
+    improving: list[int]
+    fading: list[int]
+
+
+def format_duration(secs: int) -> str:
+    """Formats a duration of the comparison grid.
+
+    Args:
+        secs: The duration in seconds.
+
+    Returns:
+        The duration in seconds, minutes or hours, e.g. `5m`.
+    """
+    if secs < 60:  # noqa: PLR2004
+        return f"{secs}s"
+    if secs < 3600:  # noqa: PLR2004
+        return f"{secs // 60}m"
+    return f"{secs // 3600}h"
+
+
+@lru_cache(maxsize=COMPARISON_CACHE_SIZE)
+def compare_curves(curves: tuple[ParsedPowerCurve, ...]) -> PowerCurveComparisonResult | None:
+    """Aligns power curves on the comparison durations and compares the recent window with the longer ones.
+
+    Results are cached by the curves' ids and points, so unchanged curves are not aligned again.
+
+    Args:
+        curves: The curves of the `CURVE_WINDOWS`, identified by their ids.
+
+    Returns:
+        The comparison, or None without the recent window or a longer window to compare it with.
+    """
+    by_window = {c.id: c for c in curves if c.id in CURVE_WINDOWS}
+    if RECENT_WINDOW not in by_window or len(by_window) < 2:  # noqa: PLR2004
+        return None
+
+    watts = {window: by_window[window].watts_at(COMPARISON_SECS) for window in CURVE_WINDOWS if window in by_window}
+    recent = watts[RECENT_WINDOW]
+    deltas = {
+        window: [
+            None if r is None or w is None or w <= 0 else (r / w - 1) * 100 for r, w in zip(recent, values, strict=True)
+        ]
+        for window, values in watts.items()
+        if window != RECENT_WINDOW
+    }
+
+    # Compare with the baseline, or the shortest longer window if the baseline is missing
+    baseline = deltas.get(BASELINE_WINDOW) or next(iter(deltas.values()))
+    return PowerCurveComparisonResult(
+        secs=list(COMPARISON_SECS),
+        watts=watts,
+        deltas=deltas,
+        improving=[s for s, d in zip(COMPARISON_SECS, baseline, strict=True) if d is not None and d >= -IMPROVING_PCT],
+        fading=[s for s, d in zip(COMPARISON_SECS, baseline, strict=True) if d is not None and d <= -FADING_PCT],
+    )
+
+
+class PowerCurveComparisonProvider(MetricProvider[PowerCurveComparisonResult | None]):
+    """Compares the recent power curve with the 90 day, season and all-time curves.
+
+    All windows arrive with the power curves of the analysis, which are fetched in a single request.
+    """
+
+    @override
+    def get_name(self) -> str:
+        """Returns the provider name.
+
+        Returns:
+            The provider name.
+        """
+        return "power_curve_comparison"
+
+    @override
+    def get_required_datasets(self) -> set[Dataset]:
+        """Returns the datasets the provider reads from the analysis context.
+
+        Returns:
+            The required datasets.
+        """
+        return {Dataset.POWER_CURVES}
+
+    @override
+    def calculate(
+        self,
+        daily_df: pl.DataFrame,
+        context: AnalysisContext | None = None,
+        provider_results: dict[str, Any] | None = None,
+        display_days: int | None = None,
+    ) -> PowerCurveComparisonResult | None:
+        """Perform calculations on raw data and return a structured result.
+
+        Args:
+            daily_df: Polars DataFrame containing daily wellness/activity data.
+            context: The per-analysis data context.
+            provider_results: Mapping of previous provider results.
+            display_days: Optional number of days to display.
+
+        Returns:
+            The comparison or None if fewer than two windows are available.
+        """
+        curves = context.get(Dataset.POWER_CURVES) if context else None
+        if not curves:
+            return None
+        return compare_curves(tuple(curves))
+
+    @override
+    async def provide_context(self, result: PowerCurveComparisonResult | None) -> str:
+        """Provides power curve comparison context.
+
+        Args:
+            result: The result from the calculate method.
+
+        Returns:
+            A formatted string containing the power curve comparison context.
+        """
+        if result is None:
+            return "No power curve comparison available."
+
+        lines = [f"Power Curve Trend (last {RECENT_WINDOW} vs. longer windows):"]
+        for i, secs in enumerate(result.secs):
+            deltas = [
+                f"{d:+.0f}% vs {window}" for window, values in result.deltas.items() if (d := values[i]) is not None
+            ]
+            if deltas:
+                lines.append(f"- {format_duration(secs)}: {', '.join(deltas)}")
+        lines.extend((
+            f"- Improving: {', '.join(map(format_duration, result.improving)) or 'none'}",
+            f"- Fading: {', '.join(map(format_duration, result.fading)) or 'none'}",
+        ))
+        return "\n".join(lines)
+
+    @override
+    def get_dashboard_widget(
+        self, result: PowerCurveComparisonResult | None, display_days: int | None = None
+    ) -> DashboardWidget | None:
+        """Format the calculation result for the dashboard.
+
+        Args:
+            result: The result from the calculate method.
+            display_days: Optional number of days to display.
+
+        Returns:
+            The dashboard widget.
+        """
+        if result is None:
+            return None
+
+        return DashboardWidget(
+            name="power_curve_comparison",
+            title="Power Curve Comparison",
+            custom_template="widgets/power_curve_comparison_chart.html",
+            data={
+                "labels": [format_duration(s) for s in result.secs],
+                "watts": result.watts,
+                "deltas": result.deltas,
+            },
+        )
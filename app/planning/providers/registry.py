@@ -1,28 +1,100 @@
 """Registry for managing and executing metric providers."""
 
+import asyncio
+import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from graphlib import TopologicalSorter
 from typing import TYPE_CHECKING, Any
 
+import polars as pl
+
 from app.planning.providers.activity import ActivityProvider
 from app.planning.providers.activity_type import ActivityTypeProvider
+from app.planning.providers.aggregation import collect_daily_frame, evaluate_aggregations
+from app.planning.providers.critical_power import CriticalPowerProvider
 from app.planning.providers.ftp_trajectory import FTPTrajectoryProvider
+from app.planning.providers.instrumentation import Phase, ProviderMetrics, ProviderProfiler
 from app.planning.providers.intensity import IntensityProvider
+from app.planning.providers.interfaces import AnalysisContext
 from app.planning.providers.pmc import PMCProvider
 from app.planning.providers.power_curve import PowerCurveProvider
+from app.planning.providers.power_curve_comparison import PowerCurveComparisonProvider
+from app.planning.providers.time_in_zone import TimeInZoneProvider
 from app.planning.providers.wellness import WellnessProvider
 
 if TYPE_CHECKING:
-    import polars as pl
+    from collections.abc import Collection
+    from concurrent.futures import Future
 
-    from app.intervals.client import IntervalsClient
     from app.planning.providers.interfaces import DashboardWidget, MetricProvider
 
+_LOGGER = logging.getLogger(__name__)
+
+# Providers are mostly Polars expressions which release the GIL, so a few threads cover the independent ones
+PROVIDER_WORKERS = 4
+CONTEXT_CONCURRENCY = 4
+CONTEXT_TIMEOUT_SECONDS = 5.0
+# Context of a provider that did not answer in time, so the LLM knows the information is missing
+CONTEXT_TIMEOUT_FALLBACK = "{name}: context unavailable (timed out)."
+# Name under which the daily frame and the fused aggregation query of a run are profiled
+AGGREGATION_PROFILE = "aggregation"
+
+
+@dataclass(frozen=True)
+class _AnalysisRun:
+    """Inputs shared by all providers of one analysis run."""
+
+    daily_df: pl.DataFrame
+    context: AnalysisContext
+    display_days: int | None
+    profiler: ProviderProfiler
+    widgets: bool = True
+
+    def run(
+        self, provider: MetricProvider[Any], provider_results: dict[str, Any]
+    ) -> tuple[Any, DashboardWidget | None]:
+        """Calculates a provider's result and widget.
+
+        Args:
+            provider: The provider to run.
+            provider_results: The results of the provider's dependencies.
+
+        Returns:
+            The provider's result and widget, None if widgets are not requested.
+        """
+        name = provider.get_name()
+        with self.profiler.measure(name, Phase.CALCULATE):
+            res = provider.calculate(
+                self.daily_df,
+                context=self.context,
+                provider_results=provider_results,
+                display_days=self.display_days,
+            )
+        if not self.widgets:
+            return res, None
+        with self.profiler.measure(name, Phase.WIDGET):
+            widget = provider.get_dashboard_widget(res, display_days=self.display_days)
+        return res, widget
+
 
 class MetricRegistry:
-    """Registry that holds all active metric providers."""
+    """Registry that holds all active metric providers.
+
+    Providers declare the providers they depend on. Each analysis runs them along the resulting dependency graph on a
+    thread pool, so independent providers are calculated concurrently and the analysis takes as long as the slowest
+    chain of dependent providers.
+    """
+
+    def __init__(self, max_workers: int = PROVIDER_WORKERS) -> None:
+        """Initializes an empty registry.
 
-    def __init__(self) -> None:
-        """Initializes an empty registry."""
+        Args:
+            max_workers: Maximum number of providers calculated concurrently.
+        """
         self.providers: list[MetricProvider[Any]] = []
+        self.metrics = ProviderMetrics()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="metric-provider")
 
     def register(self, provider: MetricProvider[Any]) -> None:
         """Registers a new provider.
@@ -32,64 +104,191 @@ class MetricRegistry:
         """
         self.providers.append(provider)
 
-    def process_analysis(
+    def dependency_graph(self) -> dict[str, set[str]]:
+        """Builds the dependency graph of the registered providers.
+
+        Returns:
+            Mapping of provider names to the names of the providers they depend on.
+
+        Raises:
+            ValueError: If a provider depends on a provider that is not registered.
+        """
+        graph = {provider.get_name(): set(provider.get_dependencies()) for provider in self.providers}
+        for name, dependencies in graph.items():
+            if unknown := dependencies - graph.keys():
+                msg = f"Provider {name!r} depends on unregistered providers {sorted(unknown)}"
+                raise ValueError(msg)
+        return graph
+
+    def resolve(self, names: Collection[str] | None = None) -> list[MetricProvider[Any]]:
+        """Selects providers together with all providers they transitively depend on.
+
+        Args:
+            names: The names of the requested providers, None for all registered providers.
+
+        Returns:
+            The selected providers in registration order.
+
+        Raises:
+            ValueError: If a requested provider is not registered.
+        """
+        graph = self.dependency_graph()
+        if names is None:
+            return list(self.providers)
+        if unknown := set(names) - graph.keys():
+            msg = f"Unknown providers requested: {sorted(unknown)}"
+            raise ValueError(msg)
+
+        selected: set[str] = set()
+        pending = list(names)
+        while pending:
+            name = pending.pop()
+            if name not in selected:
+                selected.add(name)
+                pending.extend(graph[name])
+        return [provider for provider in self.providers if provider.get_name() in selected]
+
+    def process_analysis(  # noqa: PLR0913
         self,
-        daily_df: pl.DataFrame,
-        client: IntervalsClient | None = None,
+        daily_df: pl.DataFrame | pl.LazyFrame,
+        context: AnalysisContext | None = None,
         display_days: int | None = None,
+        *,
+        profiler: ProviderProfiler | None = None,
+        providers: Collection[str] | None = None,
+        widgets: bool = True,
     ) -> tuple[dict[str, Any], list[DashboardWidget]]:
-        """Run calculations for all providers and collect results/widgets.
+        """Run calculations for the requested providers and collect results/widgets.
 
         Args:
-            daily_df: Polars DataFrame containing daily wellness/activity data.
-            client: The Intervals.icu client.
+            daily_df: Polars DataFrame containing daily wellness/activity data, or its query which is collected together
+                with the providers' aggregations.
+            context: The per-analysis data context shared by all providers.
             display_days: Optional number of days to display in widgets.
+            profiler: Optional profiler to collect the measurements of this run, e.g. with memory tracing.
+            providers: Names of the providers to run, their dependencies are run as well. None runs all providers.
+            widgets: Whether to build the dashboard widgets.
 
         Returns:
             tuple[dict[str, Any], list[DashboardWidget]]: A tuple containing:
-                - dict[str, Any]: Mapping of provider names to their calculation results.
-                - list[DashboardWidget]: List of dashboard widgets generated by the providers.
+                - dict[str, Any]: Mapping of provider names to their calculation results, in registration order.
+                - list[DashboardWidget]: List of dashboard widgets generated by the providers, in registration order.
         """
-        results: dict[str, Any] = {}
-        widgets: list[DashboardWidget] = []
-        for provider in self.providers:
-            res = provider.calculate(
-                daily_df,
-                client=client,
-                provider_results=results,
-                display_days=display_days,
-            )
-            results[provider.get_name()] = res
-            widget = provider.get_dashboard_widget(res, display_days=display_days)
-            if widget:
-                widgets.append(widget)
-        return results, widgets
+        selected = self.resolve(providers)
+        context = context or AnalysisContext()
+        # Fetch every dataset required by the selected providers exactly once for this run
+        context.prefetch(set().union(*(provider.get_required_datasets() for provider in selected)))
+
+        profiler = profiler or ProviderProfiler(self.metrics)
+        # Scan the daily frame once for the aggregations of all selected providers
+        schema = daily_df.collect_schema()
+        aggregations = {provider.get_name(): provider.get_aggregations(schema, display_days) for provider in selected}
+        if isinstance(daily_df, pl.LazyFrame):
+            with profiler.measure(AGGREGATION_PROFILE, Phase.CALCULATE):
+                daily_df, values = collect_daily_frame(daily_df, aggregations)
+            context.aggregates.update(values)
+        elif any(len(expressions) for expressions in aggregations.values()):
+            with profiler.measure(AGGREGATION_PROFILE, Phase.CALCULATE):
+                context.aggregates.update(evaluate_aggregations(daily_df, aggregations))
+
+        run = _AnalysisRun(daily_df, context, display_days, profiler, widgets)
+        outputs = self._run_graph(run, selected)
+
+        results = {name: outputs[name][0] for name in (provider.get_name() for provider in selected)}
+        provider_widgets = [widget for _, widget in (outputs[name] for name in results) if widget]
+        return results, provider_widgets
+
+    def _run_graph(
+        self, run: _AnalysisRun, providers: list[MetricProvider[Any]]
+    ) -> dict[str, tuple[Any, DashboardWidget | None]]:
+        """Runs every provider as soon as its dependencies are done.
 
-    async def get_combined_context(self, results: dict[str, Any]) -> str:
+        Runs that trace memory calculate one provider at a time in dependency order, as concurrent providers would add to
+        each other's allocation peaks.
+
+        Args:
+            run: The inputs of the analysis run.
+            providers: The providers to run, including all their dependencies.
+
+        Returns:
+            Mapping of provider names to their result and widget.
+        """
+        by_name = {provider.get_name(): provider for provider in providers}
+        graph = {name: set(provider.get_dependencies()) for name, provider in by_name.items()}
+        sorter = TopologicalSorter(graph)
+        outputs: dict[str, tuple[Any, DashboardWidget | None]] = {}
+        if run.profiler.trace_memory:
+            for name in sorter.static_order():
+                outputs[name] = run.run(by_name[name], {dep: outputs[dep][0] for dep in graph[name]})
+            return outputs
+
+        sorter.prepare()
+        pending: dict[Future[tuple[Any, DashboardWidget | None]], str] = {}
+        while sorter.is_active():
+            for name in sorter.get_ready():
+                dependency_results = {dep: outputs[dep][0] for dep in graph[name]}
+                pending[self._executor.submit(run.run, by_name[name], dependency_results)] = name
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = pending.pop(future)
+                outputs[name] = future.result()
+                sorter.done(name)
+        return outputs
+
+    async def get_combined_context(
+        self,
+        results: dict[str, Any],
+        *,
+        max_concurrency: int = CONTEXT_CONCURRENCY,
+        timeout_seconds: float = CONTEXT_TIMEOUT_SECONDS,
+    ) -> str:
         """Collects and combines context from all registered providers.
 
+        The providers are queried concurrently, the contexts are combined in registration order. A provider exceeding
+        the timeout is cancelled and replaced by a fallback notice. Cancellation only takes effect at an `await`, so it
+        cannot interrupt a provider that blocks the event loop.
+
         Args:
             results: Mapping of provider names to their calculation results.
+            max_concurrency: Maximum number of providers queried at the same time.
+            timeout_seconds: Time after which a provider's context is replaced by the fallback.
 
         Returns:
             Combined context string from all providers.
         """
-        contexts: list[str] = []
-        for provider in self.providers:
-            res = results.get(provider.get_name())
-            if res is not None:
-                context = await provider.provide_context(res)
-                if context:
-                    contexts.append(context)
-        return "\n\n".join(contexts)
+        profiler = ProviderProfiler(self.metrics)
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def provide(provider: MetricProvider[Any], result: Any) -> str:  # noqa: ANN401
+            name = provider.get_name()
+            async with semaphore:
+                try:
+                    async with asyncio.timeout(timeout_seconds):
+                        with profiler.measure(name, Phase.CONTEXT):
+                            return await provider.provide_context(result)
+                except TimeoutError:
+                    _LOGGER.warning("Context of provider %s timed out after %.1fs", name, timeout_seconds)
+                    return CONTEXT_TIMEOUT_FALLBACK.format(name=name)
+
+        contexts = await asyncio.gather(
+            *(
+                provide(provider, results[provider.get_name()])
+                for provider in self.providers
+                if results.get(provider.get_name()) is not None
+            )
+        )
+        return "\n\n".join(context for context in contexts if context)
 
 
 # Global registry instance
 registry = MetricRegistry()
-registry.register(PMCProvider())
+registry.register(PMCProvider(fit_time_constants=True))
 registry.register(ActivityProvider())
 registry.register(ActivityTypeProvider())
 registry.register(WellnessProvider())
 registry.register(PowerCurveProvider())
+registry.register(CriticalPowerProvider())
+registry.register(PowerCurveComparisonProvider())
 registry.register(FTPTrajectoryProvider())
 registry.register(IntensityProvider())
+registry.register(TimeInZoneProvider())
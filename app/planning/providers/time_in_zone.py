@@ -0,0 +1,228 @@
+"""Rolling time-in-zone metric provider."""
+
+from dataclasses import dataclass
+from typing import Any, override
+
+import polars as pl
+
+from app.intervals.parser.activity import MAX_ZONES, zone_count_column
+from app.intervals.time_in_zone import THREE_ZONE_MODEL, WINDOWS, polarization_index, window_label, zone_shares
+from app.planning.providers.aggregation import provider_aggregates, windowed
+from app.planning.providers.intensity import POWER_ZONE_SS_IDX, ZONE_COLUMNS
+from app.planning.providers.interfaces import AnalysisContext, DashboardWidget, MetricProvider
+
+# Window shown by default on the dashboard
+DEFAULT_WINDOW = 7
+# Windows summarized for the LLM
+CONTEXT_WINDOWS = (7, 28)
+# The polarization index trend is sampled every few days, keeping the context short for long display windows
+CONTEXT_SAMPLE_DAYS = 7
+CONTEXT_SAMPLES = 8
+# Low / mid / high bands of the HR zones, matching the intensity context
+HR_BANDS = ((0, 1), (2,), tuple(range(3, MAX_ZONES)))
+# Zones left out of the distributions, Sweet Spot overlaps the other power zones
+_EXCLUDED = {"hr_zone_times": (), "power_zone_times": (POWER_ZONE_SS_IDX,)}
+
+
+@dataclass(frozen=True)
+class TimeInZoneResult:
+    """Daily and rolling time-in-zone distributions.
+
+    Shares are keyed by zone column and window label, and hold one series in percent per zone, aligned with `dates`.
+    The polarization index of the power zones is keyed by window label.
+    """
+
+    dates: list[str]
+    shares: dict[str, dict[str, list[list[float | None]]]]
+    polarization_index: dict[str, list[float | None]]
+
+
+def _aggregation(column: str, window: int, zone: int) -> str:
+    """Returns the aggregation name of a zone share series.
+
+    Returns:
+        The name.
+    """
+    return f"{column}_{window}d_{zone}"
+
+
+def _latest(series: list[float | None]) -> float | None:
+    """Returns the last known value of a series.
+
+    Returns:
+        The value, None if the series has none.
+    """
+    return next((value for value in reversed(series) if value is not None), None)
+
+
+class TimeInZoneProvider(MetricProvider[TimeInZoneResult | None]):
+    """Provides daily and rolling time-in-zone distributions with the polarization index trend.
+
+    All windows of both zone columns are expressions of the fused aggregation query, so they are computed in one pass
+    over the daily zone arrays.
+    """
+
+    @override
+    def get_name(self) -> str:
+        """Returns the provider name.
+
+        Returns:
+            The provider name.
+        """
+        return "time_in_zone"
+
+    @override
+    def get_aggregations(self, schema: pl.Schema, display_days: int | None) -> dict[str, pl.Expr]:
+        """Returns the aggregations the provider reads from the daily frame.
+
+        The rolling windows cover the full data, only the display window is returned.
+
+        Args:
+            schema: The schema of the daily frame.
+            display_days: Optional number of days to display.
+
+        Returns:
+            The dates, the number of zones, the zone share series of every window and the polarization index series.
+        """
+        columns = [column for column in ZONE_COLUMNS if column in schema]
+        if not columns:
+            return {}
+
+        aggregations = {"dates": windowed(pl.col("date").dt.to_string("%Y-%m-%d"), display_days).implode()}
+        for column in columns:
+            count = zone_count_column(column)
+            aggregations[count] = windowed(pl.col(count), display_days).max()
+            for window in WINDOWS:
+                shares = zone_shares(column, window, _EXCLUDED[column])
+                for zone, share in enumerate(shares):
+                    if share is not None:
+                        aggregations[_aggregation(column, window, zone)] = windowed(
+                            share.round(1), display_days
+                        ).implode()
+                if column == "power_zone_times":
+                    aggregations[f"polarization_{window}d"] = windowed(
+                        polarization_index(shares).round(2), display_days
+                    ).implode()
+        return aggregations
+
+    @override
+    def calculate(
+        self,
+        daily_df: pl.DataFrame,
+        context: AnalysisContext | None = None,
+        provider_results: dict[str, Any] | None = None,
+        display_days: int | None = None,
+    ) -> TimeInZoneResult | None:
+        """Perform calculations on raw data and return a structured result.
+
+        Args:
+            daily_df: Polars DataFrame containing daily wellness/activity data.
+            context: The per-analysis data context.
+            provider_results: Mapping of previous provider results.
+            display_days: Optional number of days to display.
+
+        Returns:
+            The distributions, or None without any zone times.
+        """
+        aggregates = provider_aggregates(self, daily_df, context, display_days)
+        shares = {
+            column: {
+                window_label(window): [
+                    aggregates[_aggregation(column, window, zone)]
+                    for zone in range(aggregates.get(zone_count_column(column)) or 0)
+                    if zone not in _EXCLUDED[column]
+                ]
+                for window in WINDOWS
+            }
+            for column in ZONE_COLUMNS
+            if aggregates.get(zone_count_column(column))
+        }
+        if not shares:
+            return None
+
+        return TimeInZoneResult(
+            dates=aggregates["dates"],
+            shares=shares,
+            polarization_index=(
+                {window_label(w): aggregates[f"polarization_{w}d"] for w in WINDOWS}
+                if "power_zone_times" in shares
+                else {}
+            ),
+        )
+
+    @staticmethod
+    def _bands(zones: list[list[float | None]], bands: tuple[tuple[int, ...], ...]) -> str:
+        """Summarizes the latest zone shares as low / mid / high bands.
+
+        Returns:
+            The bands, e.g. `80% Low / 15% Mid / 5% High`.
+        """
+        latest = [_latest(series) or 0.0 for series in zones]
+        low, mid, high = (sum(latest[i] for i in band if i < len(latest)) for band in bands)
+        return f"{low:.0f}% Low / {mid:.0f}% Mid / {high:.0f}% High"
+
+    @override
+    async def provide_context(self, result: TimeInZoneResult | None) -> str:
+        """Provides a compressed summary of the rolling distributions.
+
+        Only the latest shares of the context windows and a sampled polarization index trend are reported, not the
+        daily series.
+
+        Args:
+            result: The result from the calculate method.
+
+        Returns:
+            A formatted string containing the time-in-zone context.
+        """
+        if result is None:
+            return "No time-in-zone data available."
+
+        lines = ["Time in Zone (rolling, weighted by time):"]
+        for column, label, bands in (
+            ("power_zone_times", "Power", THREE_ZONE_MODEL),
+            ("hr_zone_times", "Heart Rate", HR_BANDS),
+        ):
+            if column in result.shares:
+                windows = result.shares[column]
+                lines.extend(
+                    f"- {label} {window_label(w)}: {self._bands(windows[window_label(w)], bands)}"
+                    for w in CONTEXT_WINDOWS
+                )
+
+        trend = result.polarization_index.get(window_label(CONTEXT_WINDOWS[-1]), [])
+        samples = [value for value in trend[::-1][::CONTEXT_SAMPLE_DAYS][:CONTEXT_SAMPLES] if value is not None][::-1]
+        if samples:
+            lines.append(
+                f"- Polarization Index ({window_label(CONTEXT_WINDOWS[-1])}, every {CONTEXT_SAMPLE_DAYS} days): "
+                f"{', '.join(f'{value:.2f}' for value in samples)} (>2 is polarized)"
+            )
+        return "\n".join(lines)
+
+    @override
+    def get_dashboard_widget(
+        self, result: TimeInZoneResult | None, display_days: int | None = None
+    ) -> DashboardWidget | None:
+        """Format the calculation result for the dashboard.
+
+        Args:
+            result: The result from the calculate method.
+            display_days: Optional number of days to display.
+
+        Returns:
+            The dashboard widget.
+        """
+        if result is None:
+            return None
+
+        return DashboardWidget(
+            name="time_in_zone",
+            title="Time in Zone Trend",
+            custom_template="widgets/time_in_zone_chart.html",
+            data={
+                "labels": result.dates,
+                "hr": result.shares.get("hr_zone_times", {}),
+                "power": result.shares.get("power_zone_times", {}),
+                "polarization": result.polarization_index,
+                "default_window": window_label(DEFAULT_WINDOW),
+            },
+        )
@@ -1,14 +1,12 @@
 """Wellness metric provider."""
 
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, Any, cast, override
+from typing import Any, override
 
 import polars as pl
 
-from app.planning.providers.interfaces import DashboardWidget, MetricProvider
-
-if TYPE_CHECKING:
-    from app.intervals.client import IntervalsClient
+from app.planning.providers.aggregation import provider_aggregates, windowed
+from app.planning.providers.interfaces import AnalysisContext, DashboardWidget, MetricProvider
 
 RECENT_DAYS = 7
 
@@ -40,11 +38,44 @@ class WellnessProvider(MetricProvider[WellnessResult | None]):
         """
         return "wellness"
 
+    @override
+    def get_aggregations(self, schema: pl.Schema, display_days: int | None) -> dict[str, pl.Expr]:
+        """Returns the aggregations the provider reads from the daily frame.
+
+        Args:
+            schema: The schema of the daily frame.
+            display_days: Optional number of days to display.
+
+        Returns:
+            The series of the display window, the overall averages and the HRV of the recent days.
+        """
+        if "hrv" not in schema and "resting_hr" not in schema:
+            return {}
+
+        hrv = pl.col("hrv")
+        # The rolling averages are computed over the full data before the display window is applied
+        # min_samples=1 ensures we get values even at the start of the series
+        series = {
+            "hrv": hrv,
+            "hrv_7d": hrv.rolling_mean(window_size=RECENT_DAYS, min_samples=1),
+            "resting_hr": pl.col("resting_hr"),
+            "resting_hr_7d": pl.col("resting_hr").rolling_mean(window_size=RECENT_DAYS, min_samples=1),
+        }
+        return {
+            "days": pl.len(),
+            "dates": windowed(pl.col("date").dt.to_string("%Y-%m-%d"), display_days).implode(),
+            **{name: windowed(expr, display_days).implode() for name, expr in series.items()},
+            "avg_hrv": hrv.mean(),
+            "avg_resting_hr": pl.col("resting_hr").mean(),
+            "recent_hrv": hrv.tail(RECENT_DAYS).mean(),
+            "recent_hrv_trend": hrv.tail(RECENT_DAYS).drop_nulls().implode(),
+        }
+
     @override
     def calculate(
         self,
         daily_df: pl.DataFrame,
-        client: IntervalsClient | None = None,
+        context: AnalysisContext | None = None,
         provider_results: dict[str, Any] | None = None,
         display_days: int | None = None,
     ) -> WellnessResult | None:
@@ -52,64 +83,36 @@ class WellnessProvider(MetricProvider[WellnessResult | None]):
 
         Args:
             daily_df: Polars DataFrame containing daily wellness/activity data.
-            client: The Intervals.icu client.
+            context: The per-analysis data context.
             provider_results: Mapping of previous provider results.
             display_days: Optional number of days to display.
 
         Returns:
             The structured calculation result.
         """
-        if "hrv" not in daily_df.columns and "resting_hr" not in daily_df.columns:
+        aggregates = provider_aggregates(self, daily_df, context, display_days)
+        if not aggregates:
             return None
 
-        # Work with a subset for trends
-        # We need enough data for the rolling average
-        df = daily_df.select(["date", "hrv", "resting_hr"])
-
-        # Calculate 7-day rolling averages on FULL data
-        # min_samples=1 ensures we get values even at the start of the series
-        df = df.with_columns([
-            pl.col("hrv").rolling_mean(window_size=7, min_samples=1).alias("hrv_7d"),
-            pl.col("resting_hr").rolling_mean(window_size=7, min_samples=1).alias("resting_hr_7d"),
-        ])
-
-        # Overall averages for the entire period
-        avg_hrv = cast("float", df["hrv"].mean()) if "hrv" in df.columns else 0.0
-        avg_resting_hr = cast("float", df["resting_hr"].mean()) if "resting_hr" in df.columns else 0.0
-
-        # Filter for display if requested
-        display_df = df
-        if display_days:
-            today = df["date"].max()
-            if today:
-                start_date = today - pl.duration(days=display_days)
-                display_df = df.filter(pl.col("date") > start_date)
-
+        avg_hrv = aggregates["avg_hrv"] or 0.0
         # Trend analysis based on last 7 days vs baseline
-        if not df.is_empty() and len(df) >= RECENT_DAYS:
-            recent_hrv_series = df["hrv"][-RECENT_DAYS:]
-            recent_hrv = cast("float", recent_hrv_series.mean())
+        trend = "stable"
+        if aggregates["days"] >= RECENT_DAYS and (recent_hrv := aggregates["recent_hrv"]) is not None:
             if recent_hrv > (avg_hrv or 1) * 1.05:
                 trend = "improving"
             elif recent_hrv < (avg_hrv or 1) * 0.95:
                 trend = "declining"
-            else:
-                trend = "stable"
-            recent_hrv_trend = recent_hrv_series.drop_nulls().to_list()
-        else:
-            trend = "stable"
-            recent_hrv_trend = df["hrv"].drop_nulls().to_list() if "hrv" in df.columns else []
 
         return WellnessResult(
-            dates=display_df["date"].dt.to_string("%Y-%m-%d").to_list(),
-            hrv=display_df["hrv"].to_list(),
-            hrv_7d=display_df["hrv_7d"].to_list(),
-            resting_hr=display_df["resting_hr"].to_list(),
-            resting_hr_7d=display_df["resting_hr_7d"].to_list(),
-            avg_hrv=avg_hrv or 0.0,
-            avg_resting_hr=avg_resting_hr or 0.0,
+            dates=aggregates["dates"],
+            hrv=aggregates["hrv"],
+            hrv_7d=aggregates["hrv_7d"],
+            resting_hr=aggregates["resting_hr"],
+            resting_hr_7d=aggregates["resting_hr_7d"],
+            avg_hrv=avg_hrv,
+            avg_resting_hr=aggregates["avg_resting_hr"] or 0.0,
             hrv_trend=trend,
-            recent_hrv_trend=recent_hrv_trend,
+            recent_hrv_trend=aggregates["recent_hrv_trend"],
         )
 
     @override
@@ -8,6 +8,7 @@ from sqlmodel import Session, select
 
 from app.auth.auth import get_current_user_from_token
 from app.db import engine
+from app.intervals.pool import get_client_pool
 from app.models.user import User, UserSecrets
 
 router = APIRouter(prefix="/api/secrets", tags=["secrets"])
@@ -58,4 +59,6 @@ def store(
             session.rollback()
             raise HTTPException(status_code=500, detail=f"Failed to store secrets: {e}") from e
         else:
+            # Rebuild the pooled client with the new credentials on next use
+            get_client_pool().invalidate(user.id)
             return {"stored": True}
@@ -1,14 +1,11 @@
 """Web routes for the app."""
 
-from datetime import timedelta
-from typing import Annotated
+from typing import TYPE_CHECKING, Annotated
 
 import markdown
-import requests
 from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
-from requests_cache import CachedSession
 from sqlmodel import Session, select
 
 from app.auth.auth import (
@@ -19,18 +16,19 @@ from app.auth.auth import (
 )
 from app.config import Settings, get_settings
 from app.db import engine
-from app.intervals.analysis import compute_analysis
-from app.intervals.client import IntervalsClient
-from app.intervals.parser.activity import parse_activities
-from app.intervals.parser.power_curve import parse_power_curves
-from app.intervals.parser.wellness import parse_wellness_list
+from app.intervals.pool import get_intervals_client
 from app.models.user import User
+from app.planning.providers.instrumentation import PROFILE_HEADER
+from app.services.analysis_cache import get_analysis
 from app.services.plan_loader import load_user_plan
 from app.services.planner import (
     generate_weekly_plan,
     update_training_plan,
 )
 
+if TYPE_CHECKING:
+    from app.intervals.client import IntervalsClient
+
 router = APIRouter(tags=["web"])
 
 templates = Jinja2Templates(directory="app/templates")
@@ -45,6 +43,15 @@ def get_optional_user(request: Request) -> User | None:
     return get_current_user_from_token(request, auto_error=False)
 
 
+def profiling_requested(request: Request) -> bool:
+    """Checks whether the request asks for a provider profile via the profiling header.
+
+    Returns:
+        True if the header is set to a truthy value.
+    """
+    return request.headers.get(PROFILE_HEADER, "").lower() in {"1", "true", "yes", "on"}
+
+
 @router.get("/", response_class=HTMLResponse)
 def home(request: Request, user: Annotated[User | None, Depends(get_optional_user)]) -> HTMLResponse:
     """Home page for the app.
@@ -75,46 +82,25 @@ def home(request: Request, user: Annotated[User | None, Depends(get_optional_use
 
 
 @router.get("/dashboard", response_class=HTMLResponse)
-def dashboard(
+async def dashboard(
     request: Request,
     user: Annotated[User, Depends(get_current_user_from_token)],
     settings: Annotated[Settings, Depends(get_settings)],
+    client: Annotated[IntervalsClient, Depends(get_intervals_client)],
     days: int | None = None,
 ) -> HTMLResponse:
     """Dashboard page for the app.
 
     Returns:
-        The dashboard page as HTML.
+        The dashboard page as HTML, with a provider profile panel if requested via the profiling header.
     """
-    session = requests.Session()
-    if settings.CACHE_INTERVALS_HOURS > 0:
-        session = CachedSession(
-            "intervals_cache",
-            backend="sqlite",
-            expire_after=timedelta(hours=settings.CACHE_INTERVALS_HOURS),
-        )
-
-    client = IntervalsClient(
-        settings.INTERVALS_API_KEY,
-        settings.INTERVALS_ATHLETE_ID,
-        session=session,
-    )
-    # Fetch and parse data
-    raw_activities = client.activities(days=settings.ANALYSIS_DAYS)
-    activities = parse_activities(raw_activities)
-
-    raw_wellness = client.wellness(days=settings.ANALYSIS_DAYS)
-    wellness = parse_wellness_list(raw_wellness)
-
-    raw_power_curves = client.power_curves(curves="90d")
-    power_curves = parse_power_curves(raw_power_curves)
-
-    analysis = compute_analysis(
-        activities,
+    # Concurrent requests for the same athlete share one sync and analysis run
+    analysis = await get_analysis(
+        client,
+        settings.ANALYSIS_DAYS,
         display_days=days or settings.DASHBOARD_DAYS,
-        wellness_data=wellness,
-        power_curve=power_curves,
-        client=client,
+        user_id=user.id,
+        profile=profiling_requested(request),
     )
 
     return templates.TemplateResponse(
@@ -251,6 +237,7 @@ async def generate(
     request: Request,
     user: Annotated[User, Depends(get_current_user_from_token)],
     settings: Annotated[Settings, Depends(get_settings)],
+    client: Annotated[IntervalsClient, Depends(get_intervals_client)],
 ) -> HTMLResponse:
     """Generates the weekly plan for the athlete.
 
@@ -288,6 +275,7 @@ async def generate(
     result = await generate_weekly_plan(
         user=user,
         settings=settings,
+        client=client,
         weekly_hours=weekly_hours,
         weekly_sessions=weekly_sessions,
     )
@@ -0,0 +1,310 @@
+"""Service for keeping a local, incrementally synced copy of intervals.icu data."""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, timedelta
+from enum import StrEnum
+from typing import TYPE_CHECKING, Any
+
+from sqlmodel import Session, col, delete, select
+
+from app.db import engine
+from app.intervals.parser.power_curve import CURVE_WINDOWS
+from app.models.activity import StoredActivity, StoredWellness, SyncState
+from app.services.pmc_store import invalidate_pmc, update_pmc
+from app.utils.singleflight import AsyncSingleFlight
+
+if TYPE_CHECKING:
+    from app.intervals.client import AsyncIntervalsClient
+
+_LOGGER = logging.getLogger(__name__)
+
+# Days re-fetched before the last sync to pick up late uploads and edits of recent records
+SYNC_OVERLAP_DAYS = 2
+
+# Syncs in flight, one per athlete, so concurrent analyses never race on replacing the same records
+_SYNCS = AsyncSingleFlight()
+
+# Latest power curves per athlete and windows, with the day and the stored activities they were fetched for
+_POWER_CURVES: dict[tuple[str, str], tuple[tuple[date, int], dict[str, Any]]] = {}
+_POWER_CURVE_FETCHES = AsyncSingleFlight()
+
+
+class SyncDataset(StrEnum):
+    """Datasets kept in the local store."""
+
+    ACTIVITIES = "activities"
+    WELLNESS = "wellness"
+
+
+@dataclass(frozen=True)
+class IntervalsBundle:
+    """Raw payloads of the intervals.icu endpoints required for an analysis."""
+
+    activities: list[dict[str, Any]]
+    wellness: list[dict[str, Any]]
+    power_curves: dict[str, Any]
+
+
+@dataclass(frozen=True)
+class SyncPlan:
+    """Dates from which each dataset has to be requested to bring the store up to date."""
+
+    window_oldest: date
+    activities_oldest: date
+    wellness_oldest: date
+
+
+def get_sync_oldest(session: Session, athlete_id: str, dataset: SyncDataset, window_oldest: date) -> date:
+    """Returns the oldest date that has to be requested for a dataset.
+
+    The full window is requested if the dataset was never synced or the store does not reach back far enough.
+    Otherwise only the days since the last sync (plus a small overlap) are requested.
+
+    Args:
+        session: The database session.
+        athlete_id: The intervals.icu athlete id.
+        dataset: The dataset to sync.
+        window_oldest: The oldest date required by the analysis.
+
+    Returns:
+        The oldest date to request from intervals.icu.
+    """
+    state = session.get(SyncState, (athlete_id, dataset))
+    if state is None or state.oldest > window_oldest:
+        return window_oldest
+    return max(window_oldest, state.last_synced - timedelta(days=SYNC_OVERLAP_DAYS))
+
+
+def _update_sync_state(session: Session, athlete_id: str, dataset: SyncDataset, synced_from: date, today: date) -> None:
+    """Records a successful sync of a dataset.
+
+    Args:
+        session: The database session.
+        athlete_id: The intervals.icu athlete id.
+        dataset: The synced dataset.
+        synced_from: The oldest date that was requested.
+        today: The date of the sync.
+    """
+    state = session.get(SyncState, (athlete_id, dataset))
+    if state is None:
+        state = SyncState(athlete_id=athlete_id, dataset=dataset, oldest=synced_from, last_synced=today)
+    else:
+        state.oldest = min(state.oldest, synced_from)
+        state.last_synced = today
+        state.updated_at = datetime.now(UTC)
+    session.add(state)
+
+
+def store_activities(
+    session: Session, athlete_id: str, activities: list[dict[str, Any]], synced_from: date, today: date
+) -> None:
+    """Stores freshly fetched activities, replacing the local records of the synced range.
+
+    Args:
+        session: The database session.
+        athlete_id: The intervals.icu athlete id.
+        activities: The raw activities returned by intervals.icu.
+        synced_from: The oldest date that was requested.
+        today: The date of the sync.
+    """
+    # Replace the whole synced range so that activities deleted upstream disappear locally as well
+    session.exec(
+        delete(StoredActivity).where(
+            col(StoredActivity.athlete_id) == athlete_id, col(StoredActivity.start_date) >= synced_from
+        )
+    )
+    # The training stress of the replaced range may have changed, the PMC is recomputed from there on
+    invalidate_pmc(session, athlete_id, synced_from)
+    for a in activities:
+        if "start_date_local" not in a:
+            _LOGGER.warning("Skipping activity without start date: %s", a.get("id"))
+            continue
+        session.merge(
+            StoredActivity(
+                athlete_id=athlete_id,
+                activity_id=str(a.get("id") or a["start_date_local"]),
+                start_date=date.fromisoformat(a["start_date_local"][:10]),
+                payload=a,
+            )
+        )
+    _update_sync_state(session, athlete_id, SyncDataset.ACTIVITIES, synced_from, today)
+    session.commit()
+
+
+def store_wellness(
+    session: Session, athlete_id: str, wellness: list[dict[str, Any]], synced_from: date, today: date
+) -> None:
+    """Stores freshly fetched wellness records, replacing the local records of the synced range.
+
+    Args:
+        session: The database session.
+        athlete_id: The intervals.icu athlete id.
+        wellness: The raw wellness records returned by intervals.icu.
+        synced_from: The oldest date that was requested.
+        today: The date of the sync.
+    """
+    session.exec(
+        delete(StoredWellness).where(
+            col(StoredWellness.athlete_id) == athlete_id, col(StoredWellness.day) >= synced_from
+        )
+    )
+    for w in wellness:
+        session.merge(StoredWellness(athlete_id=athlete_id, day=date.fromisoformat(w["id"]), payload=w))
+    _update_sync_state(session, athlete_id, SyncDataset.WELLNESS, synced_from, today)
+    session.commit()
+
+
+def load_activities(session: Session, athlete_id: str, oldest: date) -> list[dict[str, Any]]:
+    """Loads the locally stored activities of an athlete.
+
+    Args:
+        session: The database session.
+        athlete_id: The intervals.icu athlete id.
+        oldest: The oldest date to load.
+
+    Returns:
+        The raw activities ordered by date.
+    """
+    statement = (
+        select(StoredActivity)
+        .where(col(StoredActivity.athlete_id) == athlete_id, col(StoredActivity.start_date) >= oldest)
+        .order_by(col(StoredActivity.start_date))
+    )
+    return [a.payload for a in session.exec(statement)]
+
+
+def load_wellness(session: Session, athlete_id: str, oldest: date) -> list[dict[str, Any]]:
+    """Loads the locally stored wellness records of an athlete.
+
+    Args:
+        session: The database session.
+        athlete_id: The intervals.icu athlete id.
+        oldest: The oldest date to load.
+
+    Returns:
+        The raw wellness records ordered by date.
+    """
+    statement = (
+        select(StoredWellness)
+        .where(col(StoredWellness.athlete_id) == athlete_id, col(StoredWellness.day) >= oldest)
+        .order_by(col(StoredWellness.day))
+    )
+    return [w.payload for w in session.exec(statement)]
+
+
+def _plan_sync(athlete_id: str, window_oldest: date) -> SyncPlan:
+    """Determines which date ranges have to be fetched for an athlete.
+
+    Returns:
+        The sync plan.
+    """
+    with Session(engine) as session:
+        return SyncPlan(
+            window_oldest=window_oldest,
+            activities_oldest=get_sync_oldest(session, athlete_id, SyncDataset.ACTIVITIES, window_oldest),
+            wellness_oldest=get_sync_oldest(session, athlete_id, SyncDataset.WELLNESS, window_oldest),
+        )
+
+
+def _store(athlete_id: str, plan: SyncPlan, activities: list[dict[str, Any]], wellness: list[dict[str, Any]]) -> None:
+    """Stores the fetched records of a sync and advances the PMC over the days they invalidated."""
+    today = datetime.now(UTC).date()
+    with Session(engine) as session:
+        store_activities(session, athlete_id, activities, plan.activities_oldest, today)
+        store_wellness(session, athlete_id, wellness, plan.wellness_oldest, today)
+        update_pmc(session, athlete_id, today)
+
+
+def _load(athlete_id: str, oldest: date) -> tuple[list[dict[str, Any]], list[dict[str, Any]], int]:
+    """Loads the activities and wellness records of an analysis window from the store.
+
+    Returns:
+        The raw activities and wellness records, and a fingerprint of all stored activities of the athlete.
+    """
+    with Session(engine) as session:
+        activity_ids = session.exec(
+            select(col(StoredActivity.activity_id))
+            .where(col(StoredActivity.athlete_id) == athlete_id)
+            .order_by(col(StoredActivity.activity_id))
+        )
+        fingerprint = hash(tuple(activity_ids))
+        return load_activities(session, athlete_id, oldest), load_wellness(session, athlete_id, oldest), fingerprint
+
+
+async def _sync(client: AsyncIntervalsClient, window_oldest: date) -> date:
+    """Fetches the records missing from the store, stores them and advances the PMC.
+
+    Returns:
+        The oldest date the store is now synced from.
+    """
+    athlete_id = client.client.athlete_id
+    plan = await asyncio.to_thread(_plan_sync, athlete_id, window_oldest)
+    activities, wellness = await asyncio.gather(
+        client.activities(oldest=plan.activities_oldest), client.wellness(oldest=plan.wellness_oldest)
+    )
+    await asyncio.to_thread(_store, athlete_id, plan, activities, wellness)
+    return plan.window_oldest
+
+
+async def _sync_window(client: AsyncIntervalsClient, window_oldest: date) -> None:
+    """Syncs the store of the client's athlete, sharing a sync already in flight for the athlete.
+
+    A shared sync may cover a shorter window than required, the store is then synced again for the remaining days.
+
+    Args:
+        client: The async intervals.icu client.
+        window_oldest: The oldest date the store has to cover.
+    """
+    while await _SYNCS.do(client.client.athlete_id, lambda: _sync(client, window_oldest)) > window_oldest:
+        pass
+
+
+async def _power_curves(client: AsyncIntervalsClient, curves: str, fingerprint: int) -> dict[str, Any]:
+    """Fetches the power curves of the client's athlete unless they are cached for today's stored activities.
+
+    The curves only change with the athlete's activities and the windows ending today, so they are fetched again once
+    a sync stores other activities or on the next day. Concurrent fetches of the same curves are coalesced.
+
+    Args:
+        client: The async intervals.icu client.
+        curves: The comma-separated windows of the power curves.
+        fingerprint: The fingerprint of the athlete's stored activities.
+
+    Returns:
+        The raw power curves.
+    """
+    key = (client.client.athlete_id, curves)
+    version = (datetime.now(UTC).date(), fingerprint)
+    cached = _POWER_CURVES.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    power_curves = await _POWER_CURVE_FETCHES.do((key, version), lambda: client.power_curves(curves))
+    _POWER_CURVES[key] = (version, power_curves)
+    return power_curves
+
+
+async def sync_bundle(
+    client: AsyncIntervalsClient, days: int = 120, curves: str = ",".join(CURVE_WINDOWS)
+) -> IntervalsBundle:
+    """Syncs the local store and returns all data required for an analysis.
+
+    Only records since the last sync are requested from intervals.icu, the remainder of the window is read from the
+    local store. Concurrent syncs of the same athlete are coalesced, so the persisted PMC they advance is written by one
+    sync at a time. The power curves are only fetched when the synced activities or the day changed.
+
+    Args:
+        client: The async intervals.icu client.
+        days: The number of days of activities and wellness data required.
+        curves: The comma-separated windows of the power curves, all fetched in one request.
+
+    Returns:
+        The bundle covering the complete analysis window.
+    """
+    window_oldest = datetime.now(UTC).date() - timedelta(days=days)
+    await _sync_window(client, window_oldest)
+    activities, wellness, fingerprint = await asyncio.to_thread(_load, client.client.athlete_id, window_oldest)
+    power_curves = await _power_curves(client, curves, fingerprint)
+    return IntervalsBundle(activities=activities, wellness=wellness, power_curves=power_curves)
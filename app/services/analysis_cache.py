@@ -0,0 +1,199 @@
+"""Service for running the analysis pipeline once per athlete and window."""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from functools import lru_cache
+from typing import TYPE_CHECKING, NamedTuple
+
+from app.intervals.analysis import compute_analysis
+from app.intervals.client import AsyncIntervalsClient
+from app.intervals.parser.activity import parse_activities_frame
+from app.intervals.parser.power_curve import parse_power_curves
+from app.intervals.parser.wellness import parse_wellness_list
+from app.services.activity_store import sync_bundle
+from app.services.pmc_store import get_pmc, load_planned_stress
+from app.utils.singleflight import AsyncSingleFlight
+
+if TYPE_CHECKING:
+    import uuid
+    from collections.abc import Awaitable, Callable
+
+    from app.intervals.client import IntervalsClient
+    from app.intervals.models import AnalysisResult
+
+ANALYSIS_TTL_SECONDS = 60
+ANALYSIS_CACHE_SIZE = 256
+
+
+class AnalysisKey(NamedTuple):
+    """Identifies analyses with identical inputs."""
+
+    athlete_id: str
+    analysis_days: int
+    display_days: int | None
+    user_id: uuid.UUID | None = None
+    widgets: bool = True
+
+
+@dataclass(frozen=True)
+class _CachedAnalysis:
+    """A computed analysis together with its expiry time."""
+
+    result: AnalysisResult
+    expires_at: float
+
+
+class AnalysisCache:
+    """Coalesces concurrent analyses and keeps their results for a short time.
+
+    Concurrent callers with the same key await a single computation, later callers are served from the cache until the
+    TTL expires or the analyses of the user are invalidated. The cache is only used from the event loop and therefore
+    needs no locking.
+    """
+
+    def __init__(self, ttl_seconds: float = ANALYSIS_TTL_SECONDS, maxsize: int = ANALYSIS_CACHE_SIZE) -> None:
+        """Initializes an empty cache.
+
+        Args:
+            ttl_seconds: Time for which a computed analysis is reused.
+            maxsize: Maximum number of cached analyses.
+        """
+        self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self._results: dict[AnalysisKey, _CachedAnalysis] = {}
+        self._inflight = AsyncSingleFlight()
+        # Bumped on every invalidation, computations started before are neither joined nor stored afterwards
+        self._generation = 0
+
+    async def get_or_compute(
+        self, key: AnalysisKey, compute: Callable[[], Awaitable[AnalysisResult]]
+    ) -> AnalysisResult:
+        """Returns the cached analysis of a key, computing it at most once if missing.
+
+        Args:
+            key: The key of the analysis.
+            compute: Coroutine function computing the analysis.
+
+        Returns:
+            The analysis result.
+        """
+        cached = self._results.get(key)
+        if cached is not None and cached.expires_at > time.monotonic():
+            return cached.result
+
+        generation = self._generation
+
+        async def compute_and_store() -> AnalysisResult:
+            result = await compute()
+            if generation != self._generation:
+                return result
+            self._results.pop(key, None)
+            self._results[key] = _CachedAnalysis(result=result, expires_at=time.monotonic() + self.ttl_seconds)
+            while len(self._results) > self.maxsize:
+                del self._results[next(iter(self._results))]
+            return result
+
+        return await self._inflight.do((key, generation), compute_and_store)
+
+    def invalidate_user(self, user_id: uuid.UUID) -> None:
+        """Removes the cached analyses of a user, e.g. after their training plan changed.
+
+        Args:
+            user_id: The id of the user.
+        """
+        self._generation += 1
+        for key in [key for key in self._results if key.user_id == user_id]:
+            del self._results[key]
+
+    def clear(self) -> None:
+        """Removes all cached analyses."""
+        self._results.clear()
+
+
+@lru_cache
+def get_analysis_cache() -> AnalysisCache:
+    """Returns the process-wide analysis cache.
+
+    Returns:
+        The analysis cache.
+    """
+    return AnalysisCache()
+
+
+async def _run_analysis(  # noqa: PLR0913
+    client: IntervalsClient,
+    analysis_days: int,
+    display_days: int | None,
+    *,
+    user_id: uuid.UUID | None,
+    widgets: bool,
+    profile: bool,
+) -> AnalysisResult:
+    """Syncs the athlete's data and computes the analysis.
+
+    Returns:
+        The computed analysis result.
+    """
+    # Sync new records concurrently, the rest of the window is read from the local store. The sync also advances the
+    # persisted PMC by the new days only, it is seeded from the athlete's whole stored history
+    bundle = await sync_bundle(AsyncIntervalsClient(client), days=analysis_days)
+    today = datetime.now(UTC).date()
+    pmc = await asyncio.to_thread(get_pmc, client.athlete_id, today - timedelta(days=analysis_days))
+    # The user's stored plans extend the PMC as a projection
+    planned = await asyncio.to_thread(load_planned_stress, user_id, today) if user_id is not None else None
+
+    # Parsing and the analysis are CPU-bound, keep them off the event loop
+    return await asyncio.to_thread(
+        lambda: compute_analysis(
+            parse_activities_frame(bundle.activities).df,
+            display_days=display_days,
+            wellness_data=parse_wellness_list(bundle.wellness),
+            power_curve=parse_power_curves(bundle.power_curves),
+            client=client,
+            pmc=pmc,
+            planned_stress=planned,
+            widgets=widgets,
+            profile=profile,
+        )
+    )
+
+
+async def get_analysis(  # noqa: PLR0913
+    client: IntervalsClient,
+    analysis_days: int,
+    display_days: int | None = None,
+    *,
+    user_id: uuid.UUID | None = None,
+    widgets: bool = True,
+    profile: bool = False,
+) -> AnalysisResult:
+    """Returns the analysis of the client's athlete, sharing it between concurrent and recent callers.
+
+    Args:
+        client: The intervals.icu client of the athlete.
+        analysis_days: The number of days of history to analyze.
+        display_days: The number of days to include in the dashboard widgets.
+        user_id: The id of the user whose stored plans are projected onto the PMC, no projection if omitted.
+        widgets: Whether to build the dashboard widgets, callers only reading the provider results can skip them.
+        profile: Whether to profile the providers. Profiled analyses bypass the cache, so every profile measures a
+            fresh run.
+
+    Returns:
+        The analysis result.
+    """
+    if profile:
+        return await _run_analysis(client, analysis_days, display_days, user_id=user_id, widgets=widgets, profile=True)
+
+    key = AnalysisKey(
+        athlete_id=client.athlete_id,
+        analysis_days=analysis_days,
+        display_days=display_days,
+        user_id=user_id,
+        widgets=widgets,
+    )
+    return await get_analysis_cache().get_or_compute(
+        key,
+        lambda: _run_analysis(client, analysis_days, display_days, user_id=user_id, widgets=widgets, profile=False),
+    )
@@ -5,27 +5,23 @@ from dataclasses import dataclass
 from datetime import UTC, date, datetime, timedelta
 from typing import TYPE_CHECKING, Any
 
-import requests
-from requests_cache import CachedSession
 from sqlmodel import Session, select
 
 from app.config import Settings, get_settings
 from app.db import engine
-from app.intervals.analysis import compute_analysis
-from app.intervals.client import IntervalsClient
-from app.intervals.parser.activity import parse_activities
-from app.intervals.parser.power_curve import parse_power_curves
-from app.intervals.parser.wellness import parse_wellness_list
+from app.intervals.pool import get_client_pool
 from app.models.plan import TrainingPhase, TrainingPlan
 from app.planning.coach_prompt import SYSTEM_PROMPT, user_prompt
 from app.planning.llm import LLMRole, generate_plan
 from app.planning.llm_to_icu import extract_workout_json, llm_json_to_icu_txt
 from app.planning.providers.registry import registry
+from app.services.analysis_cache import get_analysis, get_analysis_cache
 from app.utils.datetime import get_monday
 
 if TYPE_CHECKING:
     import uuid
 
+    from app.intervals.client import IntervalsClient
     from app.intervals.models import AnalysisResult
     from app.models.user import User
 
@@ -137,6 +133,9 @@ async def update_training_plan(user: User, feedback: str, settings: Settings | N
             ),
         )
 
+    # The projection of the dashboard reads the stored plans
+    get_analysis_cache().invalidate_user(user.id)
+
     full_plan_text = (
         llm_response.plan
         + "\n\n"
@@ -147,56 +146,53 @@ async def update_training_plan(user: User, feedback: str, settings: Settings | N
     return {"plan": full_plan_text, "plan_id": saved_plan.id}
 
 
-def _get_analysis(client: IntervalsClient, analysis_days: int) -> AnalysisResult:
-    """Performs the full sports science analysis for the athlete.
+async def _get_analysis(client: IntervalsClient, analysis_days: int, user_id: uuid.UUID) -> AnalysisResult:
+    """Performs the full sports science analysis for the athlete, projecting the user's stored plans.
 
     Returns:
         The computed analysis result.
     """
     # Use max required days (e.g. 120d for PMC, 30d for FTP trajectory, 42d for wellness)
     lookback_days = max(analysis_days, 42)
-    raw_activities = client.activities(days=lookback_days)
-    raw_wellness = client.wellness(days=lookback_days)
-    raw_power_curves = client.power_curves(curves="90d")
-
-    return compute_analysis(
-        parse_activities(raw_activities),
-        wellness_data=parse_wellness_list(raw_wellness),
-        power_curve=parse_power_curves(raw_power_curves),
-        client=client,
-    )
+    # The planner only reads the provider results for the LLM context
+    return await get_analysis(client, lookback_days, user_id=user_id, widgets=False)
 
 
 async def generate_weekly_plan(
     user: User,
     settings: Settings | None = None,
     *,
+    client: IntervalsClient | None = None,
     weekly_hours: float | None = None,
     weekly_sessions: int | None = None,
 ) -> dict[str, Any]:
     """Generates the weekly plan.
 
+    Args:
+        user: The user to generate the plan for.
+        settings: Optional application settings.
+        client: Optional intervals.icu client, resolved from the user's secrets if omitted.
+        weekly_hours: Optional maximum training hours per week.
+        weekly_sessions: Optional maximum training sessions per week.
+
     Returns:
         The weekly plan and summary.
     """
     if settings is None:
         settings = get_settings()
 
-    session = requests.Session()
-    if settings.CACHE_INTERVALS_HOURS > 0:
-        session = CachedSession(
-            "intervals_cache",
-            backend="sqlite",
-            expire_after=timedelta(hours=settings.CACHE_INTERVALS_HOURS),
-        )
-
-    client = IntervalsClient(settings.INTERVALS_API_KEY, settings.INTERVALS_ATHLETE_ID, session=session)
+    if client is None:
+        client = get_client_pool().get(user.id)
 
     # Pre-fetch and compute analysis once to be shared among providers
-    analysis = _get_analysis(client, settings.ANALYSIS_DAYS)
+    analysis = await _get_analysis(client, settings.ANALYSIS_DAYS, user.id)
 
     # Fetch combined context from all registered providers
-    context = await registry.get_combined_context(analysis.provider_results)
+    context = await registry.get_combined_context(
+        analysis.provider_results,
+        max_concurrency=settings.CONTEXT_CONCURRENCY,
+        timeout_seconds=settings.CONTEXT_TIMEOUT_SECONDS,
+    )
 
     # Build the full summary string
     full_summary = (
@@ -234,6 +230,9 @@ async def generate_weekly_plan(
             ),
         )
 
+    # The projection of the dashboard reads the stored plans
+    get_analysis_cache().invalidate_user(user.id)
+
     full_plan_text = (
         llm_response.plan
         + "\n\n"
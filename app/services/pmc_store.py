@@ -0,0 +1,168 @@
+"""Service for keeping an athlete's Performance Management Chart up to date incrementally."""
+
+import logging
+from collections import defaultdict
+from datetime import date, timedelta
+from numbers import Real
+from typing import TYPE_CHECKING
+
+import polars as pl
+from sqlmodel import Session, col, delete, func, select
+
+from app.db import engine
+from app.models.activity import StoredActivity, StoredPMCDay
+from app.models.plan import TrainingPhase, TrainingPlan
+from app.planning.projection import planned_stress
+from app.planning.providers.pmc import PMCPoint, advance_pmc
+from app.utils.datetime import get_monday
+
+if TYPE_CHECKING:
+    import uuid
+
+_LOGGER = logging.getLogger(__name__)
+
+PMC_SCHEMA = pl.Schema({"date": pl.Date, "ctl": pl.Float64, "atl": pl.Float64})
+
+
+def invalidate_pmc(session: Session, athlete_id: str, since: date) -> None:
+    """Discards the PMC from a date on, e.g. because activities of that range changed.
+
+    The values before the date stay valid and are the state from which the next update recomputes the rest exactly.
+
+    Args:
+        session: The database session, the caller commits.
+        athlete_id: The intervals.icu athlete id.
+        since: The first date whose training stress changed.
+    """
+    session.exec(delete(StoredPMCDay).where(col(StoredPMCDay.athlete_id) == athlete_id, col(StoredPMCDay.day) >= since))
+
+
+def _daily_stress(session: Session, athlete_id: str, after: date, until: date) -> dict[date, float]:
+    """Sums up the training stress of the stored activities per day.
+
+    Returns:
+        The training stress per day with activities within (after, until].
+    """
+    statement = select(StoredActivity).where(
+        StoredActivity.athlete_id == athlete_id, StoredActivity.start_date > after, StoredActivity.start_date <= until
+    )
+    stress: defaultdict[date, float] = defaultdict(float)
+    for activity in session.exec(statement):
+        load = activity.payload.get("icu_training_load")
+        if isinstance(load, Real):
+            stress[activity.start_date] += float(load)
+    return stress
+
+
+def _latest_state(session: Session, athlete_id: str) -> PMCPoint | None:
+    """Finds the state from which the PMC is advanced.
+
+    Returns:
+        The last persisted day, the day before the first stored activity if nothing is persisted, or None if the
+        athlete has no stored activities.
+    """
+    latest = session.exec(
+        select(StoredPMCDay).where(StoredPMCDay.athlete_id == athlete_id).order_by(col(StoredPMCDay.day).desc())
+    ).first()
+    if latest is not None:
+        return PMCPoint(day=latest.day, ctl=latest.ctl, atl=latest.atl)
+
+    first = session.exec(
+        select(func.min(StoredActivity.start_date)).where(StoredActivity.athlete_id == athlete_id)
+    ).one()
+    if first is None:
+        return None
+    # The chart starts without load before the athlete's first stored activity
+    return PMCPoint(day=first - timedelta(days=1), ctl=0.0, atl=0.0)
+
+
+def update_pmc(session: Session, athlete_id: str, today: date) -> int:
+    """Advances the persisted PMC up to today with the stress of the days since the last persisted day.
+
+    Args:
+        session: The database session.
+        athlete_id: The intervals.icu athlete id.
+        today: The last day to compute.
+
+    Returns:
+        The number of computed days.
+    """
+    state = _latest_state(session, athlete_id)
+    if state is None or state.day >= today:
+        return 0
+
+    stress = _daily_stress(session, athlete_id, state.day, today)
+    days = (today - state.day).days
+    points = advance_pmc(state, (stress.get(state.day + timedelta(days=i + 1), 0.0) for i in range(days)))
+    for point in points:
+        session.merge(
+            StoredPMCDay(
+                athlete_id=athlete_id,
+                day=point.day,
+                training_stress=stress.get(point.day, 0.0),
+                ctl=point.ctl,
+                atl=point.atl,
+            )
+        )
+    session.commit()
+    _LOGGER.debug("Advanced the PMC of athlete %s by %d days", athlete_id, days)
+    return days
+
+
+def load_pmc(session: Session, athlete_id: str, oldest: date) -> pl.DataFrame:
+    """Loads the persisted PMC of an athlete.
+
+    Args:
+        session: The database session.
+        athlete_id: The intervals.icu athlete id.
+        oldest: The oldest date to load.
+
+    Returns:
+        The daily `ctl` and `atl` values ordered by `date`.
+    """
+    statement = (
+        select(col(StoredPMCDay.day), col(StoredPMCDay.ctl), col(StoredPMCDay.atl))
+        .where(col(StoredPMCDay.athlete_id) == athlete_id, col(StoredPMCDay.day) >= oldest)
+        .order_by(col(StoredPMCDay.day))
+    )
+    return pl.DataFrame(list(session.exec(statement)), schema=PMC_SCHEMA, orient="row")
+
+
+def get_pmc(athlete_id: str, oldest: date) -> pl.DataFrame:
+    """Loads the persisted PMC of an athlete in its own session.
+
+    The PMC is advanced by the sync of the athlete's activities, which runs at most once per athlete at a time, so
+    concurrent analyses only read it.
+
+    Args:
+        athlete_id: The intervals.icu athlete id.
+        oldest: The oldest date to load.
+
+    Returns:
+        The daily `ctl` and `atl` values from the oldest date on.
+    """
+    with Session(engine) as session:
+        return load_pmc(session, athlete_id, oldest)
+
+
+def load_planned_stress(user_id: uuid.UUID, today: date) -> pl.DataFrame:
+    """Estimates the daily training stress of the user's plans of the active phase from this week on.
+
+    Args:
+        user_id: The id of the user.
+        today: The current date, plans of earlier weeks are ignored.
+
+    Returns:
+        The planned `training_stress` per `date`.
+    """
+    statement = (
+        select(TrainingPlan)
+        .join(TrainingPhase)
+        .where(
+            TrainingPhase.user_id == user_id,
+            TrainingPhase.status == "active",
+            TrainingPlan.week_start >= get_monday(today),
+        )
+    )
+    with Session(engine) as session:
+        return planned_stress(session.exec(statement))
@@ -0,0 +1,94 @@
+"""Coalescing of identical concurrent calls."""
+
+import asyncio
+import threading
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Hashable
+
+
+@dataclass
+class _Call:
+    """An in-flight call whose result is shared with all waiting callers."""
+
+    done: threading.Event = field(default_factory=threading.Event)
+    result: Any = None
+    error: BaseException | None = None
+
+
+class SingleFlight:
+    """Runs a function at most once per key at a time.
+
+    Callers arriving while a call with the same key is in flight wait for it and receive its result (or exception)
+    instead of triggering a second call.
+    """
+
+    def __init__(self) -> None:
+        """Initializes the group without any in-flight calls."""
+        self._calls: dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do[T](self, key: Hashable, fn: Callable[[], T]) -> T:
+        """Runs `fn` unless a call with the same key is already in flight.
+
+        Exceptions of the shared call are re-raised to every waiting caller.
+
+        Args:
+            key: Identifies calls that are interchangeable.
+            fn: The function to run.
+
+        Returns:
+            The result of the call.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+class AsyncSingleFlight:
+    """Runs a coroutine function at most once per key at a time.
+
+    The async counterpart of `SingleFlight`: callers awaiting a key that is already in flight share its task. The task is
+    shielded, so a cancelled caller does not cancel the computation for everybody else.
+    """
+
+    def __init__(self) -> None:
+        """Initializes the group without any in-flight calls."""
+        self._tasks: dict[Hashable, asyncio.Future[Any]] = {}
+
+    async def do[T](self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Awaits `fn` unless a call with the same key is already in flight.
+
+        Args:
+            key: Identifies calls that are interchangeable.
+            fn: The coroutine function to run.
+
+        Returns:
+            The result of the call.
+        """
+        task = self._tasks.get(key)
+        if task is None:
+            task = self._tasks[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        return await asyncio.shield(task)
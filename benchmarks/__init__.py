@@ -0,0 +1 @@
+"""Benchmarks of the IntelliWatts analysis pipeline."""
@@ -0,0 +1,194 @@
+"""Timing fixture and JSON reporting for the benchmark suite."""
+
+import json
+import platform
+import statistics
+import subprocess  # noqa: S404
+import time
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import pytest
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Generator
+
+    from _pytest.terminal import TerminalReporter
+
+RESULTS_DIR = Path(__file__).parent / "results"
+DEFAULT_ROUNDS = 5
+DEFAULT_WARMUP = 1
+
+_RESULTS = pytest.StashKey[list["BenchmarkStats"]]()
+
+
+@dataclass(frozen=True)
+class BenchmarkStats:
+    """Timings of one benchmark in seconds."""
+
+    name: str
+    group: str
+    rounds: int
+    min: float
+    max: float
+    mean: float
+    median: float
+    stddev: float
+
+
+class Benchmark:
+    """Times a callable over several rounds, like the `benchmark` fixture of pytest-benchmark."""
+
+    def __init__(self, name: str, group: str, rounds: int, warmup: int) -> None:
+        """Initializes the benchmark.
+
+        Args:
+            name: The name of the benchmark.
+            group: The group the benchmark is reported in.
+            rounds: The number of timed rounds.
+            warmup: The number of untimed rounds before timing.
+        """
+        self.name = name
+        self.group = group
+        self.rounds = rounds
+        self.warmup = warmup
+        self.stats: BenchmarkStats | None = None
+
+    def __call__[T](self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:  # noqa: ANN401
+        """Times the callable.
+
+        Args:
+            fn: The callable to time.
+            *args: Positional arguments of the callable.
+            **kwargs: Keyword arguments of the callable.
+
+        Returns:
+            The result of the last round.
+        """
+        for _ in range(self.warmup):
+            fn(*args, **kwargs)
+
+        timings = []
+        for _ in range(self.rounds):
+            start = time.perf_counter()
+            result = fn(*args, **kwargs)
+            timings.append(time.perf_counter() - start)
+
+        self.stats = BenchmarkStats(
+            name=self.name,
+            group=self.group,
+            rounds=self.rounds,
+            min=min(timings),
+            max=max(timings),
+            mean=statistics.fmean(timings),
+            median=statistics.median(timings),
+            stddev=statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        )
+        return result
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Adds the benchmark options."""
+    group = parser.getgroup("benchmark")
+    group.addoption("--benchmark-rounds", type=int, default=DEFAULT_ROUNDS, help="Timed rounds per benchmark.")
+    group.addoption("--benchmark-warmup", type=int, default=DEFAULT_WARMUP, help="Untimed rounds per benchmark.")
+    group.addoption(
+        "--benchmark-json",
+        type=Path,
+        default=None,
+        help="Where to store the results, defaults to benchmarks/results/<commit>.json.",
+    )
+    group.addoption("--benchmark-compare", type=Path, default=None, help="Previous results to compare against.")
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """Initializes the collected results."""
+    config.stash[_RESULTS] = []
+
+
+@pytest.fixture
+def benchmark(request: pytest.FixtureRequest) -> Generator[Benchmark]:
+    """Times a callable and records the result for the session report.
+
+    Yields:
+        The benchmark to call with the code under test.
+    """
+    node = request.node
+    bench = Benchmark(
+        name=node.name,
+        group=node.originalname,
+        rounds=request.config.getoption("--benchmark-rounds"),
+        warmup=request.config.getoption("--benchmark-warmup"),
+    )
+    yield bench
+    if bench.stats is not None:
+        request.config.stash[_RESULTS].append(bench.stats)
+
+
+def pytest_sessionfinish(session: pytest.Session) -> None:
+    """Stores the results as JSON."""
+    results = session.config.stash.get(_RESULTS, [])
+    if not results:
+        return
+
+    commit = _git_commit()
+    path = session.config.getoption("--benchmark-json") or RESULTS_DIR / f"{commit or 'unknown'}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    report = {
+        "commit": commit,
+        "datetime": datetime.now(UTC).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "benchmarks": [asdict(r) for r in results],
+    }
+    path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+def pytest_terminal_summary(terminalreporter: TerminalReporter, config: pytest.Config) -> None:
+    """Prints the results, compared to previous results if given."""
+    results = config.stash.get(_RESULTS, [])
+    if not results:
+        return
+
+    baseline: dict[str, float] = {}
+    if (compare := config.getoption("--benchmark-compare")) is not None:
+        previous = json.loads(compare.read_text(encoding="utf-8"))
+        baseline = {b["name"]: b["median"] for b in previous["benchmarks"]}
+
+    terminalreporter.section("benchmark (median, ms)")
+    width = max(len(r.name) for r in results)
+    for r in sorted(results, key=lambda r: (r.group, r.name)):
+        line = f"{r.name:<{width}}  {r.median * 1000:10.2f} ± {r.stddev * 1000:8.2f}"
+        if r.name in baseline:
+            line += f"  {_change(baseline[r.name], r.median):>+8.1%}"
+        terminalreporter.write_line(line)
+
+
+def _change(before: float, after: float) -> float:
+    """Computes the relative change of a timing.
+
+    Returns:
+        The change as a fraction, positive for regressions.
+    """
+    return after / before - 1 if before else 0.0
+
+
+def _git_commit() -> str | None:
+    """Finds the current commit so that results can be compared between commits.
+
+    Returns:
+        The short hash of HEAD, or None outside a git checkout.
+    """
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],  # noqa: S607
+            capture_output=True,
+            check=True,
+            text=True,
+            cwd=Path(__file__).parent,
+        )
+    except OSError, subprocess.CalledProcessError:
+        return None
+    return out.stdout.strip()
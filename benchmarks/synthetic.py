@@ -0,0 +1,165 @@
+"""Seeded generator of intervals.icu-shaped athlete histories."""
+
+import math
+import random
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any
+
+# Share of days with training, the rest are rest days
+TRAINING_DAY_RATIO = 0.75
+# Share of training days with a second session
+DOUBLE_DAY_RATIO = 0.1
+# Activity types weighted like a cyclist's history
+ACTIVITY_TYPES = {"Ride": 0.6, "VirtualRide": 0.15, "Run": 0.2, "Swim": 0.05}
+# Days between FTP tests
+FTP_TEST_INTERVAL_DAYS = 42
+HR_ZONES = 5
+POWER_ZONES = ("Z1", "Z2", "Z3", "Z4", "Z5", "Z6", "Z7", "SS")
+# Durations of the power curve, every second up to an hour and then every minute up to six hours
+POWER_CURVE_SECS = [*range(1, 3601), *range(3660, 6 * 3600 + 1, 60)]
+
+
+@dataclass(frozen=True)
+class SyntheticHistory:
+    """Raw intervals.icu payloads of a synthetic athlete."""
+
+    days: int
+    activities: list[dict[str, Any]]
+    wellness: list[dict[str, Any]]
+    power_curves: dict[str, Any]
+
+
+def generate_history(days: int, seed: int = 0, end: date | None = None) -> SyntheticHistory:
+    """Generates a reproducible training history.
+
+    The payloads mirror the intervals.icu API, including fields the parsers ignore, so that parsing costs are realistic.
+
+    Args:
+        days: The number of days of history.
+        seed: The seed of the random generator, identical seeds yield identical histories.
+        end: The last day of the history, defaults to a fixed date so results are comparable across runs.
+
+    Returns:
+        The synthetic history.
+    """
+    rng = random.Random(seed)  # noqa: S311
+    end = end or date(2026, 1, 1)
+    start = end - timedelta(days=days - 1)
+
+    activities: list[dict[str, Any]] = []
+    wellness: list[dict[str, Any]] = []
+    ftp = 220.0
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        if offset % FTP_TEST_INTERVAL_DAYS == 0:
+            ftp = max(150.0, ftp + rng.gauss(3, 6))
+        if rng.random() < TRAINING_DAY_RATIO:
+            sessions = 2 if rng.random() < DOUBLE_DAY_RATIO else 1
+            activities.extend(
+                _activity(rng, day, ftp, f"i{offset}_{session}", hour=7 + 10 * session) for session in range(sessions)
+            )
+        wellness.append(_wellness(rng, day))
+
+    return SyntheticHistory(
+        days=days,
+        activities=activities,
+        wellness=wellness,
+        # The recent windows reflect the current FTP, the longer ones earlier peaks
+        power_curves={
+            "list": [
+                _power_curve("42d", ftp * 0.98),
+                _power_curve("90d", ftp),
+                _power_curve("s0", ftp * 1.01),
+                _power_curve("all", ftp * 1.05),
+            ]
+        },
+    )
+
+
+def _activity(rng: random.Random, day: date, ftp: float, activity_id: str, hour: int) -> dict[str, Any]:
+    """Generates a raw activity.
+
+    Returns:
+        The activity as returned by intervals.icu.
+    """
+    activity_type = rng.choices(list(ACTIVITY_TYPES), weights=list(ACTIVITY_TYPES.values()))[0]
+    moving_time = rng.randint(30, 240) * 60
+    intensity = rng.uniform(0.55, 0.95)
+    hours = moving_time / 3600
+    watts = round(intensity * ftp)
+    return {
+        "id": activity_id,
+        "start_date_local": f"{day.isoformat()}T{hour:02d}:{rng.randint(0, 59):02d}:00",
+        "type": activity_type,
+        "name": f"{activity_type} {day.isoformat()}",
+        "moving_time": moving_time,
+        "elapsed_time": moving_time + rng.randint(0, 900),
+        "icu_training_load": round(hours * intensity**2 * 100, 1),
+        "icu_average_watts": watts,
+        "icu_weighted_avg_watts": round(watts * rng.uniform(1.0, 1.1)),
+        "icu_intensity": round(intensity * 100, 1),
+        "calories": round(watts * moving_time / 1000 * 1.1),
+        "average_heartrate": rng.randint(115, 165),
+        "max_heartrate": rng.randint(165, 195),
+        "icu_distance": round(hours * rng.uniform(20000, 35000)),
+        "total_elevation_gain": rng.randint(0, 2500),
+        "icu_hr_zone_times": _split(rng, moving_time, HR_ZONES),
+        "icu_zone_times": [
+            {"id": zone, "secs": secs} for zone, secs in zip(POWER_ZONES, _split(rng, moving_time, 8), strict=True)
+        ],
+        "icu_ftp": round(ftp),
+        # Fields returned by intervals.icu that the parsers do not read
+        "icu_power_hr_z2": round(rng.uniform(1.2, 1.8), 2),
+        "device_name": "Synthetic Head Unit",
+        "stream_types": ["time", "watts", "heartrate", "cadence", "distance", "altitude"],
+        "icu_achievements": [],
+        "interval_summary": [f"{rng.randint(1, 5)}x {rng.randint(3, 20)}m {watts}w" for _ in range(3)],
+    }
+
+
+def _wellness(rng: random.Random, day: date) -> dict[str, Any]:
+    """Generates a raw wellness record.
+
+    Returns:
+        The wellness record as returned by intervals.icu.
+    """
+    return {
+        "id": day.isoformat(),
+        "hrv": round(rng.gauss(65, 8), 1),
+        "restingHR": rng.randint(42, 58),
+        "sleepScore": rng.randint(50, 95),
+        "sleepQuality": rng.randint(1, 4),
+        "fatigue": rng.randint(1, 4),
+        "soreness": rng.randint(1, 4),
+        "stress": rng.randint(1, 4),
+        "readiness": rng.randint(40, 100),
+    }
+
+
+def _power_curve(curve_id: str, ftp: float) -> dict[str, Any]:
+    """Generates a power curve following the critical power model.
+
+    Returns:
+        The power curve as returned by intervals.icu.
+    """
+    critical_power = ftp * 1.05
+    w_prime = 20000
+    peak = ftp * 4
+    watts = [
+        round(min(peak, critical_power + w_prime / s) * (1 - 0.05 * math.log1p(s / 3600))) for s in POWER_CURVE_SECS
+    ]
+    return {"id": curve_id, "secs": POWER_CURVE_SECS, "watts": watts}
+
+
+def _split(rng: random.Random, total: int, parts: int) -> list[int]:
+    """Splits a duration into random parts.
+
+    Returns:
+        The parts summing up to the total.
+    """
+    weights = [rng.random() for _ in range(parts)]
+    scale = total / sum(weights)
+    split = [int(w * scale) for w in weights]
+    split[0] += total - sum(split)
+    return split
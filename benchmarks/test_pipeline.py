@@ -0,0 +1,129 @@
+"""Benchmarks of the analysis pipeline on synthetic athlete histories."""
+
+from functools import cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import polars as pl
+import pytest
+from fastapi.templating import Jinja2Templates
+
+from app.intervals.analysis import build_daily_frame, compute_analysis
+from app.intervals.parser.activity import parse_activities, parse_activities_frame
+from app.intervals.parser.power_curve import parse_power_curves
+from app.intervals.parser.wellness import parse_wellness_list
+from app.intervals.pmc import fit_banister, impulse_response, load_column
+from app.planning.providers.aggregation import evaluate_aggregations
+from app.planning.providers.interfaces import AnalysisContext, Dataset
+from app.planning.providers.pmc import ACUTE_DAYS, CHRONIC_DAYS
+from app.planning.providers.registry import registry
+from benchmarks.synthetic import SyntheticHistory, generate_history
+
+if TYPE_CHECKING:
+    from app.planning.providers.interfaces import MetricProvider
+    from benchmarks.conftest import Benchmark
+
+# One month, one year and ten years of history
+HISTORY_DAYS = [30, 365, 3650]
+DISPLAY_DAYS = 42
+TEMPLATES = Jinja2Templates(directory=Path(__file__).parents[1] / "app" / "templates")
+
+history_days = pytest.mark.parametrize("days", HISTORY_DAYS, ids=[f"{d}d" for d in HISTORY_DAYS])
+
+
+@cache
+def _history(days: int) -> SyntheticHistory:
+    return generate_history(days)
+
+
+def _context(history: SyntheticHistory) -> AnalysisContext:
+    context = AnalysisContext()
+    context.datasets[Dataset.POWER_CURVES] = parse_power_curves(history.power_curves)
+    return context
+
+
+def _analyze(history: SyntheticHistory) -> Any:  # noqa: ANN401
+    return compute_analysis(
+        parse_activities_frame(history.activities).df,
+        display_days=DISPLAY_DAYS,
+        wellness_data=parse_wellness_list(history.wellness),
+        power_curve=parse_power_curves(history.power_curves),
+    )
+
+
+@history_days
+def test_parse_activities(benchmark: Benchmark, days: int) -> None:
+    """Benchmark the per-activity parser."""
+    activities = _history(days).activities
+    assert len(benchmark(parse_activities, activities)) == len(activities)
+
+
+@history_days
+def test_parse_activities_frame(benchmark: Benchmark, days: int) -> None:
+    """Benchmark the columnar activity parser."""
+    activities = _history(days).activities
+    assert benchmark(parse_activities_frame, activities).df.height == len(activities)
+
+
+@history_days
+def test_compute_analysis(benchmark: Benchmark, days: int) -> None:
+    """Benchmark the full analysis from raw payloads."""
+    analysis = benchmark(_analyze, _history(days))
+    assert set(analysis.provider_results) == {p.get_name() for p in registry.providers}
+
+
+@history_days
+@pytest.mark.parametrize("provider", registry.providers, ids=lambda p: p.get_name())
+def test_provider(benchmark: Benchmark, days: int, provider: MetricProvider[Any]) -> None:
+    """Benchmark the calculation and widget of each registered provider."""
+    history = _history(days)
+    daily = build_daily_frame(parse_activities_frame(history.activities).df, parse_wellness_list(history.wellness))
+    assert daily is not None
+    context = _context(history)
+    # Providers may read the results of the providers registered before them
+    results, _ = registry.process_analysis(daily, context=context, display_days=DISPLAY_DAYS)
+    # Measure each provider with its own aggregations instead of the values of the fused query
+    context.aggregates.clear()
+
+    def run() -> Any:  # noqa: ANN401
+        res = provider.calculate(daily, context=context, provider_results=results, display_days=DISPLAY_DAYS)
+        provider.get_dashboard_widget(res, display_days=DISPLAY_DAYS)
+        return res
+
+    benchmark(run)
+
+
+@history_days
+def test_render_dashboard(benchmark: Benchmark, days: int) -> None:
+    """Benchmark rendering the dashboard of an analysis."""
+    analysis = _analyze(_history(days)).to_dict()
+    template = TEMPLATES.env.get_template("dashboard.html")
+
+    html = benchmark(template.render, user=None, analysis=analysis, settings=None)
+    assert "<html" in html
+
+
+@history_days
+def test_fit_banister(benchmark: Benchmark, days: int) -> None:
+    """Benchmark fitting the Banister model over the full grid of time constants to weekly markers."""
+    history = _history(days)
+    daily = build_daily_frame(parse_activities_frame(history.activities).df, parse_wellness_list(history.wellness))
+    assert daily is not None
+    loads = impulse_response(daily["training_stress"], (CHRONIC_DAYS, ACUTE_DAYS))
+    performance = 250 + loads[load_column(CHRONIC_DAYS)] - 0.5 * loads[load_column(ACUTE_DAYS)]
+    markers = pl.DataFrame({"date": daily["date"], "performance": performance}).gather_every(7)
+
+    fit = benchmark(fit_banister, daily, markers)
+    assert fit is not None
+
+
+@history_days
+def test_fused_aggregations(benchmark: Benchmark, days: int) -> None:
+    """Benchmark the single query evaluating the aggregations of all registered providers."""
+    history = _history(days)
+    daily = build_daily_frame(parse_activities_frame(history.activities).df, parse_wellness_list(history.wellness))
+    assert daily is not None
+    aggregations = {p.get_name(): p.get_aggregations(daily.schema, DISPLAY_DAYS) for p in registry.providers}
+
+    values = benchmark(evaluate_aggregations, daily, aggregations)
+    assert values["activity"]["today"] == daily["date"].max()
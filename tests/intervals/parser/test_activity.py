@@ -0,0 +1,151 @@
+"""Tests for the activity parser."""
+
+from datetime import date
+from typing import Any
+
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from app.intervals.parser.activity import (
+    ACTIVITY_SCHEMA,
+    MAX_ZONES,
+    activities_to_frame,
+    parse_activities,
+    parse_activities_frame,
+    sum_zones,
+)
+
+
+def _padded(zones: list[int]) -> list[int]:
+    return zones + [0] * (MAX_ZONES - len(zones))
+
+
+@pytest.fixture
+def raw_activities() -> list[dict[str, Any]]:
+    """Raw intervals.icu activities.
+
+    Returns:
+        Two valid activities.
+    """
+    return [
+        {
+            "id": "i1",
+            "start_date_local": "2026-04-20T08:00:00",
+            "moving_time": 3600,
+            "icu_training_load": 80,
+            "icu_average_watts": 210,
+            "type": "Ride",
+            "calories": 900,
+            "average_heartrate": 140,
+            "max_heartrate": 170,
+            "icu_distance": 35000,
+            "total_elevation_gain": 300,
+            "icu_hr_zone_times": [600, 1800, 900, 300, 0],
+            "icu_zone_times": [{"id": "Z1", "secs": 1200}, {"id": "Z2", "secs": 2400}, {"id": "SS"}],
+            "icu_ftp": 250,
+            "unused": "ignored",
+        },
+        {
+            "id": "i2",
+            "start_date_local": "2026-04-21T07:00:00",
+            "moving_time": 1800,
+            "icu_training_load": 30.5,
+            "type": "Run",
+            "calories": 400.5,
+            "icu_distance": 0,
+        },
+    ]
+
+
+def test_parse_activities_frame(raw_activities: list[dict[str, Any]]) -> None:
+    """Test that raw activities are parsed into the typed schema."""
+    # GIVEN raw activities
+    # WHEN parsing them into a frame
+    parsed = parse_activities_frame(raw_activities)
+
+    # THEN the frame has the fixed schema
+    assert parsed.df.schema == ACTIVITY_SCHEMA
+    # AND the values are converted
+    assert parsed.df["date"].to_list() == [date(2026, 4, 20), date(2026, 4, 21)]
+    assert parsed.df["duration_h"].to_list() == [1.0, 0.5]
+    assert parsed.df["distance_km"].to_list() == [35.0, None]
+    assert parsed.df["power_zone_times"].to_list() == [_padded([1200, 2400, 0]), _padded([])]
+    assert parsed.df["hr_zone_times"].to_list() == [_padded([600, 1800, 900, 300, 0]), _padded([])]
+    # AND the zone counts are recorded
+    assert parsed.df["power_zone_count"].to_list() == [3, 0]
+    assert parsed.df["hr_zone_count"].to_list() == [5, 0]
+    # AND nothing was skipped
+    assert not parsed.skipped
+
+
+def test_parse_activities_frame_matches_parse_activities(raw_activities: list[dict[str, Any]]) -> None:
+    """Test that the columnar parser agrees with the per-activity parser."""
+    # GIVEN raw activities
+    # WHEN parsing them with both parsers
+    columnar = parse_activities_frame(raw_activities).df
+    per_activity = activities_to_frame(parse_activities(raw_activities))
+
+    # THEN the frames are identical
+    assert_frame_equal(columnar, per_activity)
+
+
+def test_parse_activities_frame_skips_malformed_rows(raw_activities: list[dict[str, Any]]) -> None:
+    """Test that malformed activities are dropped and counted per reason."""
+    # GIVEN valid activities and malformed ones
+    valid = raw_activities[0]
+    malformed = [
+        {k: v for k, v in valid.items() if k != "icu_training_load"},
+        {**valid, "start_date_local": "not a date"},
+        {**valid, "moving_time": "an hour"},
+        {k: v for k, v in valid.items() if k != "start_date_local"},
+    ]
+    # AND an optional field with an invalid nested value
+    odd_zones = {**valid, "icu_zone_times": [{"id": "Z1", "secs": "x"}]}
+
+    # WHEN parsing them
+    parsed = parse_activities_frame([*raw_activities, *malformed, odd_zones])
+
+    # THEN only valid rows are kept
+    assert parsed.df.height == 3
+    # AND the invalid optional value is nulled
+    assert parsed.df["power_zone_times"].to_list() == [_padded([1200, 2400, 0]), _padded([]), _padded([])]
+    # AND the skipped rows are counted per reason
+    assert parsed.skipped == {"icu_training_load": 1, "start_date_local": 2, "moving_time": 1}
+
+
+def test_parse_activities_frame_empty() -> None:
+    """Test that no activities yield an empty frame with the schema."""
+    # GIVEN no activities
+    # WHEN parsing them
+    parsed = parse_activities_frame([])
+
+    # THEN the frame is empty but typed
+    assert parsed.df.is_empty()
+    assert parsed.df.schema == ACTIVITY_SCHEMA
+    assert_frame_equal(parsed.df, pl.DataFrame(schema=ACTIVITY_SCHEMA))
+
+
+def test_parse_activities_frame_truncates_zones(raw_activities: list[dict[str, Any]]) -> None:
+    """Test that zones beyond the array width are dropped."""
+    # GIVEN an activity with more HR zones than the array holds
+    raw = {**raw_activities[0], "icu_hr_zone_times": list(range(1, MAX_ZONES + 3))}
+
+    # WHEN parsing it
+    parsed = parse_activities_frame([raw])
+
+    # THEN the first zones are kept
+    assert parsed.df["hr_zone_times"].to_list() == [list(range(1, MAX_ZONES + 1))]
+    assert parsed.df["hr_zone_count"].to_list() == [MAX_ZONES]
+
+
+def test_sum_zones(raw_activities: list[dict[str, Any]]) -> None:
+    """Test that zone arrays are summed zone by zone."""
+    # GIVEN two activities with power zones
+    parsed = parse_activities_frame([raw_activities[0], raw_activities[0]])
+
+    # WHEN summing their zone times
+    totals = parsed.df.select(sum_zones(pl.col("power_zone_times"))).item()
+
+    # THEN every zone holds the time of both activities
+    assert totals.to_list() == _padded([2400, 4800, 0])
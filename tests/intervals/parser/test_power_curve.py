@@ -1,6 +1,10 @@
 """Tests for the power curve parser."""
 
-from app.intervals.parser.power_curve import parse_power_curves
+import math
+
+import pytest
+
+from app.intervals.parser.power_curve import ParsedPowerCurve, parse_power_curves, primary_curve
 
 
 def test_parse_power_curves() -> None:
@@ -29,3 +33,67 @@ def test_parse_power_curves() -> None:
     assert curve.get_watts(300) == 350
     assert curve.get_watts(1200) == 300
     assert curve.get_watts(10) is None
+
+
+def test_power_curve_orders_points() -> None:
+    """Test that unordered points are stored as arrays ordered by duration."""
+    # GIVEN / WHEN: A curve with unordered points
+    curve = ParsedPowerCurve(id="90d", secs=[60, 1, 5], watts=[500, 1000, 900])
+
+    # THEN the points are ordered by duration
+    assert list(curve.secs) == [1, 5, 60]
+    assert list(curve.watts) == [1000, 900, 500]
+    assert curve.get_watts(5) == 900
+
+
+def test_power_curve_rejects_mismatched_arrays() -> None:
+    """Test that every duration needs a power."""
+    with pytest.raises(ValueError, match="one power per duration"):
+        ParsedPowerCurve(id="90d", secs=[1, 5], watts=[1000])
+
+
+def test_power_curve_interpolation() -> None:
+    """Test that missing durations are interpolated in log-duration and bulk queries match single ones."""
+    # GIVEN a curve with gaps between its durations
+    curve = ParsedPowerCurve(id="90d", secs=[1, 60, 3600], watts=[1000, 500, 200])
+
+    # WHEN / THEN: Known durations return their power
+    assert curve.interpolate(60) == 500.0
+    # AND missing durations are interpolated in log-duration
+    assert curve.interpolate(600) == pytest.approx(500 - 300 * math.log(10) / math.log(60))
+    assert curve.interpolate(math.sqrt(60)) == pytest.approx(750.0)
+    # AND durations outside of the curve are unknown
+    assert curve.interpolate(0.5) is None
+    assert curve.interpolate(7200) is None
+
+    # WHEN querying many durations at once
+    durations = [0.5, 1, 2, 30, 60, 61, 600, 3600, 7200]
+    watts = curve.watts_at(durations)
+
+    # THEN they equal the single lookups and decrease monotonically within the curve
+    assert watts == [curve.interpolate(d) for d in durations]
+    known = [w for w in watts if w is not None]
+    assert known == sorted(known, reverse=True)
+
+
+def test_primary_curve() -> None:
+    """Test that the primary window is found by id, falling back to the first curve."""
+    # GIVEN: Curves of several windows
+    recent = ParsedPowerCurve(id="42d", secs=[1], watts=[900])
+    primary = ParsedPowerCurve(id="90d", secs=[1], watts=[1000])
+
+    # WHEN / THEN: The 90 day curve is the primary one
+    assert primary_curve([recent, primary]) is primary
+    # AND without it the first curve is used
+    assert primary_curve([recent]) is recent
+    assert primary_curve([]) is None
+
+
+def test_equal_curves_hash_equal() -> None:
+    """Test that curves with the same id and points are equal and hash equal."""
+    first = ParsedPowerCurve(id="90d", secs=[1, 60], watts=[1000, 500])
+    second = ParsedPowerCurve(id="90d", secs=[1, 60], watts=[1000, 500])
+
+    assert first == second
+    assert hash(first) == hash(second)
+    assert first != ParsedPowerCurve(id="90d", secs=[1, 60], watts=[1000, 501])
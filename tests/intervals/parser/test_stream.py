@@ -0,0 +1,88 @@
+"""Tests for the incremental JSON decoding."""
+
+import json
+from typing import TYPE_CHECKING
+
+import pytest
+
+from app.intervals.client import BASE_URL, IntervalsClient
+from app.intervals.parser.stream import ACTIVITY_FIELDS, ColumnBuffer, iter_json_array, project
+
+if TYPE_CHECKING:
+    from requests_mock import Mocker
+
+
+def _chunked(payload: str, size: int) -> list[bytes]:
+    data = payload.encode()
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 1000])
+def test_iter_json_array_across_chunk_boundaries(size: int) -> None:
+    """Test that elements split across chunks are decoded correctly."""
+    # GIVEN an array with objects, numbers and multi-byte characters
+    elements = [{"id": "i1", "name": "Zürich 🚴", "zones": [1, 2, 3]}, 12345, "x", None, {"nested": {"a": [{}]}}]
+    payload = " [ " + ", ".join(json.dumps(e, ensure_ascii=False) for e in elements) + " ] \n"
+
+    # WHEN decoding it chunk by chunk
+    decoded = list(iter_json_array(_chunked(payload, size)))
+
+    # THEN every element is returned unchanged
+    assert decoded == elements
+
+
+def test_iter_json_array_empty() -> None:
+    """Test that an empty array yields nothing."""
+    # GIVEN an empty array
+    # WHEN decoding it
+    # THEN no element is returned
+    assert list(iter_json_array([b"[", b"]"])) == []
+
+
+@pytest.mark.parametrize("payload", ['{"id": 1}', '[{"id": 1}', "[1 2]", "[1] x"])
+def test_iter_json_array_invalid(payload: str) -> None:
+    """Test that payloads that are not a complete array are rejected."""
+    # GIVEN an invalid payload
+    # WHEN decoding it
+    # THEN a ValueError is raised
+    with pytest.raises(ValueError, match="JSON array"):
+        list(iter_json_array(_chunked(payload, 2)))
+
+
+def test_project() -> None:
+    """Test that only the requested fields are kept."""
+    # GIVEN a record with unused fields
+    record = {"id": "i1", "type": "Ride", "unused": [0] * 100}
+
+    # WHEN projecting it
+    # THEN only the present requested fields remain
+    assert project(record, ACTIVITY_FIELDS) == {"id": "i1", "type": "Ride"}
+
+
+def test_column_buffer() -> None:
+    """Test that rows are collected column by column."""
+    # GIVEN a buffer
+    buffer = ColumnBuffer(["a", "b"])
+
+    # WHEN appending rows
+    buffer.append({"a": 1, "b": 2})
+    buffer.append({"a": 3})
+
+    # THEN the columns hold the values, missing values become null
+    assert buffer.columns == {"a": [1, 3], "b": [2, None]}
+    assert len(buffer) == 2
+
+
+def test_client_streams_activities(requests_mock: Mocker) -> None:
+    """Test that the client decodes activities incrementally and drops unused fields."""
+    # GIVEN an activities endpoint returning large payloads
+    client = IntervalsClient(api_key="test_key", athlete_id="test_id")
+    activity = {"id": "i1", "start_date_local": "2026-04-20T08:00:00", "type": "Ride", "icu_power_hr_z2": 1}
+    requests_mock.get(f"{BASE_URL}/athlete/test_id/activities", text=json.dumps([activity, activity]))
+
+    # WHEN fetching the activities
+    activities = client.activities(days=7)
+
+    # THEN only the parsed fields are kept
+    expected = {"id": "i1", "start_date_local": "2026-04-20T08:00:00", "type": "Ride"}
+    assert activities == [expected, expected]
@@ -1,17 +1,22 @@
 """Tests the intervals analysis module."""
 
 import math
+from datetime import date, timedelta
 from unittest.mock import MagicMock
 
+import polars as pl
 import pytest
 
 from app.intervals.analysis import (
+    build_daily_frame,
     calculate_watts_per_kg,
     compute_analysis,
     compute_load,
+    daily_frame,
 )
 from app.intervals.models import AnalysisResult
-from app.intervals.parser.activity import ParsedActivity
+from app.intervals.parser.activity import ACTIVITY_SCHEMA, ParsedActivity
+from app.intervals.parser.power_curve import ParsedPowerCurve
 from app.intervals.parser.wellness import ParsedWellness
 
 
@@ -121,6 +126,34 @@ def test_compute_load(activities: list[ParsedActivity]) -> None:
     assert load.training_stress_balance == load.chronic - load.acute
 
 
+def test_compute_analysis_requested_providers(activities: list[ParsedActivity]) -> None:
+    """Test that only the requested providers and their dependencies are computed."""
+    # GIVEN dummy activities and a client for datasets that were not provided
+    client = MagicMock()
+
+    # WHEN computing only the activity provider without widgets
+    analysis = compute_analysis(activities, client=client, providers={"activity"}, widgets=False)
+
+    # THEN the activity provider and the PMC it depends on are computed
+    assert set(analysis.provider_results) == {"pmc", "activity"}
+    # AND no widgets were built
+    assert analysis.widgets == []
+    # AND the power curves were not fetched as no selected provider needs them
+    client.power_curves.assert_not_called()
+
+
+def test_compute_load_only_runs_pmc(activities: list[ParsedActivity]) -> None:
+    """Test that the training load only runs the PMC provider."""
+    # GIVEN a client for datasets that were not provided
+    client = MagicMock()
+
+    # WHEN computing the training load
+    compute_load(activities, client=client)
+
+    # THEN no other provider fetched data
+    client.power_curves.assert_not_called()
+
+
 def test_compute_analysis_display_days(activities: list[ParsedActivity]) -> None:
     """Test filtering by display days."""
     # GIVEN an activity 10 days ago
@@ -198,9 +231,62 @@ def test_compute_ftp_trajectory() -> None:
     # WHEN computing the analysis
     analysis = compute_analysis(activities)
 
-    # THEN basic result is returned
+    # THEN the FTP is carried into the daily frame and compressed to its change points
     assert isinstance(analysis, AnalysisResult)
-    assert "ftp_trajectory" in analysis.provider_results
+    trajectory = analysis.provider_results["ftp_trajectory"]
+    assert trajectory.dates == ["2026-03-20", "2026-04-20"]
+    assert trajectory.ftp_values == [250.0, 260.0]
+    assert trajectory.span_days == 32
+
+
+def test_build_daily_frame_forward_fills_ftp() -> None:
+    """Tests that the last FTP of a day is carried forward to the following days."""
+    # GIVEN activities reporting an FTP on two days, the second one twice
+    given = {
+        "date": [date(2026, 3, 1), date(2026, 3, 4), date(2026, 3, 4)],
+        "training_stress": [50.0, 60.0, 70.0],
+        "ftp": [250.0, 255.0, 260.0],
+    }
+    activities = pl.DataFrame(
+        {name: given.get(name, [None] * 3) for name in ACTIVITY_SCHEMA.names()}, schema=ACTIVITY_SCHEMA
+    )
+
+    # WHEN building the daily frame
+    daily = build_daily_frame(activities)
+
+    # THEN every day has the last known FTP
+    assert daily is not None
+    assert daily["ftp"].to_list() == [250.0, 250.0, 250.0, 260.0]
+
+
+def test_daily_frame_fills_gaps_lazily(wellness_data: list[ParsedWellness]) -> None:
+    """Tests that the daily frame is a query covering every day of the activities and wellness data."""
+    # GIVEN an activity five days before the wellness data
+    given = {"date": [date(2026, 3, 27)], "training_stress": [50.0], "ftp": [250.0]}
+    activities = pl.DataFrame(
+        {name: given.get(name, [None]) for name in ACTIVITY_SCHEMA.names()}, schema=ACTIVITY_SCHEMA
+    )
+
+    # WHEN building the daily frame
+    daily = daily_frame(activities, wellness_data)
+
+    # THEN the query yields one row per day with the gaps filled
+    assert isinstance(daily, pl.LazyFrame)
+    df = daily.collect()
+    assert df["date"].to_list() == [date(2026, 3, 27) + timedelta(days=i) for i in range(7)]
+    assert df["training_stress"].to_list() == [50.0, 0, 0, 0, 0, 0, 0]
+    assert df["hrv"].to_list() == [None, None, None, None, None, 60.0, 70.0]
+
+
+def test_daily_frame_without_data() -> None:
+    """Tests that there is no daily frame without activities and wellness data."""
+    # GIVEN no activities
+    activities = pl.DataFrame(schema=ACTIVITY_SCHEMA)
+
+    # WHEN building the daily frame
+    # THEN there is none
+    assert daily_frame(activities) is None
+    assert build_daily_frame(activities) is None
 
 
 def test_compute_power_curve_summary() -> None:
@@ -248,6 +334,21 @@ def test_compute_power_curve_summary() -> None:
     assert "power_curve" in analysis.provider_results
 
 
+def test_compute_analysis_reuses_power_curve(activities: list[ParsedActivity]) -> None:
+    """Tests that an already fetched power curve is not requested again by the providers."""
+    # GIVEN activities, a client and a pre-fetched power curve
+    mock_client = MagicMock()
+    power_curve = [ParsedPowerCurve(id="90d", secs=[1200], watts=[300])]
+
+    # WHEN computing the analysis with both
+    analysis = compute_analysis(activities, power_curve=power_curve, client=mock_client)
+
+    # THEN the power curve provider result is based on the given curve
+    assert analysis.provider_results["power_curve"].peak_20m == 300
+    # AND the client was not used to fetch it again
+    mock_client.power_curves.assert_not_called()
+
+
 def test_compute_analysis_empty() -> None:
     """Test compute analysis with empty inputs."""
     # GIVEN no inputs
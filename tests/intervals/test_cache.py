@@ -0,0 +1,127 @@
+"""Tests for the process-wide HTTP cache."""
+
+from typing import TYPE_CHECKING
+
+import requests
+
+from app.config import CacheBackend, get_settings
+from app.intervals.cache import CacheStats, HttpCache, InstrumentedCachedSession, LRUStorage, create_http_session
+from app.intervals.client import BASE_URL, IntervalsClient
+
+if TYPE_CHECKING:
+    from requests_mock import Mocker
+
+
+def test_lru_storage_evicts_least_recently_used() -> None:
+    """Test that the storage evicts the least recently used entry."""
+    # GIVEN a full storage
+    storage = LRUStorage(maxsize=2)
+    storage["a"] = 1
+    storage["b"] = 2
+    # AND a recently read entry
+    assert storage["a"] == 1
+
+    # WHEN adding another entry
+    storage["c"] = 3
+
+    # THEN the least recently used entry is evicted
+    assert set(storage.keys()) == {"a", "c"}
+
+
+def test_cache_stats_per_endpoint() -> None:
+    """Test that hits and misses are counted per endpoint."""
+    # GIVEN empty statistics
+    stats = CacheStats()
+
+    # WHEN recording lookups
+    stats.record(f"{BASE_URL}/athlete/i1/wellness?oldest=2026-01-01", hit=False)
+    stats.record(f"{BASE_URL}/athlete/i1/wellness?oldest=2026-01-01", hit=True)
+    stats.record(f"{BASE_URL}/athlete/i1/power-curves", hit=True)
+
+    # THEN the totals and the per-endpoint counters are reported
+    assert stats.to_dict() == {
+        "hits": 2,
+        "misses": 1,
+        "endpoints": {"power-curves": {"hits": 1, "misses": 0}, "wellness": {"hits": 1, "misses": 1}},
+    }
+
+
+def test_create_http_session_without_ttl() -> None:
+    """Test that a plain pooled session is used when caching is disabled."""
+    # GIVEN settings without any TTL
+    settings = get_settings().model_copy(update={"CACHE_INTERVALS_HOURS": 0, "CACHE_POWER_CURVES_HOURS": 0})
+
+    # WHEN creating the session
+    session = create_http_session(settings, CacheStats())
+
+    # THEN no cache is involved
+    assert type(session) is requests.Session
+
+
+def test_create_http_session_memory_backend(requests_mock: Mocker) -> None:
+    """Test that the in-memory backend caches responses per endpoint TTL and counts hits."""
+    # GIVEN settings caching only the power curves in memory
+    settings = get_settings().model_copy(
+        update={"CACHE_BACKEND": CacheBackend.MEMORY, "CACHE_INTERVALS_HOURS": 0, "CACHE_POWER_CURVES_HOURS": 24}
+    )
+    stats = CacheStats()
+    session = create_http_session(settings, stats)
+    client = IntervalsClient(api_key="test_key", athlete_id="test_id", session=session)
+    # AND mocked API endpoints
+    curves = requests_mock.get(f"{BASE_URL}/athlete/test_id/power-curves", json={"list": []})
+    wellness = requests_mock.get(f"{BASE_URL}/athlete/test_id/wellness", json=[])
+
+    # WHEN fetching each endpoint twice
+    for _ in range(2):
+        client.power_curves()
+        client.wellness(days=7)
+
+    # THEN the session is instrumented and uses the LRU storage
+    assert isinstance(session, InstrumentedCachedSession)
+    assert isinstance(session.cache.responses, LRUStorage)
+    # AND only the power curves are served from the cache
+    assert curves.call_count == 1
+    assert wellness.call_count == 2
+    assert stats.hits["power-curves"] == 1
+    assert stats.misses["wellness"] == 2
+
+
+def test_create_http_session_scopes_cache_to_credentials(requests_mock: Mocker) -> None:
+    """Test that a cached response is only served to clients with the same API key."""
+    # GIVEN a cached session shared by clients with different API keys for the same athlete
+    settings = get_settings().model_copy(update={"CACHE_BACKEND": CacheBackend.MEMORY, "CACHE_POWER_CURVES_HOURS": 24})
+    session = create_http_session(settings, CacheStats())
+    owner = IntervalsClient(api_key="owner_key", athlete_id="test_id", session=session)
+    other = IntervalsClient(api_key="other_key", athlete_id="test_id", session=session)
+    # AND a mocked endpoint
+    curves = requests_mock.get(f"{BASE_URL}/athlete/test_id/power-curves", json={"list": []})
+
+    # WHEN both clients fetch the same URL twice
+    for _ in range(2):
+        owner.power_curves()
+        other.power_curves()
+
+    # THEN each key is sent upstream once and is then served its own cached response
+    assert curves.call_count == 2
+    assert len({r.headers["Authorization"] for r in curves.request_history}) == 2
+    # AND the credentials are not stored with the cached responses
+    assert isinstance(session, InstrumentedCachedSession)
+    assert {r.request.headers["Authorization"] for r in session.cache.responses.values()} == {"REDACTED"}
+
+
+def test_http_cache_lifecycle() -> None:
+    """Test that the holder creates, reuses and closes the shared session."""
+    # GIVEN an empty holder
+    cache = HttpCache()
+
+    # WHEN opening it
+    session = cache.open(get_settings().model_copy(update={"CACHE_INTERVALS_HOURS": 0}))
+
+    # THEN the same session is shared
+    assert cache.get() is session
+
+    # WHEN closing it
+    cache.close()
+
+    # THEN a new session is created lazily
+    assert cache.get() is not session
@@ -5,12 +5,19 @@ from typing import TYPE_CHECKING
 
 import pytest
 import requests
+from requests.adapters import HTTPAdapter
 from requests_cache import CachedSession
 
 if TYPE_CHECKING:
     from requests_mock import Mocker
 
-from app.intervals.client import BASE_URL, IntervalsClient
+from app.intervals.client import (
+    BASE_URL,
+    POOL_SIZE,
+    IntervalsClient,
+    create_pooled_session,
+)
+from app.intervals.scheduler import RequestScheduler
 
 
 def test_intervals_client_caching(requests_mock: Mocker) -> None:
@@ -62,7 +69,8 @@ def test_intervals_client_api_error(requests_mock: Mocker) -> None:
     """Test that API errors are propagated."""
     # GIVEN a client
     session = CachedSession(backend="memory")
-    client = IntervalsClient(api_key="test_key", athlete_id="test_id", session=session)
+    scheduler = RequestScheduler(max_retries=0)
+    client = IntervalsClient(api_key="test_key", athlete_id="test_id", session=session, scheduler=scheduler)
     # AND a mocked API endpoint that returns an error
     requests_mock.get(f"{BASE_URL}/athlete/test_id/wellness", status_code=500)
 
@@ -70,3 +78,15 @@ def test_intervals_client_api_error(requests_mock: Mocker) -> None:
     # THEN the HTTPError is raised
     with pytest.raises(requests.exceptions.HTTPError):
         client.wellness(days=7)
+
+
+def test_create_pooled_session() -> None:
+    """Test that the pooled adapter is mounted for https."""
+    # GIVEN a fresh session
+    # WHEN mounting the connection pool
+    session = create_pooled_session()
+
+    # THEN https requests use the pooled adapter
+    adapter = session.get_adapter(BASE_URL)
+    assert isinstance(adapter, HTTPAdapter)
+    assert adapter._pool_maxsize == POOL_SIZE
@@ -0,0 +1,57 @@
+"""Tests the critical power models."""
+
+import pytest
+
+from app.intervals.critical_power import fit_critical_power
+from app.intervals.parser.power_curve import ParsedPowerCurve
+
+SECS = [1, 2, 5, 10, 15, 20, 30, 45, 60, 90, 120, 180, 240, 300, 420, 600, 900, 1200, 1800, 2400, 3600]
+
+
+def _curve(cp: float, w_prime: float, time_constant: float = 0.0) -> ParsedPowerCurve:
+    return ParsedPowerCurve(id="90d", secs=SECS, watts=[round(cp + w_prime / (s + time_constant)) for s in SECS])
+
+
+def test_fit_three_parameter_model() -> None:
+    """Test that the 3-parameter fit recovers CP, W' and Pmax of a modelled curve."""
+    # GIVEN a curve of CP 280 W, W' 20 kJ and Pmax 1280 W
+    curve = _curve(280, 20_000, time_constant=20)
+
+    # WHEN fitting the 3-parameter model
+    fit = fit_critical_power(curve)
+
+    # THEN the model is recovered up to the rounding of the watts
+    assert fit is not None
+    assert fit.cp == pytest.approx(280, rel=0.01)
+    assert fit.w_prime == pytest.approx(20_000, rel=0.03)
+    assert fit.time_constant == 20
+    assert fit.pmax == pytest.approx(1280, rel=0.03)
+    # AND the FTP is estimated below CP, not from the model extrapolated to one hour
+    assert fit.ftp == pytest.approx(0.95 * fit.cp)
+    assert fit.ftp < fit.power(3600)
+
+
+def test_fit_two_parameter_model() -> None:
+    """Test that the 2-parameter fit uses the durations of 2 to 20 minutes."""
+    # GIVEN a curve following the 2-parameter model
+    curve = _curve(300, 15_000)
+
+    # WHEN fitting the 2-parameter model
+    fit = fit_critical_power(curve, three_parameter=False)
+
+    # THEN CP and W' are recovered without a maximal power
+    assert fit is not None
+    assert fit.cp == pytest.approx(300, rel=0.005)
+    assert fit.w_prime == pytest.approx(15_000, rel=0.02)
+    assert fit.time_constant == 0
+    assert fit.pmax is None
+
+
+def test_fit_without_enough_durations() -> None:
+    """Test that curves not covering the fitted durations are not fitted."""
+    # GIVEN curves ending before two minutes and an empty curve
+    short = ParsedPowerCurve(id="90d", secs=[1, 5, 60], watts=[1000, 900, 500])
+
+    # WHEN / THEN: No model is fitted
+    assert fit_critical_power(short, three_parameter=False) is None
+    assert fit_critical_power(ParsedPowerCurve(id="90d")) is None
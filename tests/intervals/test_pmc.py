@@ -0,0 +1,128 @@
+"""Tests the vectorised training load models."""
+
+import math
+from datetime import date, timedelta
+
+import polars as pl
+import pytest
+
+from app.intervals.pmc import fit_banister, fit_time_constants, ftp_markers, impulse_response, load_column
+from app.planning.providers.pmc import PMCPoint, advance_pmc
+
+START = date(2026, 1, 1)
+
+
+def _daily(stresses: list[float]) -> pl.DataFrame:
+    return pl.DataFrame({
+        "date": [START + timedelta(days=i) for i in range(len(stresses))],
+        "training_stress": stresses,
+    })
+
+
+def _daily_with_ftp(days: int) -> pl.DataFrame:
+    # An FTP generated with 45/9 day constants, reported every ten days and carried forward in between
+    daily = _daily(_stresses(days))
+    loads = impulse_response(daily["training_stress"], (45, 9))
+    performance = 200.0 + 1.2 * loads[load_column(45)] - 0.8 * loads[load_column(9)]
+    reported = pl.Series(range(days)) % 10 == 5
+    return daily.with_columns(ftp=pl.when(reported).then(performance).forward_fill())
+
+
+def _stresses(days: int) -> list[float]:
+    # Three-week blocks of rising load followed by a recovery week
+    return [0.0 if i % 7 == 6 else 40.0 + 20.0 * ((i // 7) % 4 != 3) + 5.0 * (i % 3) for i in range(days)]
+
+
+def test_impulse_response_matches_recurrence() -> None:
+    """Test that every time constant equals the PMC recurrence started without load."""
+    # GIVEN the stress of 60 days
+    stresses = _stresses(60)
+
+    # WHEN computing the loads of three time constants in one pass
+    loads = impulse_response(pl.Series(stresses), (42, 7, 20))
+
+    # THEN there is one column per constant and one row per day
+    assert loads.columns == [load_column(42), load_column(7), load_column(20)]
+    assert loads.height == len(stresses)
+    # AND the loads equal the recurrence
+    expected = advance_pmc(PMCPoint(day=START, ctl=0.0, atl=0.0), stresses, chronic_days=42, acute_days=20)
+    assert all(math.isclose(a, p.ctl) for a, p in zip(loads[load_column(42)], expected, strict=True))
+    assert all(math.isclose(a, p.atl) for a, p in zip(loads[load_column(20)], expected, strict=True))
+
+
+def test_impulse_response_seeded_with_first_day() -> None:
+    """Test that without an initial load the first day's stress seeds the load."""
+    # GIVEN / WHEN: The loads without an initial value
+    loads = impulse_response(pl.Series([10.0, 20.0]), (7,), initial=None)
+
+    # THEN the first day equals its stress
+    assert loads[load_column(7)][0] == 10.0
+
+
+def test_fit_banister_recovers_model() -> None:
+    """Test that the fit recovers the constants and gains of performance generated by the model."""
+    # GIVEN performance markers every ten days generated with known constants and gains
+    daily = _daily(_stresses(400))
+    loads = impulse_response(daily["training_stress"], (45, 9))
+    performance = 200.0 + 1.2 * loads[load_column(45)] - 0.8 * loads[load_column(9)]
+    markers = pl.DataFrame({"date": daily["date"], "performance": performance}).gather_every(10, offset=5)
+
+    # WHEN fitting the model
+    fit = fit_banister(daily, markers)
+
+    # THEN the model is recovered
+    assert fit is not None
+    assert (fit.fitness_days, fit.fatigue_days) == (45, 9)
+    assert fit.baseline == pytest.approx(200.0)
+    assert fit.fitness_gain == pytest.approx(1.2)
+    assert fit.fatigue_gain == pytest.approx(0.8)
+    assert fit.rmse == pytest.approx(0.0, abs=1e-6)
+
+
+def test_fit_banister_with_too_few_markers() -> None:
+    """Test that no model is fitted to fewer markers than needed."""
+    # GIVEN four markers
+    daily = _daily(_stresses(100))
+    markers = pl.DataFrame({"date": daily["date"][:4], "performance": [250.0, 251.0, 252.0, 253.0]})
+
+    # WHEN / THEN: No model is fitted
+    assert fit_banister(daily, markers) is None
+
+
+def test_ftp_markers() -> None:
+    """Test that only the days on which the FTP changed are markers."""
+    # GIVEN an FTP reported on the second day, carried forward, and changed on the fourth day
+    daily = _daily([0.0] * 5).with_columns(ftp=pl.Series([None, 250.0, 250.0, 260.0, 260.0]))
+
+    # WHEN extracting the markers
+    markers = ftp_markers(daily)
+
+    # THEN the changes are the markers
+    assert markers.rows() == [(START + timedelta(days=1), 250.0), (START + timedelta(days=3), 260.0)]
+    # AND a frame without FTP has none
+    assert ftp_markers(_daily([0.0])).is_empty()
+
+
+def test_fit_time_constants() -> None:
+    """Test that the PMC time constants are fitted to the FTP changes of the daily frame."""
+    # GIVEN an FTP following the model with 45/9 day constants
+    daily = _daily_with_ftp(400)
+
+    # WHEN fitting the time constants
+    fit = fit_time_constants(daily)
+
+    # THEN the constants are recovered
+    assert fit is not None
+    assert (fit.fitness_days, fit.fatigue_days) == (45, 9)
+    assert fit.r_squared == pytest.approx(1.0)
+
+
+def test_fit_time_constants_rejects_implausible_fits() -> None:
+    """Test that no constants are fitted without FTP changes or to changes unrelated to the training load."""
+    # GIVEN an FTP that alternates regardless of the training load
+    daily = _daily(_stresses(400))
+    unrelated = daily.with_columns(ftp=pl.Series([250.0 + 10.0 * ((i // 10) % 2) for i in range(400)]))
+
+    # WHEN / THEN: No constants are fitted
+    assert fit_time_constants(daily) is None
+    assert fit_time_constants(unrelated) is None
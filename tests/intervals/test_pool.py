@@ -0,0 +1,89 @@
+"""Tests for the per-user client pool."""
+
+import uuid
+from typing import TYPE_CHECKING
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.intervals.pool import ClientPool
+from app.models.user import DecryptedUserSecrets
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+
+
+@pytest.fixture(name="mock_load_secrets")
+def fixture_mock_load_secrets() -> Generator[MagicMock]:
+    """Patches secret loading to return per-user credentials.
+
+    Yields:
+        The mocked load_user_secrets function.
+    """
+    with patch("app.intervals.pool.load_user_secrets") as mock_load:
+        mock_load.side_effect = lambda user_id: DecryptedUserSecrets(
+            intervals_athlete_id=f"athlete-{user_id}", intervals_api_key=f"key-{user_id}"
+        )
+        yield mock_load
+
+
+def test_client_pool_reuses_client(mock_load_secrets: MagicMock) -> None:
+    """Test that the client is built from the user's secrets once and then reused."""
+    # GIVEN a pool and a user
+    pool = ClientPool(session_factory=MagicMock)
+    user_id = uuid.uuid4()
+
+    # WHEN resolving the client twice
+    client1 = pool.get(user_id)
+    client2 = pool.get(user_id)
+
+    # THEN the same client is returned with the user's credentials
+    assert client1 is client2
+    assert client1.athlete_id == f"athlete-{user_id}"
+    assert client1.api_key == f"key-{user_id}"
+    # AND the secrets were only loaded once
+    mock_load_secrets.assert_called_once_with(user_id)
+
+
+def test_client_pool_evicts_least_recently_used(mock_load_secrets: MagicMock) -> None:
+    """Test that the pool is bounded and evicts the least recently used client."""
+    # GIVEN a pool with room for two clients
+    pool = ClientPool(maxsize=2, session_factory=MagicMock)
+    user1, user2, user3 = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    client1 = pool.get(user1)
+    pool.get(user2)
+
+    # WHEN using the first client again and adding a third one
+    pool.get(user1)
+    pool.get(user3)
+
+    # THEN the second client was evicted
+    assert len(pool) == 2
+    assert pool.get(user1) is client1
+    pool.get(user2)
+    assert mock_load_secrets.call_count == 4
+
+
+def test_client_pool_ttl_and_invalidate(mock_load_secrets: MagicMock) -> None:
+    """Test that expired or invalidated clients are rebuilt."""
+    # GIVEN a pool whose clients expire immediately
+    pool = ClientPool(ttl_seconds=0, session_factory=MagicMock)
+    user_id = uuid.uuid4()
+
+    # WHEN resolving the client twice
+    client1 = pool.get(user_id)
+    client2 = pool.get(user_id)
+
+    # THEN the client is rebuilt
+    assert client1 is not client2
+
+    # GIVEN a pool without expiry
+    pool = ClientPool(session_factory=MagicMock)
+    client1 = pool.get(user_id)
+
+    # WHEN invalidating the user's client
+    pool.invalidate(user_id)
+
+    # THEN it is rebuilt on next use
+    assert pool.get(user_id) is not client1
+    assert mock_load_secrets.call_count == 4
@@ -0,0 +1,161 @@
+"""Tests for the intervals.icu request scheduler."""
+
+from datetime import UTC, datetime, timedelta
+from email.utils import format_datetime
+from typing import TYPE_CHECKING
+
+import pytest
+import requests
+
+from app.intervals.client import BASE_URL, IntervalsClient
+from app.intervals.scheduler import RETRY_AFTER_MAX_SECONDS, RequestScheduler, TokenBucket, parse_retry_after
+
+if TYPE_CHECKING:
+    from requests_mock import Mocker
+
+URL = f"{BASE_URL}/athlete/test_id/wellness"
+
+
+class FakeClock:
+    """Clock advanced by the sleeps of the code under test."""
+
+    def __init__(self) -> None:
+        """Starts the clock at zero."""
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        """Returns the current time."""
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        """Advances the clock."""
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_parse_retry_after() -> None:
+    """Test parsing delay seconds and HTTP dates."""
+    # GIVEN Retry-After values in both formats
+    retry_at = format_datetime(datetime.now(UTC) + timedelta(seconds=30), usegmt=True)
+
+    # WHEN parsing them
+    # THEN the delay in seconds is returned
+    assert parse_retry_after("5") == 5
+    delay = parse_retry_after(retry_at)
+    assert delay is not None
+    assert 25 < delay <= 30
+    # AND missing or invalid values are ignored
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+
+
+def test_token_bucket_throttles_bursts() -> None:
+    """Test that requests beyond the burst wait for refilled tokens."""
+    # GIVEN a bucket allowing a burst of two requests at one request per second
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1, capacity=2, clock=clock, sleep=clock.sleep)
+
+    # WHEN acquiring three tokens
+    for _ in range(3):
+        bucket.acquire()
+
+    # THEN only the third request waited
+    assert clock.sleeps == [1]
+
+
+def test_token_bucket_block_for() -> None:
+    """Test that a Retry-After block holds back requests despite available tokens."""
+    # GIVEN a full bucket that was told to back off
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1, capacity=5, clock=clock, sleep=clock.sleep)
+    bucket.block_for(3)
+
+    # WHEN acquiring a token
+    bucket.acquire()
+
+    # THEN the request waited until the block expired
+    assert clock.now == 3
+
+
+def test_scheduler_retries_rate_limited_requests(requests_mock: Mocker) -> None:
+    """Test that 429 and 5xx responses are retried, honouring Retry-After."""
+    # GIVEN an endpoint that is rate limited, then fails, then succeeds
+    clock = FakeClock()
+    scheduler = RequestScheduler(clock=clock, sleep=clock.sleep)
+    matcher = requests_mock.get(
+        URL,
+        [
+            {"status_code": 429, "headers": {"Retry-After": "7"}},
+            {"status_code": 503},
+            {"json": [{"id": "2026-04-20"}]},
+        ],
+    )
+
+    # WHEN requesting it
+    r = scheduler.get(requests.Session(), URL, "test_key")
+
+    # THEN the request succeeded after two retries
+    assert r.json() == [{"id": "2026-04-20"}]
+    assert matcher.call_count == 3
+    # AND the Retry-After delay was honoured
+    assert clock.sleeps[0] == 7
+    # AND the API key was sent
+    assert matcher.last_request is not None
+    assert matcher.last_request.headers["Authorization"].startswith("Basic ")
+
+
+def test_scheduler_caps_retry_after(requests_mock: Mocker) -> None:
+    """Test that a long Retry-After delay is capped instead of blocking the worker for minutes."""
+    # GIVEN an endpoint asking to retry after ten minutes
+    clock = FakeClock()
+    scheduler = RequestScheduler(clock=clock, sleep=clock.sleep)
+    requests_mock.get(URL, [{"status_code": 429, "headers": {"Retry-After": "600"}}, {"json": []}])
+
+    # WHEN requesting it
+    r = scheduler.get(requests.Session(), URL, "test_key")
+
+    # THEN the request was retried after the capped delay
+    assert r.json() == []
+    assert clock.sleeps == [RETRY_AFTER_MAX_SECONDS]
+
+
+def test_scheduler_gives_up_after_max_retries(requests_mock: Mocker) -> None:
+    """Test that the last error response is returned once the retries are exhausted."""
+    # GIVEN an endpoint that always fails
+    scheduler = RequestScheduler(max_retries=2, sleep=lambda _: None)
+    matcher = requests_mock.get(URL, status_code=500)
+
+    # WHEN requesting it
+    r = scheduler.get(requests.Session(), URL, "test_key")
+
+    # THEN the error response is returned after all attempts
+    assert r.status_code == 500
+    assert matcher.call_count == 3
+
+
+def test_scheduler_retries_connection_errors(requests_mock: Mocker) -> None:
+    """Test that connection errors are retried and eventually propagated."""
+    # GIVEN an unreachable endpoint
+    scheduler = RequestScheduler(max_retries=1, sleep=lambda _: None)
+    matcher = requests_mock.get(URL, exc=requests.ConnectionError)
+
+    # WHEN requesting it
+    # THEN the error is raised after the retry
+    with pytest.raises(requests.ConnectionError):
+        scheduler.get(requests.Session(), URL, "test_key")
+    assert matcher.call_count == 2
+
+
+def test_client_raises_after_retries(requests_mock: Mocker) -> None:
+    """Test that the client raises once the scheduler gives up."""
+    # GIVEN a client whose endpoint keeps failing
+    client = IntervalsClient(
+        api_key="test_key", athlete_id="test_id", scheduler=RequestScheduler(max_retries=1, sleep=lambda _: None)
+    )
+    requests_mock.get(URL, status_code=502)
+
+    # WHEN fetching data
+    # THEN the HTTPError is raised
+    with pytest.raises(requests.exceptions.HTTPError):
+        client.wellness(days=7)
@@ -0,0 +1,79 @@
+"""Tests for the rolling time-in-zone distributions."""
+
+import math
+
+import polars as pl
+import pytest
+
+from app.intervals.parser.activity import MAX_ZONES, ZONE_TIMES
+from app.intervals.time_in_zone import polarization_index, window_label, zone_shares
+
+
+def _daily(*days: list[int]) -> pl.DataFrame:
+    zones = [day + [0] * (MAX_ZONES - len(day)) for day in days]
+    return pl.DataFrame({"zones": zones}, schema={"zones": ZONE_TIMES})
+
+
+def test_window_label() -> None:
+    """Tests the label of a rolling window."""
+    # GIVEN a window of a week
+    # WHEN labelling it
+    # THEN the label names the days
+    assert window_label(7) == "7d"
+
+
+def test_zone_shares_are_time_weighted() -> None:
+    """Tests that the rolling shares sum the zone times of all days before dividing."""
+    # GIVEN a short easy day, a day without training and a long hard day
+    daily_df = _daily([600, 0, 0], [], [0, 0, 3000])
+
+    # WHEN computing the daily and the 3-day shares
+    daily = daily_df.select(share.alias(str(i)) for i, share in enumerate(zone_shares("zones", 1)) if share is not None)
+    rolling = daily_df.select(
+        share.alias(str(i)) for i, share in enumerate(zone_shares("zones", 3)) if share is not None
+    )
+
+    # THEN each day has its own distribution, none without training
+    assert daily.row(0)[:3] == (100.0, 0.0, 0.0)
+    assert daily.row(1)[:3] == (None, None, None)
+    # AND the rolling window weights the days by their time
+    assert rolling.row(2)[:3] == pytest.approx((100 / 6, 0.0, 500 / 6))
+
+
+def test_zone_shares_exclude_zones() -> None:
+    """Tests that excluded zones are left out of the total."""
+    # GIVEN a day with time in the first zone and an overlapping one
+    daily_df = _daily([600, 0, 600])
+
+    # WHEN excluding the overlapping zone
+    shares = zone_shares("zones", 1, excluded=(2,))
+
+    # THEN the excluded zone has no share and the others add up to 100%
+    assert shares[2] is None
+    assert daily_df.select(shares[0]).item() == 100.0
+
+
+def test_polarization_index() -> None:
+    """Tests the polarization index of the three-zone model."""
+    # GIVEN a polarized day: 80% low, 5% moderate and 15% high
+    daily_df = _daily([400, 400, 25, 25, 150])
+
+    # WHEN computing the index
+    index = daily_df.select(polarization_index(zone_shares("zones", 1))).item()
+
+    # THEN it follows log10(low / moderate * high * 100)
+    assert index == pytest.approx(math.log10(0.8 / 0.05 * 0.15 * 100))
+    assert index > 2
+
+
+def test_polarization_index_floors_empty_zones() -> None:
+    """Tests that empty moderate and high zones are floored, and there is no index without low time."""
+    # GIVEN a day in the low zone only and a day in the high zone only
+    daily_df = _daily([600], [0, 0, 0, 0, 600])
+
+    # WHEN computing the index
+    index = daily_df.select(polarization_index(zone_shares("zones", 1))).to_series().to_list()
+
+    # THEN the empty zones count as 1% and the day without low time has none
+    assert index[0] == pytest.approx(math.log10(1 / 0.01 * 0.01 * 100))
+    assert index[1] is None
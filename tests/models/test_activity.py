@@ -0,0 +1,27 @@
+"""Tests for the local activity store models."""
+
+from datetime import date
+
+from app.models.activity import StoredActivity, StoredWellness, SyncState
+
+
+def test_create_stored_records() -> None:
+    """Test creating stored activity, wellness and sync state records."""
+    # GIVEN raw intervals.icu payloads
+    activity = {"id": "i1", "start_date_local": "2026-04-20T08:00:00"}
+    wellness = {"id": "2026-04-20", "hrv": 70}
+
+    # WHEN creating the stored records
+    stored_activity = StoredActivity(
+        athlete_id="athlete", activity_id="i1", start_date=date(2026, 4, 20), payload=activity
+    )
+    stored_wellness = StoredWellness(athlete_id="athlete", day=date(2026, 4, 20), payload=wellness)
+    state = SyncState(
+        athlete_id="athlete", dataset="activities", oldest=date(2026, 1, 1), last_synced=date(2026, 4, 20)
+    )
+
+    # THEN the payloads are kept unchanged
+    assert stored_activity.payload == activity
+    assert stored_wellness.payload["hrv"] == 70
+    # AND the sync state records the covered range
+    assert state.oldest < state.last_synced
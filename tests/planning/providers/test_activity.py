@@ -8,6 +8,7 @@ import pytest
 
 from app.intervals.client import IntervalsClient
 from app.planning.providers.activity import ActivityProvider
+from app.planning.providers.interfaces import AnalysisContext
 
 
 @pytest.mark.asyncio
@@ -41,7 +42,9 @@ async def test_activity_provider_context() -> None:
         {"date": today_str, "training_stress": 100.0, "duration_h": 1.0, "distance_km": 30.0}
     ]).with_columns(pl.col("date").str.to_date("%Y-%m-%d"))
     provider_results = {"pmc": MagicMock(ctl=[50.0], atl=[60.0])}
-    result = provider.calculate(daily_df, client=client, provider_results=provider_results, display_days=None)
+    result = provider.calculate(
+        daily_df, context=AnalysisContext(client=client), provider_results=provider_results, display_days=None
+    )
     context = await provider.provide_context(result)
 
     # THEN: The context should include TSS, hours, distance, and load metrics from analysis.
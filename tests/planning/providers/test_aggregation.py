@@ -0,0 +1,128 @@
+"""Tests for the fused aggregation of the daily frame."""
+
+from datetime import date, timedelta
+from unittest.mock import MagicMock
+
+import polars as pl
+
+from app.planning.providers.aggregation import (
+    collect_daily_frame,
+    evaluate_aggregations,
+    in_window,
+    provider_aggregates,
+    windowed,
+)
+from app.planning.providers.interfaces import AnalysisContext, MetricProvider
+
+
+def _daily(days: int) -> pl.DataFrame:
+    start = date(2026, 4, 1)
+    return pl.DataFrame({
+        "date": [start + timedelta(days=i) for i in range(days)],
+        "training_stress": [float(i) for i in range(days)],
+    })
+
+
+def test_in_window_selects_last_days() -> None:
+    """Tests that the window counts back from the latest date of the frame."""
+    # GIVEN ten consecutive days
+    daily_df = _daily(10)
+
+    # WHEN selecting the last three days
+    selected = daily_df.filter(in_window(3))
+
+    # THEN only the last three days remain
+    assert selected["training_stress"].to_list() == [7.0, 8.0, 9.0]
+
+
+def test_evaluate_aggregations_of_many_providers() -> None:
+    """Tests that the aggregations of several providers are evaluated together and grouped by provider."""
+    # GIVEN two providers aggregating overlapping windows of the frame
+    daily_df = _daily(10)
+    stress = pl.col("training_stress")
+    aggregations = {
+        "a": {"total": stress.sum(), "recent": windowed(stress, 3).sum()},
+        "b": {"recent": windowed(stress, 3).implode(), "all": windowed(stress, None).max()},
+        "c": {},
+    }
+
+    # WHEN evaluating them
+    values = evaluate_aggregations(daily_df, aggregations)
+
+    # THEN every provider receives the values of its own aggregations
+    assert values == {
+        "a": {"total": 45.0, "recent": 24.0},
+        "b": {"recent": [7.0, 8.0, 9.0], "all": 9.0},
+        "c": {},
+    }
+
+
+def test_evaluate_aggregations_without_expressions() -> None:
+    """Tests that the frame is not queried without aggregations."""
+    # GIVEN a frame that must not be touched
+    daily_df = MagicMock()
+
+    # WHEN evaluating no aggregations
+    values = evaluate_aggregations(daily_df, {"a": {}})
+
+    # THEN the provider receives no values
+    assert values == {"a": {}}
+    daily_df.lazy.assert_not_called()
+
+
+def test_provider_aggregates_prefers_context() -> None:
+    """Tests that the values of a registry run are read from the context instead of being evaluated again."""
+    # GIVEN a context holding the provider's values
+    provider = MagicMock(spec=MetricProvider)
+    provider.get_name.return_value = "p1"
+    context = AnalysisContext(aggregates={"p1": {"total": 1.0}})
+
+    # WHEN reading the provider's aggregates
+    values = provider_aggregates(provider, _daily(3), context, None)
+
+    # THEN the context values are returned
+    assert values == {"total": 1.0}
+    provider.get_aggregations.assert_not_called()
+
+
+def test_provider_aggregates_evaluates_standalone() -> None:
+    """Tests that a provider calculated on its own evaluates its aggregations."""
+    # GIVEN a provider summing the training stress of the display window
+    provider = MagicMock(spec=MetricProvider)
+    provider.get_name.return_value = "p1"
+    provider.get_aggregations.side_effect = lambda _schema, days: {
+        "total": windowed(pl.col("training_stress"), days).sum()
+    }
+
+    # WHEN reading the provider's aggregates without a context
+    values = provider_aggregates(provider, _daily(10), None, 2)
+
+    # THEN the aggregations are evaluated over the frame
+    assert values == {"total": 17.0}
+
+
+def test_collect_daily_frame_with_aggregations() -> None:
+    """Tests that the query of the daily frame is collected together with the aggregations."""
+    # GIVEN the query of ten days and an aggregation over its last days
+    daily = _daily(10).lazy()
+    aggregations = {"a": {"recent": windowed(pl.col("training_stress"), 2).sum()}, "b": {}}
+
+    # WHEN collecting both
+    daily_df, values = collect_daily_frame(daily, aggregations)
+
+    # THEN the frame and the values of its aggregations are returned
+    assert daily_df.equals(_daily(10))
+    assert values == {"a": {"recent": 17.0}, "b": {}}
+
+
+def test_collect_daily_frame_without_aggregations() -> None:
+    """Tests that the daily frame is collected on its own without aggregations."""
+    # GIVEN the query of three days
+    daily = _daily(3).lazy()
+
+    # WHEN collecting it without aggregations
+    daily_df, values = collect_daily_frame(daily, {"a": {}})
+
+    # THEN only the frame is returned
+    assert daily_df.equals(_daily(3))
+    assert values == {"a": {}}
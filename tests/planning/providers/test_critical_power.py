@@ -0,0 +1,84 @@
+"""Tests for the critical power provider."""
+
+from unittest.mock import patch
+
+import polars as pl
+import pytest
+
+from app.intervals.critical_power import CriticalPowerFit, fit_critical_power
+from app.intervals.parser.power_curve import ParsedPowerCurve
+from app.planning.providers.critical_power import CriticalPowerProvider
+from app.planning.providers.interfaces import AnalysisContext, Dataset
+
+SECS = [1, 5, 15, 60, 180, 300, 600, 1200, 3600]
+
+
+def _context(curve: ParsedPowerCurve) -> AnalysisContext:
+    return AnalysisContext(datasets={Dataset.POWER_CURVES: [curve]})
+
+
+def _curve(cp: int = 280) -> ParsedPowerCurve:
+    return ParsedPowerCurve(id="90d", secs=SECS, watts=[round(cp + 20_000 / (s + 20)) for s in SECS])
+
+
+def test_critical_power_provider_caches_fits() -> None:
+    """Test that unchanged curves are fitted once and changed curves again."""
+    # GIVEN: A provider and two fetches of the same curve
+    provider = CriticalPowerProvider()
+
+    with patch("app.planning.providers.critical_power.fit_critical_power", side_effect=fit_critical_power) as mock_fit:
+        # WHEN: Calculating the model for both fetches
+        first = provider.calculate(pl.DataFrame([]), context=_context(_curve()))
+        second = provider.calculate(pl.DataFrame([]), context=_context(_curve()))
+
+        # THEN: The curve was fitted once
+        assert first is not None
+        assert second is first
+        mock_fit.assert_called_once()
+
+        # WHEN: The curve changed
+        third = provider.calculate(pl.DataFrame([]), context=_context(_curve(cp=290)))
+
+        # THEN: It is fitted again
+        assert mock_fit.call_count == 2
+        assert third is not None
+        assert third.cp > first.cp
+
+
+def test_critical_power_provider_evicts_fits() -> None:
+    """Test that the cache keeps at most its configured number of fits."""
+    # GIVEN: A provider caching a single fit
+    provider = CriticalPowerProvider(cache_size=1)
+
+    # WHEN: Fitting two different curves
+    provider.calculate(pl.DataFrame([]), context=_context(_curve()))
+    provider.calculate(pl.DataFrame([]), context=_context(_curve(cp=290)))
+
+    # THEN: Only the latest fit is kept
+    assert list(provider._fits) == [("90d", _curve(cp=290).fingerprint)]
+
+
+def test_critical_power_provider_without_curves() -> None:
+    """Test that nothing is fitted without a power curve."""
+    assert CriticalPowerProvider().calculate(pl.DataFrame([]), context=AnalysisContext()) is None
+
+
+@pytest.mark.asyncio
+async def test_critical_power_provider_context_and_widget() -> None:
+    """Test the LLM context and dashboard widget of a fitted model."""
+    # GIVEN: A fitted 3-parameter model
+    fit = CriticalPowerFit(cp=280.4, w_prime=20_150, time_constant=20, pmax=1287.9, ftp=266.4, rmse=1.0)
+    provider = CriticalPowerProvider()
+
+    # WHEN: Formatting it
+    context = await provider.provide_context(fit)
+    widget = provider.get_dashboard_widget(fit)
+
+    # THEN: CP, W', Pmax and the estimated FTP are reported
+    assert context == (
+        "Critical Power Model:\n- CP: 280W\n- W': 20.1kJ\n- Pmax: 1288W\n- Estimated FTP (0.95 * CP): 266W"
+    )
+    assert widget is not None
+    assert widget.value == "280 W"
+    assert widget.trend is not None
+    assert "W' 20.1 kJ" in widget.trend
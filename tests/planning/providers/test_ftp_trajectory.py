@@ -1,5 +1,10 @@
 """Tests for the FTP trajectory provider."""
 
+from datetime import date, timedelta
+
+import polars as pl
+import pytest
+
 from app.planning.providers.ftp_trajectory import FTPTrajectoryProvider, FTPTrajectoryResult
 
 
@@ -37,3 +42,35 @@ def test_ftp_trajectory_empty() -> None:
 
     # THEN returns None
     assert widget is None
+
+
+def test_ftp_trajectory_change_points() -> None:
+    """Tests that the daily FTP is compressed to the days on which it changed."""
+    # GIVEN 90 days of forward-filled FTP values with two changes and no FTP before day 10
+    dates = [date(2026, 1, 1) + timedelta(days=i) for i in range(90)]
+    ftp = [None] * 10 + [250.0] * 30 + [255.0] * 30 + [262.0] * 20
+    daily_df = pl.DataFrame({"date": dates, "ftp": ftp})
+
+    # WHEN calculating the trajectory
+    result = FTPTrajectoryProvider().calculate(daily_df)
+
+    # THEN only the first known FTP and the changes are kept
+    assert result is not None
+    assert result.dates == ["2026-01-11", "2026-02-10", "2026-03-12"]
+    assert result.ftp_values == [250.0, 255.0, 262.0]
+    assert result.span_days == 80
+
+
+@pytest.mark.asyncio
+async def test_ftp_trajectory_context() -> None:
+    """Tests that the LLM context lists the FTP changes."""
+    # GIVEN a trajectory with one change
+    result = FTPTrajectoryResult(dates=["2026-01-11", "2026-02-10"], ftp_values=[250.0, 255.0], span_days=80)
+
+    # WHEN providing the context
+    context = await FTPTrajectoryProvider().provide_context(result)
+
+    # THEN the span, the change and the total are included
+    assert context.startswith("FTP Trajectory (Last 80 days):")
+    assert "- Total Change: +5.0W (+2.0%)" in context
+    assert "- Changes: 2026-02-10: 255W" in context
@@ -0,0 +1,133 @@
+"""Tests for the provider instrumentation."""
+
+import time
+import tracemalloc
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.planning.providers.instrumentation import Phase, ProviderMetrics, ProviderProfiler, ProviderTiming
+from app.planning.providers.interfaces import MetricProvider
+from app.planning.providers.registry import MetricRegistry
+
+
+def test_profiler_measures_time() -> None:
+    """Test that each measured phase is recorded in the run and the metrics."""
+    # GIVEN a profiler without memory tracing
+    metrics = ProviderMetrics()
+    profiler = ProviderProfiler(metrics)
+
+    # WHEN measuring a phase
+    with profiler.measure("pmc", Phase.CALCULATE):
+        sum(range(1000))
+
+    # THEN its time is recorded without a peak allocation
+    [timing] = profiler.timings
+    assert timing.provider == "pmc"
+    assert timing.phase is Phase.CALCULATE
+    assert timing.wall_seconds >= 0
+    assert timing.cpu_seconds is not None
+    assert timing.cpu_seconds >= 0
+    assert timing.peak_bytes is None
+    # AND added to the metrics
+    assert 'intelliwatts_provider_wall_seconds_count{provider="pmc",phase="calculate"} 1' in metrics.to_prometheus()
+
+
+def test_profiler_traces_memory() -> None:
+    """Test that memory tracing records the peak allocation and stops tracing afterwards."""
+    # GIVEN a profiler with memory tracing
+    profiler = ProviderProfiler(trace_memory=True)
+
+    # WHEN measuring a phase allocating about 1 MB
+    with profiler.measure("pmc", Phase.WIDGET):
+        data = bytearray(1_000_000)
+        del data
+
+    # THEN the peak allocation is recorded
+    peak_bytes = profiler.timings[0].peak_bytes
+    assert peak_bytes is not None
+    assert peak_bytes >= 1_000_000
+    # AND tracemalloc is stopped again
+    assert not tracemalloc.is_tracing()
+
+
+def test_metrics_to_prometheus() -> None:
+    """Test that measurements are accumulated per provider and phase."""
+    # GIVEN metrics with two measurements of the same phase
+    metrics = ProviderMetrics()
+    metrics.record(ProviderTiming("pmc", Phase.CALCULATE, wall_seconds=1.0, cpu_seconds=0.5, peak_bytes=100))
+    metrics.record(ProviderTiming("pmc", Phase.CALCULATE, wall_seconds=2.0, cpu_seconds=0.5, peak_bytes=50))
+    metrics.record(ProviderTiming("wellness", Phase.CONTEXT, wall_seconds=0.1, cpu_seconds=None))
+
+    # WHEN exporting them
+    text = metrics.to_prometheus()
+
+    # THEN the sums, counts and maximum peaks are exported
+    assert 'intelliwatts_provider_wall_seconds_sum{provider="pmc",phase="calculate"} 3.0' in text
+    assert 'intelliwatts_provider_wall_seconds_count{provider="pmc",phase="calculate"} 2' in text
+    assert 'intelliwatts_provider_cpu_seconds_total{provider="pmc",phase="calculate"} 1.0' in text
+    assert 'intelliwatts_provider_peak_bytes{provider="pmc",phase="calculate"} 100' in text
+    # AND untraced phases have no peak, and phases without CPU time no CPU counter
+    assert 'intelliwatts_provider_peak_bytes{provider="wellness"' not in text
+    assert 'intelliwatts_provider_cpu_seconds_total{provider="wellness"' not in text
+
+
+@pytest.mark.asyncio
+async def test_registry_records_all_phases() -> None:
+    """Test that the registry measures calculate, widget and provide_context of every provider."""
+    # GIVEN a registry with a provider
+    registry = MetricRegistry()
+    provider = MagicMock(spec=MetricProvider)
+    provider.get_name.return_value = "p1"
+    provider.get_required_datasets.return_value = set()
+    provider.calculate.return_value = {"val": 1}
+    provider.get_dashboard_widget.return_value = None
+    provider.provide_context.return_value = "Context"
+    registry.register(provider)
+    profiler = ProviderProfiler(registry.metrics)
+
+    # WHEN running the analysis and collecting the context
+    results, _ = registry.process_analysis(MagicMock(), profiler=profiler)
+    await registry.get_combined_context(results)
+
+    # THEN the run's profile holds the analysis phases with their CPU time
+    assert [(t.provider, t.phase) for t in profiler.timings] == [("p1", Phase.CALCULATE), ("p1", Phase.WIDGET)]
+    assert all(t.cpu_seconds is not None for t in profiler.timings)
+    # AND the metrics include the context phase
+    text = registry.metrics.to_prometheus()
+    for phase in Phase:
+        assert f'wall_seconds_count{{provider="p1",phase="{phase}"}} 1' in text
+    # AND the context coroutine, which shares the event loop's thread, has no CPU time
+    assert 'cpu_seconds_total{provider="p1",phase="provide_context"}' not in text
+
+
+def test_traced_run_calculates_providers_serially() -> None:
+    """Test that a run tracing memory calculates one provider at a time, so their peaks do not overlap."""
+    # GIVEN a registry with independent providers recording how many of them calculate at the same time
+    registry = MetricRegistry()
+    running, overlaps = [], []
+
+    def calculate(*_: object, **__: object) -> dict[str, int]:
+        running.append(1)
+        overlaps.append(len(running))
+        time.sleep(0.01)
+        running.pop()
+        return {"val": 1}
+
+    for name in ("p1", "p2", "p3"):
+        provider = MagicMock(spec=MetricProvider)
+        provider.get_name.return_value = name
+        provider.get_required_datasets.return_value = set()
+        provider.get_dependencies.return_value = set()
+        provider.calculate.side_effect = calculate
+        provider.get_dashboard_widget.return_value = None
+        registry.register(provider)
+    profiler = ProviderProfiler(trace_memory=True)
+
+    # WHEN running a traced analysis
+    results, _ = registry.process_analysis(MagicMock(), profiler=profiler)
+
+    # THEN every provider was calculated on its own
+    assert overlaps == [1, 1, 1]
+    assert list(results) == ["p1", "p2", "p3"]
+    assert all(t.peak_bytes is not None for t in profiler.timings)
@@ -3,9 +3,14 @@
 import polars as pl
 import pytest
 
+from app.intervals.parser.activity import MAX_ZONES, ZONE_TIMES
 from app.planning.providers.intensity import IntensityProvider, IntensityResult
 
 
+def _padded(zones: list[int]) -> list[int]:
+    return zones + [0] * (MAX_ZONES - len(zones))
+
+
 def test_intensity_provider_name() -> None:
     """Tests that the provider name is correct."""
     # GIVEN: An IntensityProvider instance
@@ -20,16 +25,18 @@ def test_intensity_provider_name() -> None:
 
 def test_intensity_calculation() -> None:
     """Tests the intensity aggregation and style detection."""
-    # GIVEN: A daily_df with aggregated zone data (list of lists of ints)
+    # GIVEN: A daily_df with the daily zone times as zero-padded arrays
     # Day 1: 1 activity (2000s total)
     # Day 2: 1 activity (5000s total)
     # Combined: Z1=1800, Z2=4200, Z3=0, Z4=500, Z5=500 -> 7000s Total.
     daily_df = pl.DataFrame({
         "date": ["2026-04-01", "2026-04-02"],
-        "hr_zone_times": [[[600, 1400, 0, 0, 0, 0, 0]], [[1200, 2800, 0, 500, 500, 0, 0]]],
-        "power_zone_times": [[[600, 1400, 0, 0, 0, 0, 0, 0]], [[1200, 2800, 0, 500, 500, 0, 0, 0]]],
+        "hr_zone_times": [_padded([600, 1400, 0, 0, 0, 0, 0]), _padded([1200, 2800, 0, 500, 500, 0, 0])],
+        "hr_zone_count": [7, 7],
+        "power_zone_times": [_padded([600, 1400, 0, 0, 0, 0, 0, 0]), _padded([1200, 2800, 0, 500, 500, 0, 0, 0])],
+        "power_zone_count": [8, 8],
         "training_stress": [50.0, 100.0],
-    })
+    }).cast({"hr_zone_times": ZONE_TIMES, "power_zone_times": ZONE_TIMES})
 
     provider = IntensityProvider()
 
@@ -1,11 +1,14 @@
 """Tests for the PMC provider."""
 
 import math
-from datetime import date
+from datetime import date, timedelta
 
 import polars as pl
+import pytest
 
-from app.planning.providers.pmc import PMCProvider, PMCResult
+from app.intervals.pmc import impulse_response, load_column
+from app.planning.providers.interfaces import AnalysisContext, Dataset
+from app.planning.providers.pmc import PMCPoint, PMCProvider, PMCResult, advance_pmc
 
 
 def test_pmc_provider_calculate_empty() -> None:
@@ -72,3 +75,162 @@ def test_pmc_provider_get_dashboard_widget() -> None:
     # For widget data, it's serialized to dict/JSON
     assert isinstance(widget.data, dict)
     assert widget.data["ctl"] == [1.0]
+
+
+def test_advance_pmc_continues_from_state() -> None:
+    """Test that advancing in two steps yields the same values as in one step."""
+    # GIVEN: A start state and two weeks of training stress
+    start = PMCPoint(day=date(2024, 1, 1), ctl=40.0, atl=50.0)
+    stresses = [float(20 * (i % 4)) for i in range(14)]
+
+    # WHEN: Advancing in one and in two steps
+    at_once = advance_pmc(start, stresses)
+    first = advance_pmc(start, stresses[:5])
+    in_steps = first + advance_pmc(first[-1], stresses[5:])
+
+    # THEN: Both are identical and cover consecutive days
+    assert at_once == in_steps
+    assert [p.day for p in at_once] == [date(2024, 1, 2 + i) for i in range(14)]
+    # AND a day without stress decays the values
+    assert at_once[0].ctl < start.ctl
+
+
+def test_pmc_provider_uses_persisted_pmc() -> None:
+    """Test that the persisted PMC is aligned with the analyzed days."""
+    # GIVEN: Analyzed days partly before the first and after the last persisted day
+    provider = PMCProvider()
+    daily_df = pl.DataFrame({"date": [date(2024, 1, i) for i in range(1, 5)], "training_stress": [0.0, 10.0, 0.0, 0.0]})
+    persisted = pl.DataFrame({"date": [date(2024, 1, 2), date(2024, 1, 3)], "ctl": [50.0, 49.0], "atl": [60.0, 55.0]})
+    context = AnalysisContext(datasets={Dataset.PMC: persisted})
+
+    # WHEN: Calculating the PMC
+    result = provider.calculate(daily_df, context=context)
+
+    # THEN: The persisted values are used and carried forward
+    assert result.ctl == [0.0, 50.0, 49.0, 49.0]
+    assert result.atl == [0.0, 60.0, 55.0, 55.0]
+    assert result.tsb == [0.0, -10.0, -6.0, -6.0]
+
+
+def test_pmc_provider_custom_time_constants() -> None:
+    """Test that custom time constants are used instead of the persisted default PMC."""
+    # GIVEN: A provider with fitted time constants and a persisted default PMC
+    provider = PMCProvider(chronic_days=30, acute_days=5)
+    daily_df = pl.DataFrame({"date": [date(2024, 1, 1), date(2024, 1, 2)], "training_stress": [10.0, 20.0]})
+    persisted = pl.DataFrame({"date": [date(2024, 1, 1)], "ctl": [50.0], "atl": [60.0]})
+    context = AnalysisContext(datasets={Dataset.PMC: persisted})
+
+    # WHEN: Calculating the PMC
+    result = provider.calculate(daily_df, context=context)
+
+    # THEN: The values are computed with the custom constants
+    assert result.ctl[0] == 10.0
+    assert math.isclose(result.ctl[1], 10.0 + (20.0 - 10.0) * (1 - math.exp(-1 / 30)))
+    assert math.isclose(result.atl[1], 10.0 + (20.0 - 10.0) * (1 - math.exp(-1 / 5)))
+
+
+def test_pmc_provider_fits_time_constants() -> None:
+    """Test that a fitting provider reports the constants fitted to the FTP changes next to the persisted PMC."""
+    # GIVEN: An FTP following the model with 45/9 day constants, reported every ten days
+    days = 400
+    stress = pl.Series([0.0 if i % 7 == 6 else 50.0 + 5.0 * (i % 3) + 10.0 * ((i // 7) % 4) for i in range(days)])
+    loads = impulse_response(stress, (45, 9))
+    performance = 200.0 + 1.2 * loads[load_column(45)] - 0.8 * loads[load_column(9)]
+    daily_df = pl.DataFrame({
+        "date": pl.date_range(date(2024, 1, 1), date(2024, 1, 1) + timedelta(days=days - 1), eager=True),
+        "training_stress": stress,
+    }).with_columns(ftp=pl.when(pl.Series(range(days)) % 10 == 5).then(performance).forward_fill())
+
+    # AND a persisted PMC
+    persisted = pl.DataFrame({"date": daily_df["date"], "ctl": [50.0] * days, "atl": [60.0] * days})
+    context = AnalysisContext(datasets={Dataset.PMC: persisted})
+
+    # WHEN: Calculating the PMC with a fitting provider
+    result = PMCProvider(fit_time_constants=True).calculate(daily_df, context=context)
+
+    # THEN: The fitted constants are reported
+    assert (result.fitted_chronic_days, result.fitted_acute_days) == (45, 9)
+    # AND the chart keeps the persisted values of the default constants
+    assert (result.chronic_days, result.acute_days) == (42, 7)
+    assert result.ctl == [50.0] * days
+
+
+@pytest.mark.asyncio
+async def test_pmc_provider_context_with_fitted_constants() -> None:
+    """Test that fitted time constants are mentioned in the context."""
+    # GIVEN: A result with fitted constants
+    result = PMCResult(
+        dates=["2024-01-01"], ctl=[50.0], atl=[40.0], tsb=[10.0], fitted_chronic_days=45, fitted_acute_days=9
+    )
+
+    # WHEN: Generating the context
+    context = await PMCProvider().provide_context(result)
+
+    # THEN: The fitted constants are mentioned next to the ones of the values
+    assert "fitted to the athlete's FTP changes: 45 days (CTL), 9 days (ATL), the values above use 42/7 days" in context
+    assert "- Time constants: " not in context
+
+
+def test_pmc_provider_without_plausible_fit() -> None:
+    """Test that a fitting provider keeps the default constants without enough FTP changes."""
+    # GIVEN: Days with a constant FTP
+    daily_df = pl.DataFrame({
+        "date": [date(2024, 1, i) for i in range(1, 11)],
+        "training_stress": [50.0] * 10,
+        "ftp": [250.0] * 10,
+    })
+
+    # WHEN: Calculating the PMC with a fitting provider
+    result = PMCProvider(fit_time_constants=True).calculate(daily_df)
+
+    # THEN: No constants are reported
+    assert result.fitted_chronic_days is None
+    assert result.fitted_acute_days is None
+
+
+def test_pmc_provider_projects_planned_stress() -> None:
+    """Test that planned training stress extends the PMC beyond the analyzed days."""
+    # GIVEN: A persisted PMC and workouts planned on an analyzed day, the day after next and a later day
+    provider = PMCProvider()
+    daily_df = pl.DataFrame({"date": [date(2024, 1, 1), date(2024, 1, 2)], "training_stress": [0.0, 0.0]})
+    persisted = pl.DataFrame({"date": [date(2024, 1, 2)], "ctl": [50.0], "atl": [60.0]})
+    planned = pl.DataFrame({
+        "date": [date(2024, 1, 2), date(2024, 1, 4), date(2024, 1, 5)],
+        "training_stress": [500.0, 100.0, 80.0],
+    })
+    context = AnalysisContext(datasets={Dataset.PMC: persisted, Dataset.PLANNED_STRESS: planned})
+
+    # WHEN: Calculating the PMC
+    result = provider.calculate(daily_df, context=context)
+
+    # THEN: The projection continues from the last analyzed day with rest days in between
+    assert result.projected_dates == ["2024-01-03", "2024-01-04", "2024-01-05"]
+    expected = advance_pmc(PMCPoint(day=date(2024, 1, 2), ctl=50.0, atl=60.0), [0.0, 100.0, 80.0])
+    assert all(math.isclose(a, p.ctl) for a, p in zip(result.projected_ctl, expected, strict=True))
+    assert all(math.isclose(a, p.atl) for a, p in zip(result.projected_atl, expected, strict=True))
+    assert all(math.isclose(t, p.ctl - p.atl) for t, p in zip(result.projected_tsb, expected, strict=True))
+    # AND the analyzed days are unchanged
+    assert result.ctl == [0.0, 50.0]
+
+
+@pytest.mark.asyncio
+async def test_pmc_provider_context_with_projection() -> None:
+    """Test that the LLM context includes the projected values."""
+    # GIVEN: A result with a projection
+    result = PMCResult(
+        dates=["2024-01-01"],
+        ctl=[50.0],
+        atl=[60.0],
+        tsb=[-10.0],
+        projected_dates=["2024-01-02", "2024-01-03"],
+        projected_ctl=[51.0, 52.0],
+        projected_atl=[65.0, 70.0],
+        projected_tsb=[-14.0, -18.0],
+    )
+
+    # WHEN: Providing the context
+    context = await PMCProvider().provide_context(result)
+
+    # THEN: The last projected values are included
+    assert "Projected Fitness after the planned workouts (2024-01-03)" in context
+    assert "- Form (TSB): -18.0" in context
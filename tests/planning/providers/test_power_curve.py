@@ -6,6 +6,8 @@ import polars as pl
 import pytest
 
 from app.intervals.client import IntervalsClient
+from app.intervals.parser.power_curve import ParsedPowerCurve
+from app.planning.providers.interfaces import AnalysisContext, Dataset
 from app.planning.providers.power_curve import PowerCurveProvider, PowerCurveResult
 
 
@@ -40,7 +42,44 @@ def test_power_curve_provider_no_data() -> None:
     provider = PowerCurveProvider()
 
     # WHEN: Calculating power curve result with no data.
-    result = provider.calculate(daily_df, client=client)
+    result = provider.calculate(daily_df, context=AnalysisContext(client=client))
 
     # THEN: Result should be None.
     assert result is None
+
+
+def test_power_curve_provider_uses_prefetched_curves() -> None:
+    """Test that PowerCurveProvider reuses curves already present in the context."""
+    # GIVEN: A context carrying an already parsed power curve.
+    client = MagicMock(spec=IntervalsClient)
+    curve = ParsedPowerCurve(id="90d", secs=[1200], watts=[280])
+    context = AnalysisContext(client=client, datasets={Dataset.POWER_CURVES: [curve]})
+
+    provider = PowerCurveProvider()
+
+    # WHEN: Calculating the power curve result.
+    result = provider.calculate(pl.DataFrame([]), context=context)
+
+    # THEN: The peaks are read from the context without another API call.
+    assert result is not None
+    assert result.peak_20m == 280
+    client.power_curves.assert_not_called()
+
+
+def test_power_curve_provider_interpolates_missing_peaks() -> None:
+    """Test that peaks missing from the payload are interpolated from the neighbouring durations."""
+    # GIVEN: A curve without the 15s and 5m durations
+    curve = ParsedPowerCurve(id="90d", secs=[1, 30, 240, 360, 1200, 3600], watts=[900, 600, 400, 350, 300, 250])
+    context = AnalysisContext(datasets={Dataset.POWER_CURVES: [curve]})
+
+    # WHEN: Calculating the power curve result
+    result = PowerCurveProvider().calculate(pl.DataFrame([]), context=context)
+
+    # THEN: The missing peaks lie between their neighbours and the known ones are exact
+    assert result is not None
+    assert result.peak_15s is not None
+    assert result.peak_5m is not None
+    assert 600 < result.peak_15s < 900
+    assert 350 < result.peak_5m < 400
+    assert (result.peak_1s, result.peak_20m, result.peak_60m) == (900, 300, 250)
+    assert result.peak_1m is not None
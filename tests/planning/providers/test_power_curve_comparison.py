@@ -0,0 +1,100 @@
+"""Tests for the power curve comparison provider."""
+
+import polars as pl
+import pytest
+
+from app.intervals.parser.power_curve import ParsedPowerCurve
+from app.planning.providers.interfaces import AnalysisContext, Dataset
+from app.planning.providers.power_curve_comparison import (
+    COMPARISON_SECS,
+    PowerCurveComparisonProvider,
+    compare_curves,
+    format_duration,
+)
+
+SECS = [1, 5, 60, 300, 1200, 3600]
+
+
+def _curve(window: str, watts: list[int]) -> ParsedPowerCurve:
+    return ParsedPowerCurve(id=window, secs=SECS, watts=watts)
+
+
+def _curves() -> list[ParsedPowerCurve]:
+    return [
+        # Sprint and 5m fresh, the hour fading
+        _curve("42d", [1000, 900, 500, 350, 300, 230]),
+        _curve("90d", [1000, 905, 520, 352, 305, 260]),
+        _curve("all", [1100, 950, 550, 380, 320, 270]),
+    ]
+
+
+def test_compare_curves() -> None:
+    """Test that the windows are aligned on the shared durations and compared with the recent window."""
+    # GIVEN: Curves of three windows
+    # WHEN: Comparing them
+    result = compare_curves(tuple(_curves()))
+
+    # THEN: All windows are aligned on the comparison durations
+    assert result is not None
+    assert result.secs == list(COMPARISON_SECS)
+    assert list(result.watts) == ["42d", "90d", "all"]
+    assert all(len(watts) == len(COMPARISON_SECS) for watts in result.watts.values())
+    # AND durations beyond the curves are unknown
+    assert result.watts["42d"][COMPARISON_SECS.index(7200)] is None
+    assert result.deltas["90d"][COMPARISON_SECS.index(7200)] is None
+    # AND the deltas are relative to each longer window
+    assert result.deltas["all"][0] == pytest.approx((1000 / 1100 - 1) * 100)
+    assert set(result.deltas) == {"90d", "all"}
+    # AND durations are improving or fading relative to the 90 day window
+    assert {1, 300} <= set(result.improving)
+    assert 3600 in result.fading
+    assert not set(result.improving) & set(result.fading)
+
+
+def test_compare_curves_is_cached() -> None:
+    """Test that equal curves of another fetch reuse the cached comparison."""
+    # GIVEN: A comparison of fetched curves
+    compare_curves.cache_clear()
+    first = compare_curves(tuple(_curves()))
+
+    # WHEN: Comparing equal curves of another fetch
+    second = compare_curves(tuple(_curves()))
+
+    # THEN: The cached comparison is returned
+    assert second is first
+    assert compare_curves.cache_info().hits == 1
+
+
+def test_compare_curves_needs_two_windows() -> None:
+    """Test that nothing is compared without the recent window and a longer one."""
+    assert compare_curves((_curve("42d", [1, 1, 1, 1, 1, 1]),)) is None
+    assert compare_curves((_curve("90d", [1, 1, 1, 1, 1, 1]), _curve("all", [1, 1, 1, 1, 1, 1]))) is None
+
+
+@pytest.mark.asyncio
+async def test_power_curve_comparison_provider() -> None:
+    """Test the provider's result, context and widget."""
+    # GIVEN: A context holding the curves of all windows
+    provider = PowerCurveComparisonProvider()
+    context = AnalysisContext(datasets={Dataset.POWER_CURVES: _curves()})
+
+    # WHEN: Running the provider
+    result = provider.calculate(pl.DataFrame([]), context=context)
+    assert result is not None
+    text = await provider.provide_context(result)
+    widget = provider.get_dashboard_widget(result)
+
+    # THEN: The context lists the deltas and the improving and fading durations
+    assert "- 1h: -12% vs 90d, -15% vs all" in text
+    assert "- Fading: " in text
+    assert "1h" in text.rsplit("- Fading: ", 1)[1]
+    # AND the widget holds the aligned curves with duration labels
+    assert widget is not None
+    assert widget.data is not None
+    assert widget.data["labels"][:3] == ["1s", "5s", "15s"]
+    assert widget.data["watts"] is result.watts
+
+
+def test_format_duration() -> None:
+    """Test the duration labels of the comparison grid."""
+    assert [format_duration(s) for s in (1, 30, 60, 1200, 7200)] == ["1s", "30s", "1m", "20m", "2h"]
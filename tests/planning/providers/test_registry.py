@@ -1,11 +1,18 @@
 """Tests for the metric registry."""
 
-from unittest.mock import ANY, AsyncMock, MagicMock
+import asyncio
+import threading
+from datetime import date
+from graphlib import CycleError
+from unittest.mock import ANY, AsyncMock, MagicMock, patch
 
+import polars as pl
 import pytest
 
-from app.planning.providers.interfaces import MetricProvider
+from app.planning.providers.aggregation import evaluate_aggregations, windowed
+from app.planning.providers.interfaces import AnalysisContext, Dataset, MetricProvider
 from app.planning.providers.registry import MetricRegistry
+from app.planning.providers.registry import registry as global_registry
 
 
 def test_metric_registry_registration() -> None:
@@ -42,7 +49,7 @@ def test_metric_registry_process_analysis() -> None:
     registry.register(provider2)
 
     # WHEN: Running the analysis.
-    results, widgets = registry.process_analysis(daily_df, client=None)
+    results, widgets = registry.process_analysis(daily_df)
 
     # THEN: The results and widgets should be collected correctly.
     assert results == {"p1": {"val": 1}, "p2": {"val": 2}}
@@ -50,18 +57,197 @@ def test_metric_registry_process_analysis() -> None:
     # provider_results is passed and accumulates
     provider1.calculate.assert_called_once_with(
         daily_df,
-        client=None,
+        context=ANY,
         provider_results=ANY,
         display_days=None,
     )
     provider2.calculate.assert_called_once_with(
         daily_df,
-        client=None,
+        context=ANY,
         provider_results=ANY,
         display_days=None,
     )
 
 
+def test_metric_registry_process_analysis_fetches_datasets_once() -> None:
+    """Tests that datasets required by several providers are fetched once and shared."""
+    # GIVEN: A registry with two providers requiring the power curves.
+    registry = MetricRegistry()
+    client = MagicMock()
+    client.power_curves.return_value = {"list": [{"id": "90d", "secs": [60], "watts": [300]}]}
+    context = AnalysisContext(client=client)
+
+    for name in ("p1", "p2"):
+        provider = MagicMock(spec=MetricProvider)
+        provider.get_name.return_value = name
+        provider.get_required_datasets.return_value = {Dataset.POWER_CURVES}
+        provider.calculate.side_effect = lambda _df, context, **_: context.get(Dataset.POWER_CURVES)
+        provider.get_dashboard_widget.return_value = None
+        registry.register(provider)
+
+    # WHEN: Running the analysis.
+    results, _ = registry.process_analysis(MagicMock(), context=context)
+
+    # THEN: The power curves are fetched a single time and shared by both providers.
+    client.power_curves.assert_called_once_with(curves="42d,90d,s0,all")
+    assert results["p1"] is results["p2"]
+    assert results["p1"][0].id == "90d"
+
+
+def test_metric_registry_process_analysis_fuses_aggregations() -> None:
+    """Tests that the aggregations of all providers are evaluated in one query and shared through the context."""
+    # GIVEN: Two providers aggregating the daily frame.
+    registry = MetricRegistry()
+    daily_df = pl.DataFrame({"date": [date(2026, 4, 1), date(2026, 4, 2)], "training_stress": [10.0, 20.0]})
+    context = AnalysisContext()
+    providers = []
+
+    for name, expr in (("p1", pl.col("training_stress").sum()), ("p2", windowed(pl.col("training_stress"), 1).sum())):
+        provider = MagicMock(spec=MetricProvider)
+        providers.append(provider)
+        provider.get_name.return_value = name
+        provider.get_required_datasets.return_value = set()
+        provider.get_aggregations.return_value = {"total": expr}
+        provider.calculate.side_effect = lambda _df, context, _name=name, **_: context.aggregates[_name]["total"]
+        provider.get_dashboard_widget.return_value = None
+        registry.register(provider)
+
+    # WHEN: Running the analysis with a spy on the frame's single query.
+    with patch("app.planning.providers.registry.evaluate_aggregations", wraps=evaluate_aggregations) as evaluate:
+        results, _ = registry.process_analysis(daily_df, context=context, display_days=1)
+
+    # THEN: Both providers read their values from the one fused query.
+    evaluate.assert_called_once()
+    assert results == {"p1": 30.0, "p2": 20.0}
+    for provider in providers:
+        provider.get_aggregations.assert_called_once_with(daily_df.collect_schema(), 1)
+
+
+def test_metric_registry_process_analysis_collects_lazy_frame() -> None:
+    """Tests that the query of the daily frame is collected once and passed to the providers as a DataFrame."""
+    # GIVEN: A provider aggregating the daily frame and the query of that frame.
+    registry = MetricRegistry()
+    daily_df = pl.DataFrame({"date": [date(2026, 4, 1), date(2026, 4, 2)], "training_stress": [10.0, 20.0]})
+    provider = _provider("p1")
+    provider.get_aggregations.return_value = {"total": pl.col("training_stress").sum()}
+    provider.calculate.side_effect = lambda df, context, **_: (df, context.aggregates["p1"]["total"])
+    registry.register(provider)
+
+    # WHEN: Running the analysis on the query.
+    results, _ = registry.process_analysis(daily_df.lazy())
+
+    # THEN: The provider receives the collected frame and the value of its aggregation.
+    frame, total = results["p1"]
+    assert frame.equals(daily_df)
+    assert total == 30.0
+
+
+def _provider(name: str, dependencies: set[str] | None = None) -> MagicMock:
+    provider = MagicMock(spec=MetricProvider)
+    provider.get_name.return_value = name
+    provider.get_required_datasets.return_value = set()
+    provider.get_dependencies.return_value = dependencies or set()
+    provider.get_dashboard_widget.return_value = None
+    return provider
+
+
+def test_metric_registry_runs_dependencies_first() -> None:
+    """Tests that providers receive the results of the providers they depend on."""
+    # GIVEN: A provider depending on one registered after it.
+    registry = MetricRegistry()
+    dependent = _provider("dependent", {"base"})
+    dependent.calculate.side_effect = lambda _df, provider_results, **_: provider_results["base"] + 1
+    base = _provider("base")
+    base.calculate.return_value = 1
+    registry.register(dependent)
+    registry.register(base)
+
+    # WHEN: Running the analysis.
+    results, _ = registry.process_analysis(MagicMock())
+
+    # THEN: The dependency ran first and only its result was passed on.
+    assert results == {"dependent": 2, "base": 1}
+    assert dependent.calculate.call_args.kwargs["provider_results"] == {"base": 1}
+    assert base.calculate.call_args.kwargs["provider_results"] == {}
+
+
+def test_metric_registry_runs_independent_providers_concurrently() -> None:
+    """Tests that independent providers are calculated at the same time."""
+    # GIVEN: Two independent providers that can only finish if they run concurrently.
+    registry = MetricRegistry(max_workers=2)
+    barrier = threading.Barrier(2, timeout=5)
+    for name in ("p1", "p2"):
+        provider = _provider(name)
+        provider.calculate.side_effect = lambda *_, **__: barrier.wait()
+        registry.register(provider)
+
+    # WHEN: Running the analysis.
+    results, _ = registry.process_analysis(MagicMock())
+
+    # THEN: Both providers passed the barrier together.
+    assert sorted(results.values()) == [0, 1]
+
+
+def test_metric_registry_rejects_invalid_dependencies() -> None:
+    """Tests that unknown and cyclic dependencies are rejected."""
+    # GIVEN: A provider depending on an unregistered provider.
+    registry = MetricRegistry()
+    registry.register(_provider("p1", {"missing"}))
+
+    # WHEN: Running the analysis.
+    # THEN: The dependency is reported.
+    with pytest.raises(ValueError, match="missing"):
+        registry.process_analysis(MagicMock())
+
+    # GIVEN: Two providers depending on each other.
+    registry = MetricRegistry()
+    registry.register(_provider("p1", {"p2"}))
+    registry.register(_provider("p2", {"p1"}))
+
+    # WHEN: Running the analysis.
+    # THEN: The cycle is reported.
+    with pytest.raises(CycleError):
+        registry.process_analysis(MagicMock())
+
+
+def test_metric_registry_resolves_requested_providers() -> None:
+    """Tests that only the requested providers and their dependencies run, optionally without widgets."""
+    # GIVEN: A chain of providers and an unrelated one.
+    registry = MetricRegistry()
+    providers = {
+        "base": _provider("base"),
+        "middle": _provider("middle", {"base"}),
+        "top": _provider("top", {"middle"}),
+        "other": _provider("other"),
+    }
+    for provider in providers.values():
+        registry.register(provider)
+
+    # WHEN: Requesting the top provider without widgets.
+    results, widgets = registry.process_analysis(MagicMock(), providers={"top"}, widgets=False)
+
+    # THEN: The chain ran, the unrelated provider and all widgets were skipped.
+    assert list(results) == ["base", "middle", "top"]
+    assert widgets == []
+    providers["other"].calculate.assert_not_called()
+    for provider in providers.values():
+        provider.get_dashboard_widget.assert_not_called()
+
+    # AND: Unknown providers are rejected.
+    with pytest.raises(ValueError, match="unknown"):
+        registry.resolve({"unknown"})
+
+
+def test_global_registry_dependency_graph() -> None:
+    """Tests that only the activity provider waits for another provider."""
+    # GIVEN: The global registry.
+    # WHEN: Building its dependency graph.
+    graph = global_registry.dependency_graph()
+
+    # THEN: All providers except the activity provider are independent.
+    assert {name: deps for name, deps in graph.items() if deps} == {"activity": {"pmc"}}
+
+
 @pytest.mark.asyncio
 async def test_metric_registry_combined_context() -> None:
     """Tests that the registry correctly combines context from multiple providers."""
@@ -97,3 +283,65 @@ async def test_metric_registry_combined_context() -> None:
     provider1.provide_context.assert_called_once_with({"data": 1})
     provider2.provide_context.assert_called_once_with({"data": 2})
     provider3.provide_context.assert_called_once_with({"data": 3})
+
+
+@pytest.mark.asyncio
+async def test_metric_registry_combined_context_is_concurrent_and_ordered() -> None:
+    """Tests that contexts are generated concurrently but combined in registration order."""
+    # GIVEN: Two providers where the first one finishes last.
+    registry = MetricRegistry()
+    running = []
+    peak = []
+
+    def provider(name: str, delay: float) -> MagicMock:
+        async def provide_context(_result: object) -> str:
+            running.append(name)
+            peak.append(len(running))
+            await asyncio.sleep(delay)
+            running.remove(name)
+            return f"Context {name}"
+
+        mock = _provider(name)
+        mock.provide_context = provide_context
+        return mock
+
+    registry.register(provider("slow", 0.02))
+    registry.register(provider("fast", 0.0))
+
+    # WHEN: Requesting the combined context.
+    combined_context = await registry.get_combined_context({"slow": 1, "fast": 2})
+
+    # THEN: Both ran at the same time and the output keeps the registration order.
+    assert max(peak) == 2
+    assert combined_context == "Context slow\n\nContext fast"
+
+    # WHEN: Limiting the concurrency.
+    peak.clear()
+    await registry.get_combined_context({"slow": 1, "fast": 2}, max_concurrency=1)
+
+    # THEN: The providers ran one after another.
+    assert max(peak) == 1
+
+
+@pytest.mark.asyncio
+async def test_metric_registry_combined_context_timeout() -> None:
+    """Tests that a provider exceeding the timeout is replaced by the fallback."""
+    # GIVEN: A provider that never answers and a fast one.
+    registry = MetricRegistry()
+    hanging = _provider("hanging")
+
+    async def never_answers(_result: object) -> str:
+        await asyncio.sleep(10)
+        return "Context hanging"
+
+    hanging.provide_context = never_answers
+    fast = _provider("fast")
+    fast.provide_context = AsyncMock(return_value="Context fast")
+    registry.register(hanging)
+    registry.register(fast)
+
+    # WHEN: Requesting the combined context with a short timeout.
+    combined_context = await registry.get_combined_context({"hanging": 1, "fast": 2}, timeout_seconds=0.01)
+
+    # THEN: The hanging provider is replaced by the fallback.
+    assert combined_context == "hanging: context unavailable (timed out).\n\nContext fast"
@@ -0,0 +1,134 @@
+"""Tests for the time-in-zone provider."""
+
+from datetime import date, timedelta
+
+import polars as pl
+import pytest
+
+from app.intervals.parser.activity import MAX_ZONES, ZONE_TIMES
+from app.planning.providers.time_in_zone import TimeInZoneProvider, TimeInZoneResult
+
+
+def _daily(days: int) -> pl.DataFrame:
+    """Builds a daily frame alternating easy and hard days, the power zones include Sweet Spot.
+
+    Returns:
+        The daily frame.
+    """
+    easy_hr, hard_hr = [3000, 600, 0, 0, 0], [600, 600, 600, 1200, 600]
+    easy_power, hard_power = [2400, 1200, 0, 0, 0, 0, 0, 0], [1200, 600, 0, 600, 1200, 600, 0, 900]
+    return pl.DataFrame({
+        "date": [date(2026, 4, 1) + timedelta(days=i) for i in range(days)],
+        "hr_zone_times": [_padded(hard_hr if i % 2 else easy_hr) for i in range(days)],
+        "hr_zone_count": [5] * days,
+        "power_zone_times": [_padded(hard_power if i % 2 else easy_power) for i in range(days)],
+        "power_zone_count": [8] * days,
+    }).cast({"hr_zone_times": ZONE_TIMES, "power_zone_times": ZONE_TIMES, "hr_zone_count": pl.UInt8})
+
+
+def _padded(zones: list[int]) -> list[int]:
+    return zones + [0] * (MAX_ZONES - len(zones))
+
+
+def test_time_in_zone_provider_name() -> None:
+    """Tests that the provider name is correct."""
+    # GIVEN a TimeInZoneProvider instance
+    provider = TimeInZoneProvider()
+
+    # WHEN getting the provider name
+    # THEN it is "time_in_zone"
+    assert provider.get_name() == "time_in_zone"
+
+
+def test_time_in_zone_calculation() -> None:
+    """Tests that the rolling distributions cover the display window and leave out Sweet Spot."""
+    # GIVEN 30 days of alternating easy and hard days
+    provider = TimeInZoneProvider()
+
+    # WHEN calculating the distributions of the last 14 days
+    result = provider.calculate(_daily(30), display_days=14)
+
+    # THEN every window holds one series per zone over the display window
+    assert result is not None
+    assert len(result.dates) == 14
+    assert result.dates[-1] == "2026-04-30"
+    assert {window: len(zones) for window, zones in result.shares["power_zone_times"].items()} == {
+        "1d": 7,
+        "7d": 7,
+        "28d": 7,
+    }
+    assert len(result.shares["hr_zone_times"]["7d"]) == 5
+    # AND the daily shares of the last (hard) day exclude Sweet Spot from the total
+    assert [zone[-1] for zone in result.shares["power_zone_times"]["1d"]] == [28.6, 14.3, 0.0, 14.3, 28.6, 14.3, 0.0]
+    # AND the rolling shares add up to 100%
+    latest = [share for zone in result.shares["power_zone_times"]["28d"] if (share := zone[-1]) is not None]
+    assert sum(latest) == pytest.approx(100, abs=0.5)
+    assert len(result.polarization_index["28d"]) == 14
+
+
+def test_time_in_zone_without_zones() -> None:
+    """Tests that there is no result without zone times."""
+    # GIVEN a daily frame without zone columns
+    daily_df = pl.DataFrame({"date": [date(2026, 4, 1)], "training_stress": [0.0]})
+
+    # WHEN calculating
+    # THEN there is no result and no widget
+    provider = TimeInZoneProvider()
+    assert provider.calculate(daily_df) is None
+    assert provider.get_dashboard_widget(None) is None
+
+
+@pytest.mark.asyncio
+async def test_time_in_zone_context() -> None:
+    """Tests that the context summarizes the latest bands and samples the polarization index."""
+    # GIVEN the distributions of 30 days
+    provider = TimeInZoneProvider()
+    result = provider.calculate(_daily(30))
+    assert result is not None
+
+    # WHEN generating the context
+    context = await provider.provide_context(result)
+
+    # THEN it holds one line per zone column and context window, and a weekly polarization trend
+    assert "- Power 7d:" in context
+    assert "- Heart Rate 28d:" in context
+    trend = context.splitlines()[-1]
+    assert trend.startswith("- Polarization Index (28d, every 7 days): ")
+    assert len(trend.split(": ")[1].split(" (")[0].split(", ")) == 5
+    # AND not the daily series
+    assert len(context.splitlines()) == 6
+
+
+@pytest.mark.asyncio
+async def test_time_in_zone_context_without_data() -> None:
+    """Tests the context without zone times."""
+    # GIVEN no result
+    provider = TimeInZoneProvider()
+
+    # WHEN generating the context
+    # THEN it states that there is no data
+    assert await provider.provide_context(None) == "No time-in-zone data available."
+
+
+def test_time_in_zone_widget() -> None:
+    """Tests the stacked-area widget data."""
+    # GIVEN a result with power zones only
+    result = TimeInZoneResult(
+        dates=["2026-04-01"],
+        shares={"power_zone_times": {"7d": [[80.0], [20.0]]}},
+        polarization_index={"7d": [1.5]},
+    )
+
+    # WHEN building the widget
+    widget = TimeInZoneProvider().get_dashboard_widget(result)
+
+    # THEN it renders the time-in-zone chart with the power shares
+    assert widget is not None
+    assert widget.custom_template == "widgets/time_in_zone_chart.html"
+    assert widget.data == {
+        "labels": ["2026-04-01"],
+        "hr": {},
+        "power": {"7d": [[80.0], [20.0]]},
+        "polarization": {"7d": [1.5]},
+        "default_window": "7d",
+    }
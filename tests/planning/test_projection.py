@@ -0,0 +1,96 @@
+"""Tests the projection of planned workouts."""
+
+import uuid
+from datetime import date
+
+import pytest
+
+from app.models.plan import TrainingPlan
+from app.planning.projection import planned_stress
+
+MONDAY = date(2026, 3, 2)
+
+
+def _plan(week_start: date, workouts: list[dict]) -> TrainingPlan:
+    return TrainingPlan(phase_id=uuid.uuid4(), week_start=week_start, raw_content="", workout_data=workouts)
+
+
+def _workout(day: str, *segments: tuple[int, list[tuple[object, object]]]) -> dict:
+    return {
+        "day": day,
+        "workout_name": "Workout",
+        "description": "",
+        "segments": [
+            {
+                "title": "Set",
+                "repeats": repeats,
+                "steps": [{"duration_m": d, "power_pct": p} for d, p in steps],
+            }
+            for repeats, steps in segments
+        ],
+    }
+
+
+def test_planned_stress() -> None:
+    """Test that steady, ranged, ramped and repeated steps are converted into daily TSS."""
+    # GIVEN plans of two weeks with steady, ranged, ramped and repeated steps
+    plans = [
+        _plan(
+            MONDAY,
+            [
+                # One hour at FTP is 100 TSS
+                _workout("Monday", (1, [(60, "100")])),
+                # The midpoint of 50-70% and 4x 15 minutes at 100%
+                _workout("wednesday ", (1, [(60, "50-70")]), (4, [(15, "100%")])),
+                # A ramp from 50% to 100%
+                _workout("Friday", (1, [("30", "Ramp 50-100")])),
+            ],
+        ),
+        _plan(MONDAY.replace(day=9), [_workout("Sunday", (1, [(120, "65")]))]),
+    ]
+
+    # WHEN estimating the planned stress
+    planned = planned_stress(plans)
+
+    # THEN every planned day has its TSS
+    assert planned["date"].to_list() == [
+        date(2026, 3, 2),
+        date(2026, 3, 4),
+        date(2026, 3, 6),
+        date(2026, 3, 15),
+    ]
+    assert planned["training_stress"].to_list() == pytest.approx([
+        100.0,
+        0.6**2 * 100 + 100.0,
+        0.5 * (0.25 + 0.5 + 1.0) / 3 * 100,
+        2 * 0.65**2 * 100,
+    ])
+
+
+def test_planned_stress_skips_invalid_steps() -> None:
+    """Test that steps without a known day, duration or power are skipped."""
+    # GIVEN workouts with an unknown day and unparsable steps next to a valid one
+    plans = [
+        _plan(
+            MONDAY,
+            [
+                _workout("Someday", (1, [(60, "100")])),
+                _workout("Tuesday", (1, [("long", "100"), (60, "hard"), (30, "100")])),
+                {"day": "Thursday", "workout_name": "Rest"},
+            ],
+        )
+    ]
+
+    # WHEN estimating the planned stress
+    planned = planned_stress(plans)
+
+    # THEN only the valid step counts
+    assert planned.rows() == [(date(2026, 3, 3), 50.0)]
+
+
+def test_planned_stress_without_plans() -> None:
+    """Test that no plans yield an empty frame with the expected schema."""
+    planned = planned_stress([])
+
+    assert planned.is_empty()
+    assert planned.columns == ["date", "training_stress"]
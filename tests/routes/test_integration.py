@@ -8,12 +8,14 @@ from fastapi.testclient import TestClient
 from sqlmodel import Session, delete
 
 from app.db import engine
-from app.intervals.parser.activity import ParsedActivity
-from app.intervals.parser.power_curve import ParsedPowerCurve, PowerCurvePoint
+from app.intervals.parser.activity import ParsedActivity, ParsedActivityFrame, activities_to_frame
+from app.intervals.parser.power_curve import ParsedPowerCurve
 from app.intervals.parser.wellness import ParsedWellness
 from app.main import app
 from app.models.user import User
 from app.planning.llm import LLMResponse
+from app.planning.providers.instrumentation import PROFILE_HEADER
+from app.services.analysis_cache import get_analysis_cache
 
 if TYPE_CHECKING:
     from collections.abc import Generator
@@ -21,10 +23,11 @@ if TYPE_CHECKING:
 
 @pytest.fixture(autouse=True)
 def clear_db() -> None:
-    """Clears the database before each test."""
+    """Clears the database and the analysis cache before each test."""
     with Session(engine) as session:
         session.exec(delete(User))
         session.commit()
+    get_analysis_cache().clear()
 
 
 @pytest.fixture
@@ -84,7 +87,8 @@ def mock_power_curves() -> list[ParsedPowerCurve]:
     return [
         ParsedPowerCurve(
             id="test",
-            points=[PowerCurvePoint(secs=60, watts=300)],
+            secs=[60],
+            watts=[300],
         )
     ]
 
@@ -126,17 +130,17 @@ def test_authentication_flow(client: TestClient) -> None:
     assert "access_token" in client.cookies
 
 
-@patch("app.routes.web.IntervalsClient")
-@patch("app.routes.web.parse_activities")
-@patch("app.routes.web.parse_wellness_list")
-@patch("app.routes.web.parse_power_curves")
-@patch("app.routes.web.compute_analysis")
+@patch("app.intervals.pool.IntervalsClient")
+@patch("app.services.analysis_cache.parse_activities_frame")
+@patch("app.services.analysis_cache.parse_wellness_list")
+@patch("app.services.analysis_cache.parse_power_curves")
+@patch("app.services.analysis_cache.compute_analysis")
 def test_dashboard_flow(  # noqa: PLR0913, PLR0917
     mock_compute: MagicMock,
     mock_parse_pc: MagicMock,
     mock_parse_w: MagicMock,
     mock_parse_a: MagicMock,
-    mock_client_class: MagicMock,  # noqa: ARG001
+    mock_client_class: MagicMock,
     client: TestClient,
     mock_activities: list[ParsedActivity],
     mock_wellness: list[ParsedWellness],
@@ -148,20 +152,24 @@ def test_dashboard_flow(  # noqa: PLR0913, PLR0917
         mock_compute: Mock for compute_analysis.
         mock_parse_pc: Mock for parse_power_curves.
         mock_parse_w: Mock for parse_wellness_list.
-        mock_parse_a: Mock for parse_activities.
+        mock_parse_a: Mock for parse_activities_frame.
         mock_client_class: Mock for IntervalsClient class.
         client: The test client.
         mock_activities: Mocked activities.
         mock_wellness: Mocked wellness data.
         mock_power_curves: Mocked power curves.
     """
-    # GIVEN an authenticated user
+    # GIVEN an authenticated user with stored secrets
     email = "dashboard_journey@example.com"
     password = "password123"  # noqa: S105
     client.post("/register", data={"email": email, "password": password})
     client.post("/login", data={"email": email, "password": password})
+    client.post("/api/secrets", json={"athlete_id": "dashboard_athlete", "intervals_api_key": "abc"})
 
-    mock_parse_a.return_value = mock_activities
+    mock_client_class.return_value.athlete_id = "dashboard_athlete"
+    mock_client_class.return_value.activities.return_value = []
+    mock_client_class.return_value.wellness.return_value = []
+    mock_parse_a.return_value = ParsedActivityFrame(df=activities_to_frame(mock_activities))
     mock_parse_w.return_value = mock_wellness
     mock_parse_pc.return_value = mock_power_curves
 
@@ -224,12 +232,30 @@ def test_dashboard_flow(  # noqa: PLR0913, PLR0917
     assert "100 TSS" in resp.text
     assert "Training Intensity" in resp.text
     assert "Highly Polarized" in resp.text
+    # AND providers are not profiled
+    assert mock_compute.call_args.kwargs["profile"] is False
+    assert "Provider Profile" not in resp.text
+
+    # WHEN requesting a provider profile via the header
+    mock_analysis.to_dict.return_value = {
+        "provider_results": {},
+        "widgets": widgets,
+        "profile": [
+            {"provider": "pmc", "phase": "calculate", "wall_seconds": 0.0125, "cpu_seconds": 0.01, "peak_bytes": 2048}
+        ],
+    }
+    resp = client.get("/dashboard", headers={PROFILE_HEADER: "1"})
+
+    # THEN the analysis is profiled and the debug panel is shown
+    assert mock_compute.call_args.kwargs["profile"] is True
+    assert "Provider Profile" in resp.text
+    assert "12.50" in resp.text
 
 
 @patch("app.services.planner.generate_plan")
-@patch("app.services.planner.IntervalsClient")
+@patch("app.intervals.pool.IntervalsClient")
 def test_planning_flow(
-    mock_client_class: MagicMock,  # noqa: ARG001
+    mock_client_class: MagicMock,
     mock_gen_plan: MagicMock,
     client: TestClient,
     mock_llm_response: LLMResponse,
@@ -242,12 +268,17 @@ def test_planning_flow(
         client: The test client.
         mock_llm_response: Mocked LLM response.
     """
-    # GIVEN an authenticated user
+    # GIVEN an authenticated user with stored secrets
     email = "planning_journey@example.com"
     password = "password123"  # noqa: S105
     client.post("/register", data={"email": email, "password": password})
     client.post("/login", data={"email": email, "password": password})
+    client.post("/api/secrets", json={"athlete_id": "planning_athlete", "intervals_api_key": "abc"})
     mock_gen_plan.return_value = mock_llm_response
+    mock_client_class.return_value.athlete_id = "planning_athlete"
+    mock_client_class.return_value.activities.return_value = []
+    mock_client_class.return_value.wellness.return_value = []
+    mock_client_class.return_value.power_curves.return_value = {"list": []}
 
     # WHEN generating a plan via WEB
     resp = client.post("/generate", data={"max_hours": "10", "max_sessions": "5"}, follow_redirects=True)
@@ -287,3 +318,22 @@ def test_secrets_flow(client: TestClient) -> None:
     # THEN it should be successful
     assert resp.status_code == 200
     assert resp.json() == {"stored": True}
+
+
+def test_dashboard_requires_secrets(client: TestClient) -> None:
+    """Tests that the dashboard does not fall back to shared credentials.
+
+    Args:
+        client: The test client.
+    """
+    # GIVEN an authenticated user without stored secrets
+    email = "no_secrets_journey@example.com"
+    password = "password123"  # noqa: S105
+    client.post("/register", data={"email": email, "password": password})
+    client.post("/login", data={"email": email, "password": password})
+
+    # WHEN visiting the dashboard
+    resp = client.get("/dashboard")
+
+    # THEN the missing secrets are reported
+    assert resp.status_code == 404
@@ -0,0 +1,254 @@
+"""Unit tests for the local activity store service."""
+
+import asyncio
+from datetime import UTC, date, datetime, timedelta
+from typing import TYPE_CHECKING, Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine, delete
+
+from app.intervals.client import BASE_URL, AsyncIntervalsClient, IntervalsClient, create_pooled_session
+from app.models.activity import StoredPMCDay, SyncState
+from app.services.activity_store import (
+    SYNC_OVERLAP_DAYS,
+    SyncDataset,
+    get_sync_oldest,
+    load_activities,
+    store_activities,
+    sync_bundle,
+)
+from app.services.pmc_store import load_pmc, update_pmc
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+
+    from requests_mock import Mocker
+    from sqlalchemy.engine import Engine
+
+
+@pytest.fixture(name="engine")
+def fixture_engine() -> Engine:
+    """Provides an in-memory database shared across threads.
+
+    Returns:
+        The database engine.
+    """
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+@pytest.fixture
+def session(engine: Engine) -> Generator[Session]:
+    """Provides a clean in-memory database session.
+
+    Yields:
+        The database session.
+    """
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture(autouse=True)
+def _clear_power_curves() -> Generator[None]:
+    """Starts every test without cached power curves.
+
+    Yields:
+        Nothing.
+    """
+    with patch.dict("app.services.activity_store._POWER_CURVES", clear=True):
+        yield
+
+
+def _activity(activity_id: str, day: date) -> dict[str, str]:
+    return {"id": activity_id, "start_date_local": f"{day.isoformat()}T08:00:00"}
+
+
+def test_get_sync_oldest_never_synced(session: Session) -> None:
+    """Test that the full window is requested if the athlete was never synced."""
+    # GIVEN: An empty store.
+    window_oldest = date(2026, 1, 1)
+
+    # WHEN: Determining the oldest date to request.
+    oldest = get_sync_oldest(session, "athlete", SyncDataset.ACTIVITIES, window_oldest)
+
+    # THEN: The full window is requested.
+    assert oldest == window_oldest
+
+
+def test_get_sync_oldest_incremental(session: Session) -> None:
+    """Test that only the days since the last sync are requested."""
+    # GIVEN: A store synced up to today.
+    today = date(2026, 4, 20)
+    session.add(SyncState(athlete_id="athlete", dataset="activities", oldest=date(2026, 1, 1), last_synced=today))
+    session.commit()
+
+    # WHEN: Determining the oldest date to request for a window within the stored range.
+    oldest = get_sync_oldest(session, "athlete", SyncDataset.ACTIVITIES, date(2026, 2, 1))
+
+    # THEN: Only the overlap before the last sync is requested.
+    assert oldest == today - timedelta(days=SYNC_OVERLAP_DAYS)
+
+    # WHEN: The window reaches back further than the stored range.
+    oldest = get_sync_oldest(session, "athlete", SyncDataset.ACTIVITIES, date(2025, 12, 1))
+
+    # THEN: The full window is requested again.
+    assert oldest == date(2025, 12, 1)
+
+
+def test_store_activities_replaces_synced_range(session: Session) -> None:
+    """Test that activities deleted upstream within the synced range are removed locally."""
+    # GIVEN: Two stored activities.
+    today = date(2026, 4, 20)
+    old, recent = date(2026, 4, 10), date(2026, 4, 19)
+    store_activities(session, "athlete", [_activity("i1", old), _activity("i2", recent)], old, today)
+
+    # WHEN: Syncing the last days where the recent activity no longer exists upstream.
+    store_activities(session, "athlete", [_activity("i3", today)], date(2026, 4, 18), today)
+
+    # THEN: The old activity is kept, the deleted one removed and the new one added.
+    assert [a["id"] for a in load_activities(session, "athlete", old)] == ["i1", "i3"]
+
+
+@pytest.mark.asyncio
+async def test_sync_bundle_fetches_only_new_records(engine: Engine) -> None:
+    """Test that a second sync only requests the most recent days and reads the rest locally."""
+    # GIVEN: A client returning one old activity on the first and one new activity on the second sync.
+    today = datetime.now(UTC).date()
+    client = MagicMock()
+    client.client.athlete_id = "athlete"
+    client.activities = AsyncMock(side_effect=[[_activity("i1", today - timedelta(days=30))], [_activity("i2", today)]])
+    client.wellness = AsyncMock(return_value=[{"id": today.isoformat(), "hrv": 70}])
+    client.power_curves = AsyncMock(return_value={"list": []})
+
+    # WHEN: Syncing twice.
+    with patch("app.services.activity_store.engine", engine):
+        await sync_bundle(client, days=120)
+        bundle = await sync_bundle(client, days=120)
+
+    # THEN: The first sync requested the full window and the second only the overlap.
+    assert client.activities.call_args_list[0].kwargs["oldest"] == today - timedelta(days=120)
+    assert client.activities.call_args_list[1].kwargs["oldest"] == today - timedelta(days=SYNC_OVERLAP_DAYS)
+    # AND the bundle covers the complete window from the local store.
+    assert [a["id"] for a in bundle.activities] == ["i1", "i2"]
+    assert bundle.wellness == [{"id": today.isoformat(), "hrv": 70}]
+    assert bundle.power_curves == {"list": []}
+
+
+@pytest.mark.asyncio
+async def test_sync_bundle_coalesces_concurrent_syncs(engine: Engine) -> None:
+    """Test that concurrent syncs of an athlete share one sync, and a wider window syncs the remaining days."""
+    # GIVEN: A client whose activity requests take a moment.
+    today = datetime.now(UTC).date()
+
+    async def activities(oldest: date) -> list[dict[str, str]]:
+        await asyncio.sleep(0.01)
+        return [_activity("i1", today - timedelta(days=60))] if oldest < today - timedelta(days=60) else []
+
+    client = MagicMock()
+    client.client.athlete_id = "athlete"
+    client.activities = AsyncMock(side_effect=activities)
+    client.wellness = AsyncMock(return_value=[])
+    client.power_curves = AsyncMock(return_value={"list": []})
+
+    # WHEN: Three analyses sync concurrently, the last one over a wider window.
+    with patch("app.services.activity_store.engine", engine):
+        short, same, wide = await asyncio.gather(
+            sync_bundle(client, days=30), sync_bundle(client, days=30), sync_bundle(client, days=120)
+        )
+
+    # THEN: The equal windows share a sync, and the wider window is synced once the shared sync has finished.
+    assert [c.kwargs["oldest"] for c in client.activities.call_args_list] == [
+        today - timedelta(days=30),
+        today - timedelta(days=120),
+    ]
+    # AND every bundle covers its own window.
+    assert short.activities == same.activities == []
+    assert [a["id"] for a in wide.activities] == ["i1"]
+
+
+@pytest.mark.asyncio
+async def test_sync_bundle_advances_pmc_once_per_athlete(engine: Engine) -> None:
+    """Test that concurrent syncs of an athlete write the PMC one at a time."""
+    # GIVEN: A client whose requests take a moment and whose activities carry training stress.
+    today = datetime.now(UTC).date()
+
+    async def activities(oldest: date) -> list[dict[str, Any]]:
+        await asyncio.sleep(0.01)
+        days = [today - timedelta(days=60), today - timedelta(days=1)]
+        return [{**_activity(f"i{i}", day), "icu_training_load": 50} for i, day in enumerate(days) if day >= oldest]
+
+    client = MagicMock()
+    client.client.athlete_id = "athlete"
+    client.activities = AsyncMock(side_effect=activities)
+    client.wellness = AsyncMock(return_value=[])
+    client.power_curves = AsyncMock(return_value={"list": []})
+
+    # WHEN: Analyses of different windows sync concurrently, each invalidating the trailing days of the PMC.
+    with patch("app.services.activity_store.engine", engine):
+        await asyncio.gather(*(sync_bundle(client, days=days) for days in (30, 120, 30, 120)))
+
+    # THEN: The PMC is persisted up to today and equals a PMC computed from scratch.
+    with Session(engine) as session:
+        synced = load_pmc(session, "athlete", today - timedelta(days=120))
+        session.exec(delete(StoredPMCDay))
+        update_pmc(session, "athlete", today)
+        assert synced["date"].max() == today
+        assert synced.equals(load_pmc(session, "athlete", today - timedelta(days=120)))
+
+
+@pytest.mark.asyncio
+async def test_sync_bundle_fetches_power_curves_once_per_activities(engine: Engine) -> None:
+    """Test that the power curves are only fetched again once the synced activities change."""
+    # GIVEN: A client returning the same activity twice and a new one on the third sync.
+    today = datetime.now(UTC).date()
+    first, second = _activity("i1", today), _activity("i2", today)
+    client = MagicMock()
+    client.client.athlete_id = "athlete"
+    client.activities = AsyncMock(side_effect=[[first], [first], [first, second]])
+    client.wellness = AsyncMock(return_value=[])
+    client.power_curves = AsyncMock(side_effect=[{"list": ["old"]}, {"list": ["new"]}])
+
+    # WHEN: Syncing twice for different windows.
+    with patch("app.services.activity_store.engine", engine):
+        await sync_bundle(client, days=120)
+        bundle = await sync_bundle(client, days=30)
+
+        # THEN: The power curves are fetched once.
+        assert client.power_curves.await_count == 1
+        assert bundle.power_curves == {"list": ["old"]}
+
+        # WHEN: A sync stores a new activity.
+        bundle = await sync_bundle(client, days=30)
+
+    # THEN: The power curves are fetched again.
+    assert client.power_curves.await_count == 2
+    assert bundle.power_curves == {"list": ["new"]}
+
+
+@pytest.mark.asyncio
+async def test_sync_bundle_with_intervals_client(engine: Engine, requests_mock: Mocker) -> None:
+    """Test that a sync through the intervals.icu client returns the payloads of all three endpoints."""
+    # GIVEN: An async client wrapping a pooled session.
+    today = datetime.now(UTC).date()
+    client = AsyncIntervalsClient(
+        IntervalsClient(api_key="test_key", athlete_id="test_id", session=create_pooled_session())
+    )
+    # AND: Mocked API endpoints.
+    requests_mock.get(f"{BASE_URL}/athlete/test_id/activities", json=[_activity("i1", today)])
+    requests_mock.get(f"{BASE_URL}/athlete/test_id/wellness", json=[{"id": today.isoformat(), "hrv": 70}])
+    curves = requests_mock.get(f"{BASE_URL}/athlete/test_id/power-curves", json={"list": []})
+
+    # WHEN: Syncing the bundle.
+    with patch("app.services.activity_store.engine", engine):
+        bundle = await sync_bundle(client, days=7, curves="42d")
+
+    # THEN: Every endpoint's payload is returned.
+    assert bundle.activities == [_activity("i1", today)]
+    assert bundle.wellness == [{"id": today.isoformat(), "hrv": 70}]
+    assert bundle.power_curves == {"list": []}
+    # AND: The requested power curve window is forwarded.
+    assert curves.last_request is not None
+    assert curves.last_request.qs["curves"] == ["42d"]
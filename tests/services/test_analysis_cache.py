@@ -0,0 +1,169 @@
+"""Tests for the analysis cache service."""
+
+import asyncio
+import uuid
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.intervals.models import AnalysisResult
+from app.services.activity_store import IntervalsBundle
+from app.services.analysis_cache import AnalysisCache, AnalysisKey, get_analysis, get_analysis_cache
+
+KEY = AnalysisKey(athlete_id="i1", analysis_days=120, display_days=42)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_analyses_are_coalesced() -> None:
+    """Test that concurrent callers share one computation."""
+    # GIVEN a slow analysis
+    cache = AnalysisCache()
+    result = AnalysisResult(provider_results={"activity": {}})
+    calls = []
+
+    async def compute() -> AnalysisResult:
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return result
+
+    # WHEN requesting it concurrently
+    results = await asyncio.gather(*(cache.get_or_compute(KEY, compute) for _ in range(3)))
+
+    # THEN it was computed once and shared
+    assert len(calls) == 1
+    assert all(r is result for r in results)
+
+
+@pytest.mark.asyncio
+async def test_cached_analysis_expires() -> None:
+    """Test that results are reused within the TTL only."""
+    # GIVEN a cache with a short TTL
+    cache = AnalysisCache(ttl_seconds=60)
+    compute = AsyncMock(side_effect=AnalysisResult)
+
+    # WHEN computing an analysis
+    with patch("app.services.analysis_cache.time.monotonic", return_value=0):
+        first = await cache.get_or_compute(KEY, compute)
+        # THEN it is reused within the TTL
+        assert await cache.get_or_compute(KEY, compute) is first
+
+    # AND recomputed once the TTL expired
+    with patch("app.services.analysis_cache.time.monotonic", return_value=61):
+        assert await cache.get_or_compute(KEY, compute) is not first
+
+    # AND other windows are computed separately
+    assert await cache.get_or_compute(KEY._replace(display_days=7), compute) is not first
+
+
+@pytest.mark.asyncio
+async def test_cache_is_bounded() -> None:
+    """Test that the oldest analyses are evicted beyond the maximum size."""
+    # GIVEN a cache holding a single analysis
+    cache = AnalysisCache(maxsize=1)
+    compute = AsyncMock(side_effect=AnalysisResult)
+
+    # WHEN computing two analyses
+    first = await cache.get_or_compute(KEY, compute)
+    await cache.get_or_compute(KEY._replace(athlete_id="i2"), compute)
+
+    # THEN the first one was evicted
+    assert await cache.get_or_compute(KEY, compute) is not first
+
+
+@pytest.mark.asyncio
+async def test_invalidate_user() -> None:
+    """Test that invalidating a user drops their analyses, including one still being computed."""
+    # GIVEN cached analyses of two users
+    cache = AnalysisCache()
+    user_id = uuid.uuid4()
+    user, other = KEY._replace(user_id=user_id), KEY._replace(user_id=uuid.uuid4())
+    compute = AsyncMock(side_effect=AnalysisResult)
+    first = await cache.get_or_compute(user, compute)
+    other_first = await cache.get_or_compute(other, compute)
+
+    # WHEN invalidating one user while an analysis of theirs is in flight
+    started = asyncio.Event()
+
+    async def slow_compute() -> AnalysisResult:
+        started.set()
+        await asyncio.sleep(0.01)
+        return AnalysisResult()
+
+    inflight = asyncio.ensure_future(cache.get_or_compute(user._replace(display_days=7), slow_compute))
+    await started.wait()
+    cache.invalidate_user(user_id)
+    stale = await inflight
+
+    # THEN the user's analyses are recomputed, the in-flight one included
+    assert await cache.get_or_compute(user, compute) is not first
+    assert await cache.get_or_compute(user._replace(display_days=7), compute) is not stale
+    # AND the other user's analysis is kept
+    assert await cache.get_or_compute(other, compute) is other_first
+
+
+@patch("app.services.analysis_cache.compute_analysis")
+@patch("app.services.analysis_cache.get_pmc")
+@patch("app.services.analysis_cache.sync_bundle")
+@pytest.mark.asyncio
+async def test_get_analysis(mock_sync_bundle: MagicMock, mock_get_pmc: MagicMock, mock_compute: MagicMock) -> None:
+    """Test that the pipeline runs once per athlete and window."""
+    # GIVEN a client and a synced bundle
+    get_analysis_cache().clear()
+    client = MagicMock(athlete_id="i1")
+    mock_sync_bundle.return_value = IntervalsBundle(activities=[], wellness=[], power_curves={})
+    mock_compute.return_value = AnalysisResult()
+
+    # WHEN requesting the analysis twice
+    first = await get_analysis(client, 120, display_days=42)
+    second = await get_analysis(client, 120, display_days=42)
+
+    # THEN the data was synced and analyzed once
+    mock_sync_bundle.assert_called_once()
+    assert mock_sync_bundle.call_args.kwargs["days"] == 120
+    mock_compute.assert_called_once()
+    assert mock_compute.call_args.kwargs["display_days"] == 42
+    # AND the persisted PMC was loaded and passed on
+    assert mock_compute.call_args.kwargs["pmc"] is mock_get_pmc.return_value
+    assert first is second
+
+    # WHEN requesting it without widgets
+    await get_analysis(client, 120, display_days=42, widgets=False)
+
+    # THEN it is computed separately without widgets
+    assert mock_compute.call_count == 2
+    assert mock_compute.call_args.kwargs["widgets"] is False
+    # AND nothing is projected without a user
+    assert mock_compute.call_args.kwargs["planned_stress"] is None
+
+    # WHEN requesting a profiled analysis twice
+    await get_analysis(client, 120, display_days=42, profile=True)
+    await get_analysis(client, 120, display_days=42, profile=True)
+
+    # THEN every profile measures a fresh run
+    assert mock_compute.call_count == 4
+    assert mock_compute.call_args.kwargs["profile"] is True
+    get_analysis_cache().clear()
+
+
+@patch("app.services.analysis_cache.compute_analysis")
+@patch("app.services.analysis_cache.load_planned_stress")
+@patch("app.services.analysis_cache.get_pmc", MagicMock())
+@patch("app.services.analysis_cache.sync_bundle")
+@pytest.mark.asyncio
+async def test_get_analysis_projects_plans(
+    mock_sync_bundle: MagicMock, mock_planned: MagicMock, mock_compute: MagicMock
+) -> None:
+    """Test that the user's stored plans are passed on for the PMC projection."""
+    # GIVEN a client and a synced bundle
+    get_analysis_cache().clear()
+    mock_sync_bundle.return_value = IntervalsBundle(activities=[], wellness=[], power_curves={})
+    mock_compute.return_value = AnalysisResult()
+    user_id = uuid.uuid4()
+
+    # WHEN requesting the analysis of a user
+    await get_analysis(MagicMock(athlete_id="i1"), 120, user_id=user_id)
+
+    # THEN the user's planned stress is projected
+    assert mock_planned.call_args.args[0] == user_id
+    assert mock_compute.call_args.kwargs["planned_stress"] is mock_planned.return_value
+    get_analysis_cache().clear()
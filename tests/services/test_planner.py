@@ -3,7 +3,7 @@
 import uuid
 from datetime import UTC, date, datetime
 from typing import TYPE_CHECKING
-from unittest.mock import ANY, AsyncMock, MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from sqlmodel import Session, create_engine, select
@@ -83,7 +83,7 @@ def test_save_training_plan_overwrite(session: Session) -> None:
     assert plan.raw_content == "New Content"
 
 
-@patch("app.services.planner.IntervalsClient")
+@patch("app.services.planner.get_client_pool")
 @patch("app.services.planner.registry")
 @patch("app.services.planner.generate_plan")
 @patch("app.services.planner.llm_json_to_icu_txt")
@@ -94,7 +94,7 @@ async def test_generate_weekly_plan(
     mock_llm_json_to_icu_txt: MagicMock,
     mock_generate_plan: MagicMock,
     mock_registry: MagicMock,
-    mock_intervals_client: MagicMock,
+    mock_get_client_pool: MagicMock,
 ) -> None:
     """Test the generate_weekly_plan function."""
     # GIVEN: A mock user and mocked settings.
@@ -107,13 +107,12 @@ async def test_generate_weekly_plan(
     )
 
     mock_settings = MagicMock()
-    mock_settings.INTERVALS_API_KEY = "test_api_key"
-    mock_settings.INTERVALS_ATHLETE_ID = "test_athlete_id"
-    mock_settings.CACHE_INTERVALS_HOURS = 1
     mock_settings.ANALYSIS_DAYS = 120
     mock_settings.weekly_sessions = 5
     mock_settings.weekly_hours = 10
     mock_settings.LANGUAGE_MODEL = "test_model"
+    mock_settings.CONTEXT_CONCURRENCY = 2
+    mock_settings.CONTEXT_TIMEOUT_SECONDS = 3.0
 
     mock_registry.get_combined_context = AsyncMock(return_value="Registry context")
     mock_user_prompt.return_value = "Formatted prompt"
@@ -130,8 +129,10 @@ async def test_generate_weekly_plan(
         result = await generate_weekly_plan(mock_user, mock_settings)
 
     # THEN: The registry and LLM should be called with correct data.
-    mock_intervals_client.assert_called_once_with("test_api_key", "test_athlete_id", session=ANY)
-    mock_registry.get_combined_context.assert_called_once_with(mock_analysis.provider_results)
+    mock_get_client_pool.return_value.get.assert_called_once_with(mock_user.id)
+    mock_registry.get_combined_context.assert_called_once_with(
+        mock_analysis.provider_results, max_concurrency=2, timeout_seconds=3.0
+    )
     mock_user_prompt.assert_called_once()
     assert "Registry context" in mock_user_prompt.call_args[0][0]
     assert "Max Hours: 10.0" in mock_user_prompt.call_args[0][0]
@@ -174,6 +175,7 @@ async def test_update_training_plan_uses_history(mock_generate_plan: MagicMock,
         patch("app.services.planner.Session", return_value=session),
         patch("app.services.planner.get_monday", return_value=monday),
         patch("app.services.planner.datetime") as mock_datetime,
+        patch("app.services.planner.get_analysis_cache") as mock_cache,
     ):
         mock_datetime.now.return_value = datetime(2026, 4, 21, tzinfo=UTC)
         await update_training_plan(user, "make it harder")
@@ -182,6 +184,8 @@ async def test_update_training_plan_uses_history(mock_generate_plan: MagicMock,
     mock_generate_plan.assert_called_once()
     passed_messages = mock_generate_plan.call_args.kwargs["messages"]
     assert len(passed_messages) == 3
+    # AND the cached analyses of the user are dropped, their projection reads the stored plans
+    mock_cache.return_value.invalidate_user.assert_called_once_with(user.id)
     assert passed_messages[2]["content"] == "make it harder"
 
     # THEN: The plan and its history should be updated in the database.
@@ -0,0 +1,123 @@
+"""Unit tests for the incremental PMC store."""
+
+import math
+import uuid
+from datetime import date, timedelta
+from typing import TYPE_CHECKING, Any
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.models.plan import TrainingPhase, TrainingPlan
+from app.planning.providers.pmc import PMCPoint, advance_pmc
+from app.services.activity_store import store_activities
+from app.services.pmc_store import load_planned_stress, load_pmc, update_pmc
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+
+START = date(2026, 1, 1)
+
+
+@pytest.fixture
+def session() -> Generator[Session]:
+    """Provides a clean in-memory database session.
+
+    Yields:
+        The database session.
+    """
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+def _activity(day: date, load: float) -> dict[str, Any]:
+    return {"id": f"i{day.isoformat()}", "start_date_local": f"{day.isoformat()}T08:00:00", "icu_training_load": load}
+
+
+def _full_recompute(stresses: list[float]) -> list[PMCPoint]:
+    return advance_pmc(PMCPoint(day=START - timedelta(days=1), ctl=0.0, atl=0.0), stresses)
+
+
+def test_update_pmc_is_incremental(session: Session) -> None:
+    """Test that the PMC is advanced by the new days only and matches a full recomputation."""
+    # GIVEN: Ten days of stored activities with a PMC computed up to day 5
+    stresses = [float(10 * ((i + 1) % 3)) for i in range(10)]
+    activities = [_activity(START + timedelta(days=i), s) for i, s in enumerate(stresses) if s]
+    store_activities(session, "athlete", activities, START, START)
+    assert update_pmc(session, "athlete", START + timedelta(days=4)) == 5
+
+    # WHEN: Advancing it to day 10
+    computed = update_pmc(session, "athlete", START + timedelta(days=9))
+
+    # THEN: Only the five new days were computed
+    assert computed == 5
+    # AND the values equal a full recomputation
+    pmc = load_pmc(session, "athlete", START)
+    expected = _full_recompute(stresses)
+    assert pmc["date"].to_list() == [p.day for p in expected]
+    assert all(math.isclose(a, p.ctl) for a, p in zip(pmc["ctl"], expected, strict=True))
+    assert all(math.isclose(a, p.atl) for a, p in zip(pmc["atl"], expected, strict=True))
+    # AND nothing is computed without new days
+    assert update_pmc(session, "athlete", START + timedelta(days=9)) == 0
+
+
+def test_back_dated_change_is_recomputed(session: Session) -> None:
+    """Test that a change of stored activities recomputes the PMC from the changed date on."""
+    # GIVEN: A PMC computed over ten days of activities
+    today = START + timedelta(days=9)
+    activities = [_activity(START + timedelta(days=i), 50.0) for i in range(10)]
+    store_activities(session, "athlete", activities, START, today)
+    update_pmc(session, "athlete", today)
+
+    # WHEN: Re-syncing from day 4 with a changed activity
+    changed_from = START + timedelta(days=3)
+    resynced = [_activity(START + timedelta(days=i), 100.0 if i == 3 else 50.0) for i in range(3, 10)]
+    store_activities(session, "athlete", resynced, changed_from, today)
+    # THEN: The PMC is invalidated from the changed date on
+    assert load_pmc(session, "athlete", START)["date"].max() == changed_from - timedelta(days=1)
+
+    # WHEN: Updating the PMC
+    computed = update_pmc(session, "athlete", today)
+
+    # THEN: Only the invalidated days were recomputed, exactly like a full recomputation
+    assert computed == 7
+    expected = _full_recompute([100.0 if i == 3 else 50.0 for i in range(10)])
+    pmc = load_pmc(session, "athlete", START)
+    assert all(math.isclose(a, p.ctl) for a, p in zip(pmc["ctl"], expected, strict=True))
+
+
+def test_update_pmc_without_activities(session: Session) -> None:
+    """Test that nothing is computed for athletes without stored activities."""
+    # GIVEN: An empty store
+    # WHEN: Updating the PMC
+    # THEN: Nothing is computed and the loaded PMC is empty
+    assert update_pmc(session, "athlete", START) == 0
+    assert load_pmc(session, "athlete", START).is_empty()
+
+
+def test_load_planned_stress(session: Session) -> None:
+    """Test that only the plans of the user's active phase from the current week on are projected."""
+    # GIVEN: Plans of last week, this week and of an archived phase
+    user_id = uuid.uuid4()
+    active = TrainingPhase(user_id=user_id, primary_goal="FTP", start_date=START, end_date=START, status="active")
+    archived = TrainingPhase(user_id=user_id, primary_goal="FTP", start_date=START, end_date=START, status="archived")
+    workout = {"day": "Tuesday", "segments": [{"repeats": 1, "steps": [{"duration_m": 60, "power_pct": "100"}]}]}
+    monday = date(2026, 3, 2)
+    session.add_all([active, archived])
+    session.add_all([
+        TrainingPlan(phase_id=active.id, week_start=monday - timedelta(days=7), raw_content="", workout_data=[workout]),
+        TrainingPlan(phase_id=active.id, week_start=monday, raw_content="", workout_data=[workout]),
+        TrainingPlan(phase_id=archived.id, week_start=monday, raw_content="", workout_data=[workout]),
+    ])
+    session.commit()
+
+    # WHEN: Loading the planned stress on Wednesday
+    with patch("app.services.pmc_store.engine", session.get_bind()):
+        planned = load_planned_stress(user_id, monday + timedelta(days=2))
+
+    # THEN: Only this week's plan of the active phase is included
+    assert planned.rows() == [(monday + timedelta(days=1), 100.0)]
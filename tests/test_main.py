@@ -39,3 +39,28 @@ def test_app_state() -> None:
         # THEN the app state contains the expected settings
         assert "settings" in app.state.settings
         assert "models" in app.state.settings
+
+
+def test_cache_stats() -> None:
+    """Tests the cache statistics endpoint."""
+    # GIVEN a FastAPI app
+    with TestClient(app) as client:
+        # WHEN the /health/cache endpoint is called
+        response = client.get("/health/cache")
+        # THEN the response reports the cache counters
+        expected_status = 200
+        assert response.status_code == expected_status
+        assert response.json() == {"hits": 0, "misses": 0, "endpoints": {}}
+
+
+def test_metrics() -> None:
+    """Tests the Prometheus metrics endpoint."""
+    # GIVEN a FastAPI app
+    with TestClient(app) as client:
+        # WHEN the /metrics endpoint is called
+        response = client.get("/metrics")
+        # THEN the provider metrics are returned in the text format
+        expected_status = 200
+        assert response.status_code == expected_status
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "# TYPE intelliwatts_provider_wall_seconds summary" in response.text
@@ -0,0 +1,114 @@
+"""Tests for the single-flight call coalescing."""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.utils.singleflight import AsyncSingleFlight, SingleFlight
+
+
+def test_single_flight_coalesces_concurrent_calls() -> None:
+    """Test that concurrent calls with the same key share one execution."""
+    # GIVEN a slow function that counts its calls
+    group = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def fn() -> int:
+        calls.append(1)
+        started.set()
+        release.wait(timeout=5)
+        return 42
+
+    # WHEN calling it concurrently with the same key
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(group.do, "key", fn)]
+        started.wait(timeout=5)
+        futures += [pool.submit(group.do, "key", fn) for _ in range(3)]
+        # Give the followers a chance to join the in-flight call
+        time.sleep(0.1)
+        release.set()
+        results = [f.result() for f in futures]
+
+    # THEN the function ran once and every caller got its result
+    assert len(calls) == 1
+    assert results == [42, 42, 42, 42]
+
+
+def test_single_flight_runs_again_after_completion() -> None:
+    """Test that sequential calls are not coalesced."""
+    # GIVEN a group
+    group = SingleFlight()
+
+    # WHEN calling it twice in a row
+    results = [group.do("key", lambda: 1), group.do("key", lambda: 2)]
+
+    # THEN both calls ran
+    assert results == [1, 2]
+
+
+def test_single_flight_propagates_errors() -> None:
+    """Test that errors of the shared call are raised."""
+    # GIVEN a failing function
+    group = SingleFlight()
+
+    def fn() -> None:
+        msg = "boom"
+        raise ValueError(msg)
+
+    # WHEN calling it
+    # THEN the error is raised
+    with pytest.raises(ValueError, match="boom"):
+        group.do("key", fn)
+
+
+@pytest.mark.asyncio
+async def test_async_single_flight_coalesces_concurrent_calls() -> None:
+    """Test that concurrent awaits with the same key share one execution."""
+    # GIVEN a slow coroutine function that counts its calls
+    group = AsyncSingleFlight()
+    calls = []
+
+    async def fn() -> int:
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return 42
+
+    # WHEN awaiting it concurrently with the same key
+    results = await asyncio.gather(*(group.do("key", fn) for _ in range(4)))
+
+    # THEN the function ran once and every caller got its result
+    assert len(calls) == 1
+    assert results == [42, 42, 42, 42]
+    # AND a later call runs again
+    assert await group.do("key", fn) == 42
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_async_single_flight_survives_cancelled_caller() -> None:
+    """Test that cancelling one caller does not cancel the shared call."""
+    # GIVEN an in-flight call awaited by two callers
+    group = AsyncSingleFlight()
+    release = asyncio.Event()
+
+    async def fn() -> int:
+        await release.wait()
+        return 42
+
+    first = asyncio.create_task(group.do("key", fn))
+    second = asyncio.create_task(group.do("key", fn))
+    await asyncio.sleep(0)
+
+    # WHEN the first caller is cancelled
+    first.cancel()
+    release.set()
+
+    # THEN the second caller still receives the result
+    assert await second == 42
+    with pytest.raises(asyncio.CancelledError):
+        await first